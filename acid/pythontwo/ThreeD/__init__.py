@@ -0,0 +1,24 @@
+from acid.pythontwo._lazy import lazy
+
+# Nothing here touches OpenGL or pygame until one of these names is used
+__getattr__, __dir__ = lazy(__name__, {
+    "Engine3D": ".renderer",
+    "Object3D": ".renderer",
+    "Camera": ".renderer",
+    "AcidUI": ".renderer",
+    "InstancedObject3D": ".instancing",
+    "Scene": ".scene",
+    "PhysicsWorld": ".physics",
+    "AssetStreamer": ".streaming",
+    "LODObject3D": ".lod",
+    "load_obj": ".objloader",
+    "load_obj_arrays": ".objloader",
+    "prepare_mesh": ".meshprep",
+    "SoftwareEngine3D": ".softrender",
+    "MeshBVH": ".picking",
+    "pick": ".picking",
+    "screen_ray": ".picking",
+    "StaticBatcher": ".batching",
+    "texture_manager": ".textures",
+    "TextureManager": ".textures",
+})
@@ -0,0 +1,338 @@
+import ctypes
+import numpy as np
+import OpenGL
+from OpenGL.GL import *
+from acid.pythontwo.ThreeD.renderer import buffers_supported
+from acid.pythontwo.ThreeD.scene import boxes_in_frustum
+from acid.pythontwo.ThreeD.textures import texture_manager
+from acid.pythontwo.math.matrixes.matrix import euler_to_matrices
+import acid.pythontwo.profiler.profiler as profiler
+
+# --- STATIC BATCHING ---
+# Objects flagged static (walls, props, ...) get their position/rotation/scale baked
+# into world-space vertices once, and are merged per (texture, cell) into one shared
+# VBO/IBO each: a batch is one texture bind and one glDrawElements, no matrix push/pop.
+# Cells are cell_size cubes picked by each object's world box center, so a level
+# splits into batches that can still be frustum culled on their own box.
+#
+#   batcher = StaticBatcher()
+#   dynamic = batcher.extend(level_objects)   # the ones not flagged static come back
+#   ...
+#   camera.apply()
+#   batcher.render(camera)
+#
+# Each object's baked arrays are kept, so adding one appends to its batch and uploads
+# only the new tail; removing one closes the gap in its batch and re-uploads from there.
+# Move or re-mesh a static object and call update(obj) to re-bake it. A batch holds its
+# own reference to its texture, so objects can release theirs once they are batched.
+
+CELL_SIZE = 64.0
+FLOATS = 5  # x, y, z, u, v like Object3D's interleaved buffer
+
+
+def bake(arrays, basis, position):
+    # Welded (interleaved, indices) of a mesh -> (world-space float32 (K, 5), uint32
+    # indices, low, high); basis is rotation * scale, the box is exact
+    rows, indices = arrays
+    rows = np.array(rows, dtype=np.float32).reshape(-1, FLOATS)
+    if not len(rows):
+        return rows, np.zeros(0, dtype=np.uint32), position, position
+    world = rows[:, :3] @ basis.T + position
+    rows[:, :3] = world
+    return rows, np.asarray(indices, dtype=np.uint32), world.min(axis=0), world.max(axis=0)
+
+
+class StaticBatch:
+    # One merged buffer: the objects sharing a texture and a cell
+    def __init__(self, key):
+        self.key = key
+        self.tex_id = texture_manager.retain(key[0]) if key[0] else key[0]
+        self.objects = []
+        self.vertex_count = 0
+        self.index_count = 0
+        self.lows = np.full(3, np.inf)
+        self.highs = np.full(3, -np.inf)
+        self._rows = np.zeros((0, FLOATS), dtype=np.float32)
+        self._indices = np.zeros(0, dtype=np.uint32)
+        self._starts = []  # (first vertex, first index) of each object
+
+        self.vbo = None
+        self.ibo = None
+        self._capacity = (0, 0)  # GPU buffer sizes in vertices, indices
+        self._dirty_vertex = 0   # everything from here on is not on the GPU yet
+        self._dirty_index = 0
+
+    def __len__(self):
+        return len(self.objects)
+
+    def append(self, obj, part):
+        rows, indices, low, high = part
+        vertices, count = self.vertex_count, self.index_count
+        if vertices + len(rows) > len(self._rows):
+            self._rows = self._grow(self._rows, vertices, vertices + len(rows))
+        if count + len(indices) > len(self._indices):
+            self._indices = self._grow(self._indices, count, count + len(indices))
+        self._rows[vertices:vertices + len(rows)] = rows
+        self._indices[count:count + len(indices)] = indices + np.uint32(vertices)
+        self._starts.append((vertices, count))
+        self.objects.append(obj)
+        self.vertex_count += len(rows)
+        self.index_count += len(indices)
+        self.lows = np.minimum(self.lows, low)
+        self.highs = np.maximum(self.highs, high)
+
+    @staticmethod
+    def _grow(array, used, needed):
+        # Doubling, so a run of appends copies each vertex O(1) times
+        out = np.empty((max(needed, 2 * len(array), 64),) + array.shape[1:], dtype=array.dtype)
+        out[:used] = array[:used]
+        return out
+
+    def remove(self, obj, parts):
+        # Close the gap in place: later vertices move down, their indices shift by the
+        # removed vertex count, and only the part from the gap on is uploaded again
+        slot = next(i for i, other in enumerate(self.objects) if other is obj)
+        first_vertex, first_index = self._starts[slot]
+        rows, indices = parts[id(obj)][:2]
+        vertices, count = len(rows), len(indices)
+        end_vertex, end_index = self.vertex_count, self.index_count
+        self._rows[first_vertex:end_vertex - vertices] = self._rows[first_vertex + vertices:end_vertex]
+        self._indices[first_index:end_index - count] = self._indices[first_index + count:end_index] - np.uint32(vertices)
+        del self.objects[slot]
+        del self._starts[slot]
+        for later in range(slot, len(self._starts)):
+            start_vertex, start_index = self._starts[later]
+            self._starts[later] = (start_vertex - vertices, start_index - count)
+        self.vertex_count -= vertices
+        self.index_count -= count
+        self._dirty_vertex = min(self._dirty_vertex, first_vertex)
+        self._dirty_index = min(self._dirty_index, first_index)
+        if self.objects:
+            self.lows = np.min([parts[id(other)][2] for other in self.objects], axis=0)
+            self.highs = np.max([parts[id(other)][3] for other in self.objects], axis=0)
+
+    def upload(self):
+        if self.vbo is None:
+            self.vbo = glGenBuffers(1)
+            self.ibo = glGenBuffers(1)
+        full = self._capacity != (len(self._rows), len(self._indices))
+        vertex_start = 0 if full else self._dirty_vertex
+        index_start = 0 if full else self._dirty_index
+        for target, buffer, array, start, used in (
+                (GL_ARRAY_BUFFER, self.vbo, self._rows, vertex_start, self.vertex_count),
+                (GL_ELEMENT_ARRAY_BUFFER, self.ibo, self._indices, index_start, self.index_count)):
+            glBindBuffer(target, buffer)
+            if full:
+                glBufferData(target, max(array.nbytes, 4), array, GL_STATIC_DRAW)
+            elif start < used:
+                span = np.ascontiguousarray(array[start:used])
+                glBufferSubData(target, start * array.strides[0], span.nbytes, span)
+            glBindBuffer(target, 0)
+        self._capacity = (len(self._rows), len(self._indices))
+        self._dirty_vertex = self.vertex_count
+        self._dirty_index = self.index_count
+
+    def release_buffers(self):
+        if self.vbo is not None:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+        self.vbo = None
+        self.ibo = None
+        self._capacity = (0, 0)
+        self._dirty_vertex = self._dirty_index = 0
+
+    def release_texture(self):
+        if self.tex_id:
+            texture_manager.release(self.tex_id)
+            self.tex_id = None
+
+    def draw_buffers(self, textured):
+        if self._capacity != (len(self._rows), len(self._indices)) or \
+                self._dirty_vertex < self.vertex_count or self._dirty_index < self.index_count:
+            self.upload()
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 20, ctypes.c_void_p(0))
+        if textured:
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+            glTexCoordPointer(2, GL_FLOAT, 20, ctypes.c_void_p(12))
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, ctypes.c_void_p(0))
+
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def draw_arrays(self, textured):
+        # No VBO support: the same merged arrays from client memory, still one call.
+        # Raw pointers, a strided numpy view would get copied into a packed one.
+        address = self._rows.ctypes.data
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 20, ctypes.c_void_p(address))
+        if textured:
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+            glTexCoordPointer(2, GL_FLOAT, 20, ctypes.c_void_p(address + 12))
+        glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, self._indices)
+        glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+
+class StaticBatcher:
+    def __init__(self, cell_size=CELL_SIZE, use_buffers=True):
+        self.cell_size = cell_size  # None: one batch per texture
+        self.use_buffers = use_buffers
+        self.batches = {}  # (tex_id, cell) -> StaticBatch
+        self.stats = {}
+        self._homes = {}   # id(obj) -> batch key
+        self._keys = {}    # id(obj) -> transform/mesh/texture it was baked with
+        self._parts = {}   # id(obj) -> (rows, indices, low, high)
+
+    @staticmethod
+    def _key(obj):
+        return (tuple(obj.position), tuple(obj.rotation), tuple(obj.scale), obj.mesh_version, obj.tex_id)
+
+    def _cell(self, low, high):
+        if not self.cell_size:
+            return None
+        return tuple(np.floor((low + high) / 2 / self.cell_size).astype(int).tolist())
+
+    def __len__(self):
+        return len(self._homes)
+
+    def __contains__(self, obj):
+        return id(obj) in self._homes
+
+    def __iter__(self):
+        for batch in self.batches.values():
+            yield from batch.objects
+
+    def add(self, obj):
+        if not getattr(obj, "static", False):
+            raise ValueError("only objects flagged static can be batched")
+        if id(obj) in self._homes:
+            return obj
+        self._insert([obj])
+        return obj
+
+    def extend(self, objects):
+        # Batch the static ones in one go, return the rest for the Scene
+        objects = list(objects)
+        batched = [obj for obj in objects if getattr(obj, "static", False) and id(obj) not in self._homes]
+        self._insert(batched)
+        return [obj for obj in objects if not getattr(obj, "static", False)]
+
+    def _insert(self, objects):
+        if not objects:
+            return
+        positions = np.array([obj.position for obj in objects], dtype=float).reshape(-1, 3)
+        rotations = np.array([obj.rotation for obj in objects], dtype=float).reshape(-1, 3)
+        scales = np.array([obj.scale for obj in objects], dtype=float).reshape(-1, 3)
+        bases = euler_to_matrices(rotations) * scales[:, None, :]
+        # Level geometry reuses a few meshes many times, weld each one once
+        meshes = {}
+        for obj, basis, position in zip(objects, bases, positions):
+            mesh = (id(obj.vertices), id(obj.uvs), id(obj.faces))
+            if mesh not in meshes:
+                meshes[mesh] = obj._mesh_arrays()
+            part = self._parts[id(obj)] = bake(meshes[mesh], basis, position)
+            self._keys[id(obj)] = self._key(obj)
+            key = (obj.tex_id, self._cell(part[2], part[3]))
+            batch = self.batches.get(key)
+            if batch is None:
+                batch = self.batches[key] = StaticBatch(key)
+            batch.append(obj, part)
+            self._homes[id(obj)] = key
+
+    def remove(self, obj):
+        key = self._homes.pop(id(obj), None)
+        if key is None:
+            return
+        batch = self.batches[key]
+        batch.remove(obj, self._parts)
+        del self._parts[id(obj)]
+        del self._keys[id(obj)]
+        if not batch.objects:
+            batch.release_buffers()
+            batch.release_texture()
+            del self.batches[key]
+
+    def update(self, objects=None):
+        # Re-bake objects that moved, changed mesh or texture since they were batched;
+        # all of them when objects is None. Returns how many were re-baked.
+        if objects is None:
+            objects = list(self)
+        changed = [obj for obj in objects
+                   if id(obj) in self._homes and self._key(obj) != self._keys[id(obj)]]
+        for obj in changed:
+            self.remove(obj)
+        self._insert(changed)
+        return len(changed)
+
+    def visible(self, camera):
+        batches = list(self.batches.values())
+        if not batches:
+            return []
+        lows = np.array([batch.lows for batch in batches])
+        highs = np.array([batch.highs for batch in batches])
+        inside = boxes_in_frustum(camera.frustum_planes(), lows, highs) > 0
+        return [batch for batch, keep in zip(batches, inside.tolist()) if keep]
+
+    def render(self, camera, wireframe=False, ignore_texture=False):
+        # Draws the visible batches with the current modelview (the camera's view, the
+        # vertices are already in world space), grouped so each texture is bound once
+        prof = profiler.active
+        if prof is not None:
+            start = profiler.now()
+
+        batches = sorted(self.visible(camera), key=lambda batch: (batch.tex_id is None, batch.tex_id or 0))
+        glPolygonMode(GL_FRONT_AND_BACK, GL_LINE if wireframe else GL_FILL)
+        glDisable(GL_TEXTURE_2D)
+        changes = 2
+        bound = binds = vertices = 0
+        for batch in batches:
+            textured = bool(batch.tex_id) and not ignore_texture
+            if textured and batch.tex_id != bound:
+                glEnable(GL_TEXTURE_2D)
+                glBindTexture(GL_TEXTURE_2D, batch.tex_id)
+                bound = batch.tex_id
+                binds += 1
+                changes += 2
+            elif not textured and bound:
+                glDisable(GL_TEXTURE_2D)
+                bound = 0
+                changes += 1
+            self._draw_batch(batch, textured)
+            vertices += batch.index_count
+        glDisable(GL_TEXTURE_2D)
+        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        changes += 2
+
+        self.stats = {
+            "batches": len(self.batches),
+            "visible": len(batches),
+            "culled": len(self.batches) - len(batches),
+            "objects": len(self._homes),
+        }
+        if prof is not None:
+            prof.record("static_batches", start)
+            prof.count("draw_calls", len(batches))
+            prof.count("vertices", vertices)
+            prof.count("texture_binds", binds)
+            prof.count("state_changes", changes)
+        return self.stats
+
+    def _draw_batch(self, batch, textured):
+        if self.use_buffers and buffers_supported():
+            try:
+                batch.draw_buffers(textured)
+                return
+            except OpenGL.error.Error:
+                # Context can't do buffers after all, client arrays from now on
+                self.use_buffers = False
+        batch.draw_arrays(textured)
+
+    def release_buffers(self):
+        for batch in self.batches.values():
+            batch.release_buffers()
@@ -0,0 +1,214 @@
+import ctypes
+import numpy as np
+import OpenGL
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+from acid.pythontwo.ThreeD.renderer import Object3D, buffers_supported
+
+# --- INSTANCED OBJECT ---
+# One mesh, many copies. Each instance is a row of 13 floats in one GPU buffer:
+#   position (3), rotation in degrees (3), scale (3), tint rgba (4)
+# All of them go out in a single glDrawElementsInstanced. The object's own
+# position/rotation/scale still applies to the whole set.
+
+INSTANCE_FLOATS = 13
+POSITION, ROTATION, SCALE, TINT = slice(0, 3), slice(3, 6), slice(6, 9), slice(9, 13)
+
+VERTEX_SHADER = """
+#version 120
+attribute vec3 a_position;
+attribute vec2 a_uv;
+attribute vec3 i_position;
+attribute vec3 i_rotation;
+attribute vec3 i_scale;
+attribute vec4 i_tint;
+varying vec2 v_uv;
+varying vec4 v_tint;
+
+void main() {
+    // Same order as Object3D.draw: scale, then rotate Z, Y, X, then translate
+    vec3 r = radians(i_rotation);
+    vec3 c = cos(r);
+    vec3 s = sin(r);
+    mat3 rx = mat3(1.0, 0.0, 0.0,  0.0, c.x, s.x,  0.0, -s.x, c.x);
+    mat3 ry = mat3(c.y, 0.0, -s.y,  0.0, 1.0, 0.0,  s.y, 0.0, c.y);
+    mat3 rz = mat3(c.z, s.z, 0.0,  -s.z, c.z, 0.0,  0.0, 0.0, 1.0);
+    vec3 world = i_position + rx * (ry * (rz * (a_position * i_scale)));
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(world, 1.0);
+    v_uv = a_uv;
+    v_tint = i_tint;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+uniform sampler2D u_texture;
+uniform int u_textured;
+varying vec2 v_uv;
+varying vec4 v_tint;
+
+void main() {
+    vec4 color = v_tint;
+    if (u_textured != 0)
+        color *= texture2D(u_texture, v_uv);
+    gl_FragColor = color;
+}
+"""
+
+
+def instancing_supported():
+    return buffers_supported() and bool(glDrawElementsInstanced) and bool(glVertexAttribDivisor)
+
+
+class InstancedObject3D(Object3D):
+    _program = None
+    _locations = None
+
+    def __init__(self, count=0):
+        super().__init__(use_buffers=True)
+        self.instances = np.zeros((count, INSTANCE_FLOATS), dtype=np.float32)
+        self.instances[:, SCALE] = 1.0
+        self.instances[:, TINT] = 1.0
+        self.instance_vbo = None
+        self._capacity = 0
+        self._dirty_lo = 0
+        self._dirty_hi = count
+        self.use_instancing = True
+
+    @property
+    def count(self):
+        return len(self.instances)
+
+    def set_instances(self, positions, rotations=None, scales=None, tints=None):
+        positions = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+        self.instances = np.zeros((len(positions), INSTANCE_FLOATS), dtype=np.float32)
+        self.instances[:, SCALE] = 1.0
+        self.instances[:, TINT] = 1.0
+        self.update_instances(slice(None), positions, rotations, scales, tints)
+
+    def update_instances(self, index, positions=None, rotations=None, scales=None, tints=None):
+        # index is an int, slice or index array; only that span gets re-uploaded
+        for part, values in ((POSITION, positions), (ROTATION, rotations), (SCALE, scales), (TINT, tints)):
+            if values is not None:
+                rows = self.instances[index]
+                rows[..., part] = values
+                self.instances[index] = rows
+
+        touched = np.arange(self.count)[index]
+        if np.size(touched):
+            self._dirty_lo = min(self._dirty_lo, int(np.min(touched)))
+            self._dirty_hi = max(self._dirty_hi, int(np.max(touched)) + 1)
+
+    def _upload_instances(self):
+        if self.instance_vbo is None:
+            self.instance_vbo = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        if self._capacity != self.count:
+            glBufferData(GL_ARRAY_BUFFER, max(self.instances.nbytes, 4), self.instances, GL_DYNAMIC_DRAW)
+            self._capacity = self.count
+        elif self._dirty_lo < self._dirty_hi:
+            stride = INSTANCE_FLOATS * 4
+            span = self.instances[self._dirty_lo:self._dirty_hi]
+            glBufferSubData(GL_ARRAY_BUFFER, self._dirty_lo * stride, span.nbytes, span)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self._dirty_lo = self.count
+        self._dirty_hi = 0
+
+    def release_buffers(self):
+        super().release_buffers()
+        if self.instance_vbo is not None:
+            glDeleteBuffers(1, [self.instance_vbo])
+        self.instance_vbo = None
+        self._capacity = 0
+        self._dirty_lo, self._dirty_hi = 0, self.count
+
+    @classmethod
+    def _get_program(cls):
+        if cls._program is None:
+            vertex = shaders.compileShader(VERTEX_SHADER, GL_VERTEX_SHADER)
+            fragment = shaders.compileShader(FRAGMENT_SHADER, GL_FRAGMENT_SHADER)
+            program = glCreateProgram()
+            glAttachShader(program, vertex)
+            glAttachShader(program, fragment)
+            # Compatibility profiles draw nothing unless attribute 0 is enabled, and the
+            # driver could give location 0 to a per-instance attribute
+            glBindAttribLocation(program, 0, "a_position")
+            glLinkProgram(program)
+            glDeleteShader(vertex)
+            glDeleteShader(fragment)
+            if glGetProgramiv(program, GL_LINK_STATUS) != GL_TRUE:
+                log = glGetProgramInfoLog(program)
+                glDeleteProgram(program)
+                raise RuntimeError("instancing shader failed to link: %s" % log)
+            cls._program = program
+            names = ("a_position", "a_uv", "i_position", "i_rotation", "i_scale", "i_tint")
+            cls._locations = {name: glGetAttribLocation(cls._program, name) for name in names}
+        return cls._program
+
+    def _vertex_count(self):
+        return super()._vertex_count() * self.count
+
+    def _draw_mesh(self, textured):
+        if not self.count:
+            return
+        if self.use_instancing and instancing_supported():
+            try:
+                self._draw_instanced(textured)
+                return
+            except (OpenGL.error.Error, RuntimeError):
+                # No shaders/instancing here after all, fall back to one draw per instance
+                glUseProgram(0)
+                self.use_instancing = False
+        self._draw_each(textured)
+
+    def _draw_instanced(self, textured):
+        program = self._get_program()
+        if self._uploaded_version != self.mesh_version:
+            self.upload_buffers()
+        if self._capacity != self.count or self._dirty_lo < self._dirty_hi:
+            self._upload_instances()
+
+        glUseProgram(program)
+        glUniform1i(glGetUniformLocation(program, "u_texture"), 0)
+        glUniform1i(glGetUniformLocation(program, "u_textured"), int(textured))
+        loc = self._locations
+        used = []
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        for name, size, offset in (("a_position", 3, 0), ("a_uv", 2, 12)):
+            if loc[name] >= 0:
+                glEnableVertexAttribArray(loc[name])
+                glVertexAttribPointer(loc[name], size, GL_FLOAT, GL_FALSE, 20, ctypes.c_void_p(offset))
+                used.append(loc[name])
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_vbo)
+        stride = INSTANCE_FLOATS * 4
+        for name, size, offset in (("i_position", 3, 0), ("i_rotation", 3, 12), ("i_scale", 3, 24), ("i_tint", 4, 36)):
+            if loc[name] >= 0:
+                glEnableVertexAttribArray(loc[name])
+                glVertexAttribPointer(loc[name], size, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(offset))
+                glVertexAttribDivisor(loc[name], 1)
+                used.append(loc[name])
+
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glDrawElementsInstanced(GL_TRIANGLES, self.index_count, self.index_type, ctypes.c_void_p(0), self.count)
+
+        for location in used:
+            glVertexAttribDivisor(location, 0)
+            glDisableVertexAttribArray(location)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glUseProgram(0)
+
+    def _draw_each(self, textured):
+        for row in self.instances.tolist():
+            glPushMatrix()
+            glTranslatef(*row[POSITION])
+            glRotatef(row[3], 1, 0, 0)
+            glRotatef(row[4], 0, 1, 0)
+            glRotatef(row[5], 0, 0, 1)
+            glScalef(*row[SCALE])
+            glColor4f(*row[TINT])
+            Object3D._draw_mesh(self, textured)
+            glPopMatrix()
+        glColor4f(1.0, 1.0, 1.0, 1.0)
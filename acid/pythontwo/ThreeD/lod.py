@@ -0,0 +1,220 @@
+import math
+import numpy as np
+from acid.pythontwo.ThreeD.objloader import load_obj_arrays, save_cache, load_cache, source_key, CACHE_SUFFIX
+from acid.pythontwo.ThreeD.renderer import Object3D
+
+# --- MESH SIMPLIFICATION ---
+# Quadric error vertex clustering (Lindstrom 2000): every triangle's plane quadric is
+# summed into the grid cell of each of its corners, each occupied cell collapses to
+# the point that minimizes its summed quadric, and triangles whose corners land in
+# fewer than three cells disappear. Same error metric as quadric edge collapse, but
+# one vectorized pass per grid size instead of one heap update per collapse.
+# The grid size is bisected until the triangle count hits the target.
+#
+# Faces keep their original uv indices, only positions move.
+
+DEFAULT_RATIOS = (1.0, 0.5, 0.25, 0.1)
+LOD_SUFFIX = ".lod" + CACHE_SUFFIX
+
+
+def face_quadrics(vertices, faces):
+    # Area weighted plane quadrics, one 4x4 per triangle
+    corners = vertices[faces[:, :, 0]]
+    normal = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    area = np.linalg.norm(normal, axis=1)
+    unit = normal / np.where(area > 0, area, 1.0)[:, None]
+    plane = np.concatenate((unit, -np.einsum('ij,ij->i', unit, corners[:, 0])[:, None]), axis=1)
+    return plane[:, :, None] * plane[:, None, :] * (area / 2)[:, None, None]
+
+
+def _cluster(vertices, faces, quadrics, resolution):
+    # Returns (new vertices, new faces) for a grid of `resolution` cells on the longest side
+    low, high = vertices.min(axis=0), vertices.max(axis=0)
+    size = max(float((high - low).max()), 1e-12) / resolution
+    cells = np.floor((vertices - low) / size).astype(np.int64)
+    cells = np.minimum(cells, resolution)
+    keys = (cells[:, 0] * (resolution + 1) + cells[:, 1]) * (resolution + 1) + cells[:, 2]
+    _, cluster = np.unique(keys, return_inverse=True)
+    cluster = cluster.reshape(-1)
+    count = int(cluster.max()) + 1
+
+    # Sum the quadrics of every triangle touching a vertex, per cluster
+    corner_cluster = cluster[faces[:, :, 0]]
+    q = np.zeros((count, 16))
+    for k in range(3):
+        q += np.stack([np.bincount(corner_cluster[:, k], quadrics[:, i // 4, i % 4], count)
+                       for i in range(16)], axis=1)
+    q = q.reshape(count, 4, 4)
+
+    # Minimize v^T Q v: solve A x = -b, fall back to the mean when A is near singular
+    members = np.bincount(cluster, minlength=count)[:, None]
+    mean = np.stack([np.bincount(cluster, vertices[:, k], count) for k in range(3)], axis=1) / members
+    a, b = q[:, :3, :3], q[:, :3, 3]
+    scale = np.abs(a).reshape(count, 9).max(axis=1)
+    det = np.linalg.det(a)
+    solvable = np.abs(det) > 1e-6 * np.maximum(scale, 1e-30) ** 3
+    position = mean.copy()
+    if solvable.any():
+        position[solvable] = np.linalg.solve(a[solvable], -b[solvable][:, :, None])[:, :, 0]
+
+    # Keep each point inside the box of the vertices it replaces, no spikes
+    lows = np.full((count, 3), np.inf)
+    highs = np.full((count, 3), -np.inf)
+    np.minimum.at(lows, cluster, vertices)
+    np.maximum.at(highs, cluster, vertices)
+    position = np.clip(position, lows, highs)
+
+    # Drop collapsed triangles and duplicates of the same cluster triple
+    a_, b_, c_ = corner_cluster[:, 0], corner_cluster[:, 1], corner_cluster[:, 2]
+    alive = (a_ != b_) & (b_ != c_) & (a_ != c_)
+    new_faces = faces[alive].copy()
+    new_faces[:, :, 0] = corner_cluster[alive]
+    if len(new_faces):
+        _, first = np.unique(np.sort(new_faces[:, :, 0], axis=1), axis=0, return_index=True)
+        new_faces = new_faces[np.sort(first)]
+    return position.astype(np.float32), new_faces.astype(np.int32)
+
+
+def simplify(vertices, faces, target, iterations=12):
+    # Closest result with at most `target` triangles (or the coarsest one tried)
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int32).reshape(-1, 3, 2)
+    if target >= len(faces) or not len(faces):
+        return vertices.astype(np.float32), faces.copy()
+
+    quadrics = face_quadrics(vertices, faces)
+    low, high = 1, max(2, int(math.ceil(math.sqrt(len(faces)) * 2)))
+    best = None
+    for _ in range(iterations):
+        if low > high:
+            break
+        middle = (low + high) // 2
+        result = _cluster(vertices, faces, quadrics, middle)
+        if len(result[1]) <= target:
+            best = result
+            low = middle + 1
+        else:
+            high = middle - 1
+    return best if best is not None else _cluster(vertices, faces, quadrics, 1)
+
+
+def build_lods(vertices, faces, ratios=DEFAULT_RATIOS):
+    # [(vertices, faces), ...], one per ratio of the original triangle count
+    count = len(faces)
+    return [simplify(vertices, faces, max(1, int(count * ratio))) for ratio in ratios]
+
+# --- CACHE ---
+
+def load_lods(path, ratios=DEFAULT_RATIOS, cache=True):
+    # (uvs, levels) for an OBJ file, levels cached in a sidecar next to the asset
+    cache_path = path + LOD_SUFFIX
+    key = dict(source_key(path), ratios=[float(ratio) for ratio in ratios])
+    if cache:
+        arrays = load_cache(cache_path, key)
+        if arrays is not None:
+            levels = [(arrays["vertices_%d" % i], arrays["faces_%d" % i]) for i in range(len(ratios))]
+            return arrays["uvs"], levels
+
+    mesh = load_obj_arrays(path, cache)
+    levels = build_lods(mesh["vertices"], mesh["faces"], ratios)
+    if cache:
+        arrays = {"uvs": np.asarray(mesh["uvs"])}
+        for i, (level_vertices, level_faces) in enumerate(levels):
+            arrays["vertices_%d" % i] = level_vertices
+            arrays["faces_%d" % i] = level_faces
+        try:
+            save_cache(cache_path, arrays, key)
+        except OSError:
+            pass
+    return mesh["uvs"], levels
+
+# --- LOD OBJECT ---
+# Draws like an Object3D (same transform, texture, bounds from level 0) but picks one
+# of its levels per draw from the camera:
+#   "distance": level i once the camera is further than distances[i - 1]
+#   "screen":   level i once the bounding sphere covers less than screen_sizes[i - 1]
+#               of the screen height
+# A level only changes after crossing its threshold by `hysteresis` (10% by default),
+# so objects sitting on a boundary don't flicker between two levels.
+
+class LODObject3D(Object3D):
+    def __init__(self, camera=None, mode="screen", distances=None, screen_sizes=(0.3, 0.12, 0.05),
+                 hysteresis=0.1, use_buffers=True):
+        super().__init__(use_buffers=use_buffers)
+        self.camera = camera
+        self.mode = mode
+        self.distances = distances
+        self.screen_sizes = screen_sizes
+        self.hysteresis = hysteresis
+        self.levels = [self]
+        self.level = 0
+
+    @classmethod
+    def load(cls, path, camera=None, ratios=DEFAULT_RATIOS, cache=True, **options):
+        obj = cls(camera, **options)
+        uvs, levels = load_lods(path, ratios, cache)
+        obj.set_levels(uvs, levels)
+        return obj
+
+    def set_levels(self, uvs, levels):
+        # levels[0] becomes this object's own mesh, the rest get an Object3D each
+        for level in self.levels[1:]:
+            level.release_buffers()
+        self.vertices, self.uvs, self.faces = levels[0][0], uvs, levels[0][1]
+        self.levels = [self]
+        for vertices, faces in levels[1:]:
+            level = Object3D(use_buffers=self.use_buffers)
+            level.vertices, level.uvs, level.faces = vertices, uvs, faces
+            self.levels.append(level)
+        self.level = min(self.level, len(self.levels) - 1)
+
+    def _metric(self, camera):
+        # Grows as the object gets less important, compared against _thresholds()
+        center, radius = self.bounding_sphere()
+        world = np.asarray(self.position, dtype=float) + center * np.abs(np.asarray(self.scale, dtype=float))
+        distance = float(np.linalg.norm(np.asarray(camera.position, dtype=float) - world))
+        if self.mode == "distance":
+            return distance
+        radius *= float(np.abs(np.asarray(self.scale, dtype=float)).max())
+        coverage = radius / (max(distance, 1e-6) * math.tan(math.radians(camera.fov) / 2))
+        return 1.0 / max(coverage, 1e-12)
+
+    def _thresholds(self):
+        if self.mode == "distance":
+            if self.distances is not None:
+                return list(self.distances)
+            # Default: step down every time the distance grows by ~2.5x, from 10 radii
+            radius = max(self.bounding_sphere()[1], 1e-6)
+            return [radius * 10 * 2.5 ** i for i in range(len(self.levels) - 1)]
+        return [1.0 / size for size in self.screen_sizes]
+
+    def select(self, camera=None):
+        camera = camera or self.camera
+        if camera is None or len(self.levels) == 1:
+            return self.level
+        metric = self._metric(camera)
+        thresholds = self._thresholds()[:len(self.levels) - 1]
+        coarser = sum(metric > t * (1 + self.hysteresis) for t in thresholds)
+        finer = sum(metric > t * (1 - self.hysteresis) for t in thresholds)
+        self.level = min(max(self.level, coarser), finer)
+        return self.level
+
+    def draw(self, ignore_colors=False, wireframe=False, ignore_texture=False):
+        self.select()
+        super().draw(ignore_colors, wireframe, ignore_texture)
+
+    def _draw_mesh(self, textured):
+        level = self.levels[self.level]
+        if level is self:
+            super()._draw_mesh(textured)
+        else:
+            level._draw_mesh(textured)
+
+    def _vertex_count(self):
+        level = self.levels[self.level]
+        return super()._vertex_count() if level is self else level._vertex_count()
+
+    def release_buffers(self):
+        super().release_buffers()
+        for level in self.levels[1:]:
+            level.release_buffers()
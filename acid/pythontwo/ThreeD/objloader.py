@@ -0,0 +1,243 @@
+import os
+import json
+import numpy as np
+from acid.pythontwo.ThreeD.meshprep import optimize_faces, triangulate
+
+# --- OBJ LOADER ---
+# Parses whole blocks of the file at once with numpy instead of one line at a time.
+# Polygons go through meshprep.triangulate (ear clipping, so concave faces come out
+# right) and faces come out as a (T, 3, 2) int32 array of (v_idx, uv_idx) corners,
+# which Object3D can draw as is.
+
+CACHE_SUFFIX = ".acidcache"
+CACHE_MAGIC = b"ACIDOBJ1"
+CACHE_ALIGN = 64
+PARSER_VERSION = 2  # part of the cache key, bump when parse_obj output changes
+
+SPACE, NEWLINE = 32, 10
+
+
+def _line_text(data, starts, ends, line):
+    return data[starts[line]:ends[line]].tobytes()
+
+
+def _parse_numbers(text, dtype):
+    # np.fromstring stops at the first token it can't read (older numpy only warns), so
+    # check that every space separated token came back as a number
+    values = np.fromstring(text, dtype=dtype, sep=" ")
+    raw = np.frombuffer(text, dtype=np.uint8)
+    solid = (raw != SPACE) & (raw != NEWLINE)
+    tokens = np.count_nonzero(solid[1:] & ~solid[:-1]) + int(len(raw) > 0 and solid[0])
+    if values.size != tokens:
+        raise ValueError("OBJ data has a value that is not a number")
+    return values
+
+
+def _parse_floats(data, starts, ends, lengths, rows, width):
+    if not len(rows):
+        return np.zeros((0, width), dtype=np.float32)
+    mask = np.zeros(len(starts), dtype=bool)
+    mask[rows] = True
+    values = _parse_numbers(data[np.repeat(mask, lengths)].tobytes(), np.float32)
+    columns = len(_line_text(data, starts, ends, rows[0]).split())
+    if columns >= width and values.size == columns * len(rows):
+        return np.ascontiguousarray(values.reshape(len(rows), columns)[:, :width])
+
+    # Rows don't all have the same number of components, take them one by one
+    out = np.zeros((len(rows), width), dtype=np.float32)
+    for i, line in enumerate(rows):
+        parts = _line_text(data, starts, ends, line).split()[:width]
+        out[i, :len(parts)] = list(map(float, parts))
+    return out
+
+
+def _parse_corners(text, count):
+    # Returns a (count, 3) int64 array of raw OBJ (v, vt, vn) indices, 0 meaning "missing"
+    out = np.zeros((count, 3), dtype=np.int64)
+    if not count:
+        return out
+
+    filled = text.replace(b"//", b"/0/")
+    width = filled.split(None, 1)[0].count(b"/") + 1
+    values = _parse_numbers(filled.replace(b"/", b" "), np.int64)
+    if values.size == width * count:
+        out[:, :width] = values.reshape(count, width)
+        return out
+
+    # Mixed corner formats in one file, fall back to per-corner parsing
+    for i, corner in enumerate(text.split()):
+        for j, part in enumerate(corner.split(b"/")[:3]):
+            if part:
+                out[i, j] = int(part)
+    return out
+
+
+def _resolve(raw, counts_before, corner_face):
+    # OBJ indices are 1-based, negative ones count back from the last element seen so far
+    resolved = raw - 1
+    negative = raw < 0
+    if negative.any():
+        resolved[negative] = counts_before[corner_face[negative]] + raw[negative]
+    return resolved
+
+
+def parse_obj(path):
+    with open(path, "rb") as file:
+        data = np.frombuffer(file.read(), dtype=np.uint8).copy()
+
+    # Work on the raw bytes: find every line, classify it by its first characters
+    data[(data == 9) | (data == 13)] = SPACE
+    newlines = np.flatnonzero(data == NEWLINE)
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(data)]))
+    lengths = np.diff(np.concatenate((starts, [len(data)])))
+
+    # Comments run from "#" to the end of the line, blank them out
+    hashes = data == ord("#")
+    if hashes.any():
+        seen = np.concatenate(([0], np.cumsum(hashes)))
+        commented = seen[1:] > np.repeat(seen[starts], lengths)
+        data[commented & (data != NEWLINE)] = SPACE
+
+    # Indented lines count too: classify on the first character that isn't a space
+    padded = np.concatenate((data, [SPACE, SPACE, SPACE]))
+    heads = starts.copy()
+    indented = np.flatnonzero(padded[starts] == SPACE)
+    if len(indented):
+        solid = np.concatenate((np.flatnonzero(data != SPACE), [len(data)]))
+        heads[indented] = np.minimum(solid[np.searchsorted(solid, starts[indented])], ends[indented])
+    c0, c1, c2 = padded[heads], padded[heads + 1], padded[heads + 2]
+
+    kinds = np.zeros(len(starts), dtype=np.int8)
+    kinds[(c0 == ord("v")) & (c1 == SPACE)] = 1
+    kinds[(c0 == ord("v")) & (c1 == ord("t")) & (c2 == SPACE)] = 2
+    kinds[(c0 == ord("v")) & (c1 == ord("n")) & (c2 == SPACE)] = 3
+    kinds[(c0 == ord("f")) & (c1 == SPACE)] = 4
+
+    # Blank out the keywords so each block is just numbers
+    data[heads[kinds == 1]] = SPACE
+    data[heads[kinds == 4]] = SPACE
+    for k in (2, 3):
+        data[heads[kinds == k]] = SPACE
+        data[heads[kinds == k] + 1] = SPACE
+
+    vertices = _parse_floats(data, starts, ends, lengths, np.flatnonzero(kinds == 1), 3)
+    uvs = _parse_floats(data, starts, ends, lengths, np.flatnonzero(kinds == 2), 2)
+    normals = _parse_floats(data, starts, ends, lengths, np.flatnonzero(kinds == 3), 3)
+
+    # Corners per polygon = tokens per face line
+    face_rows = np.flatnonzero(kinds == 4)
+    face_bytes = data[np.repeat(kinds == 4, lengths)]
+    solid = (face_bytes != SPACE) & (face_bytes != NEWLINE)
+    token_start = solid & ~np.concatenate(([False], solid[:-1]))
+    if len(face_rows):
+        offsets = np.cumsum(lengths[face_rows]) - lengths[face_rows]
+        sizes = np.add.reduceat(token_start, offsets, dtype=np.int64)
+    else:
+        sizes = np.zeros(0, dtype=np.int64)
+    corners = _parse_corners(face_bytes.tobytes(), int(sizes.sum()))
+    corner_face = np.repeat(np.arange(len(face_rows)), sizes)
+
+    # How many v/vt/vn lines came before each face, for negative indices
+    before = [np.cumsum(kinds == k)[face_rows] for k in (1, 2, 3)]
+    v_idx = _resolve(corners[:, 0], before[0], corner_face)
+    uv_idx = np.where(corners[:, 1] == 0, 0, _resolve(corners[:, 1], before[1], corner_face))
+    vn_idx = np.where(corners[:, 2] == 0, -1, _resolve(corners[:, 2], before[2], corner_face))
+
+    columns = np.stack([v_idx, uv_idx, vn_idx], axis=1)
+    triangles, polygon = triangulate(vertices, columns, sizes)
+    return {
+        "vertices": vertices,
+        "uvs": uvs,
+        "normals": normals,
+        "faces": np.ascontiguousarray(triangles[:, :, :2]),
+        "face_normals": np.ascontiguousarray(triangles[:, :, 2]),
+        "polygon": polygon,
+    }
+
+# --- BINARY CACHE ---
+# Sidecar file: magic, header length, JSON header, then raw arrays aligned so they can be
+# memory-mapped straight back without parsing anything.
+
+def source_key(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "parser": PARSER_VERSION}
+
+
+def save_cache(path, arrays, key):
+    header = {"key": key, "arrays": {}}
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = [array.dtype.str, list(array.shape), offset]
+        offset += -(-array.nbytes // CACHE_ALIGN) * CACHE_ALIGN
+
+    blob = json.dumps(header).encode("utf-8")
+    start = -(-(len(CACHE_MAGIC) + 8 + len(blob)) // CACHE_ALIGN) * CACHE_ALIGN
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(CACHE_MAGIC)
+        file.write(len(blob).to_bytes(8, "little"))
+        file.write(blob)
+        for name, array in arrays.items():
+            file.seek(start + header["arrays"][name][2])
+            file.write(np.ascontiguousarray(array).tobytes())
+        file.truncate(start + offset)
+    os.replace(tmp_path, path)
+
+
+def load_cache(path, key):
+    try:
+        with open(path, "rb") as file:
+            if file.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                return None
+            size = int.from_bytes(file.read(8), "little")
+            header = json.loads(file.read(size).decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+    if header.get("key") != key:
+        return None
+
+    start = -(-(len(CACHE_MAGIC) + 8 + size) // CACHE_ALIGN) * CACHE_ALIGN
+    arrays = {}
+    for name, (dtype, shape, offset) in header["arrays"].items():
+        if 0 in shape:
+            arrays[name] = np.zeros(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=start + offset, shape=tuple(shape))
+    return arrays
+
+
+def optimize_arrays(arrays):
+    # Reorder the triangles for the vertex cache (tipsify), per-triangle arrays follow
+    order = optimize_faces(arrays["faces"])
+    optimized = dict(arrays)
+    for name in ("faces", "face_normals", "polygon"):
+        optimized[name] = np.ascontiguousarray(np.asarray(arrays[name])[order])
+    return optimized
+
+
+def load_obj_arrays(path, cache=True, optimize=False):
+    # optimize: vertex cache friendly triangle order, slower to parse but cached as such
+    cache_path = path + CACHE_SUFFIX
+    key = source_key(path)
+    if optimize:
+        key["optimized"] = True
+    if cache:
+        arrays = load_cache(cache_path, key)
+        if arrays is not None:
+            return arrays
+
+    arrays = parse_obj(path)
+    if optimize:
+        arrays = optimize_arrays(arrays)
+    if cache:
+        try:
+            save_cache(cache_path, arrays, key)
+        except OSError:
+            pass  # read-only asset folder, just skip the cache
+    return arrays
+
+
+def load_obj(path, cache=True, optimize=False):
+    arrays = load_obj_arrays(path, cache, optimize)
+    return arrays["vertices"], arrays["uvs"], arrays["faces"]
@@ -0,0 +1,289 @@
+import numpy as np
+
+# --- PHYSICS WORLD ---
+# Every body lives in structure-of-arrays numpy buffers (position, velocity, inverse
+# mass, shape). A step is: integrate everything at once, find candidate pairs with a
+# uniform grid, test them as spheres/AABBs, push them apart and bounce them.
+# Shapes are centered on Object3D.position; boxes are axis aligned.
+# A body's Object3D.position/velocity are views of its rows, so results need no
+# write back. The rows live in arrays with spare capacity and only move (and get
+# re-linked) when those grow or a body is removed.
+
+SPHERE, BOX = 0, 1
+
+# Cell coordinates packed into one int64 key, 21 bits per axis
+_BITS = 21
+_BIAS = 1 << (_BITS - 1)
+_MASK = (1 << _BITS) - 1
+
+# Own cell plus the 13 neighbours "after" it, so every pair of cells is visited once
+_OFFSETS = [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+            if (dx, dy, dz) >= (0, 0, 0)]
+# Moving one cell along an axis just adds a constant to the packed key
+_KEY_STEPS = [(dx << (2 * _BITS)) + (dy << _BITS) + dz for dx, dy, dz in _OFFSETS]
+
+
+def _cell_keys(cells):
+    cells = (cells + _BIAS) & _MASK
+    return (cells[:, 0] << (2 * _BITS)) | (cells[:, 1] << _BITS) | cells[:, 2]
+
+
+def _expand(counts):
+    # For counts [2, 3] -> owner [0, 0, 1, 1, 1], local [0, 1, 0, 1, 2]
+    owner = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, local
+
+
+class PhysicsWorld:
+    def __init__(self, gravity=(0.0, -9.81, 0.0), timestep=1 / 60, max_steps=5, cell_size=None,
+                 restitution=0.3, correction=0.8):
+        self.gravity = np.array(gravity, dtype=np.float64)
+        self.timestep = timestep
+        self.max_steps = max_steps
+        self.cell_size = cell_size  # None = twice the largest body
+        self.restitution = restitution
+        self.correction = correction  # how much of the overlap gets pushed out per step
+        self.accumulator = 0.0
+        self.contacts = 0
+
+        self.bodies = []
+        self._positions = np.zeros((0, 3))  # capacity rows, position/velocity are the used part
+        self._velocities = np.zeros((0, 3))
+        self.position = self._positions
+        self.velocity = self._velocities
+        self.inv_mass = np.zeros(0)
+        self.shape = np.zeros(0, dtype=np.int8)
+        self.radius = np.zeros(0)
+        self.half_extents = np.zeros((0, 3))
+        self._slots = {}
+
+    def __len__(self):
+        return len(self.bodies)
+
+    def add(self, obj, shape=SPHERE, radius=None, half_extents=None, static=False):
+        scale = np.abs(np.asarray(obj.scale, dtype=np.float64))
+        low, high = obj.local_bounds()
+        if radius is None:
+            radius = obj.bounding_sphere()[1] * scale.max()
+        if half_extents is None:
+            half_extents = (high - low) / 2 * scale
+        inv_mass = 0.0 if static or obj.mass <= 0 else 1.0 / obj.mass
+
+        self._append([obj])
+        self.inv_mass = np.append(self.inv_mass, inv_mass)
+        self.shape = np.append(self.shape, np.int8(shape))
+        self.radius = np.append(self.radius, float(radius))
+        self.half_extents = np.vstack((self.half_extents, np.asarray(half_extents, dtype=np.float64)))
+        return obj
+
+    def add_many(self, objects, shape=SPHERE, static=False):
+        # Same as add() for each object, but grows the arrays once
+        if not objects:
+            return
+        scales = np.abs(np.array([obj.scale for obj in objects], dtype=np.float64))
+        bounds = [obj.local_bounds() for obj in objects]
+        sizes = np.array([high - low for low, high in bounds])
+        masses = np.array([obj.mass for obj in objects], dtype=np.float64)
+
+        self._append(objects)
+        inv_mass = np.divide(1.0, masses, out=np.zeros_like(masses), where=masses > 0)
+        self.inv_mass = np.concatenate((self.inv_mass, np.zeros_like(masses) if static else inv_mass))
+        self.shape = np.concatenate((self.shape, np.full(len(objects), shape, dtype=np.int8)))
+        self.radius = np.concatenate((self.radius, np.linalg.norm(sizes, axis=1) / 2 * scales.max(axis=1)))
+        self.half_extents = np.vstack((self.half_extents, sizes / 2 * scales))
+
+    def _append(self, objects):
+        for obj in objects:
+            if obj._world is not None:
+                raise ValueError("object is already in a PhysicsWorld")
+        start = len(self.bodies)
+        count = start + len(objects)
+        positions = np.array([obj.position for obj in objects], dtype=np.float64).reshape(-1, 3)
+        velocities = np.array([obj.velocity for obj in objects], dtype=np.float64).reshape(-1, 3)
+        relink = 0 if count > len(self._positions) else start
+        if count > len(self._positions):
+            # Doubling, so the O(bodies) re-link below happens O(log bodies) times
+            capacity = max(count, 2 * len(self._positions), 64)
+            for name in ("_positions", "_velocities"):
+                grown = np.zeros((capacity, 3))
+                grown[:start] = getattr(self, name)[:start]
+                setattr(self, name, grown)
+        self._positions[start:count] = positions
+        self._velocities[start:count] = velocities
+        for i, obj in enumerate(objects):
+            self._slots[id(obj)] = start + i
+        self.bodies.extend(objects)
+        self._link(relink)
+
+    def _link(self, start=0):
+        # Point the objects from slot start on at their rows
+        count = len(self.bodies)
+        self.position = self._positions[:count]
+        self.velocity = self._velocities[:count]
+        for slot in range(start, count):
+            body = self.bodies[slot]
+            body._world = self
+            body._position = self.position[slot]
+            body._velocity = self.velocity[slot]
+
+    def remove(self, obj):
+        slot = self._slots.pop(id(obj), None)
+        if slot is None:
+            return
+        # The object keeps a copy of where it was left
+        obj._world = None
+        obj._position = tuple(self.position[slot].tolist())
+        obj._velocity = tuple(self.velocity[slot].tolist())
+        del self.bodies[slot]
+        count = len(self.bodies)
+        for name in ("_positions", "_velocities"):
+            rows = getattr(self, name)
+            rows[slot:count] = rows[slot + 1:count + 1]
+        for name in ("inv_mass", "shape", "radius", "half_extents"):
+            setattr(self, name, np.delete(getattr(self, name), slot, axis=0))
+        self._slots = {id(o): i for i, o in enumerate(self.bodies)}
+        self._link(slot)
+
+    def update(self, frame_time):
+        # Fixed timestep: run as many steps as the frame time covers, capped by max_steps
+        self.accumulator += frame_time
+        steps = 0
+        while self.accumulator >= self.timestep and steps < self.max_steps:
+            self.step(self.timestep)
+            self.accumulator -= self.timestep
+            steps += 1
+        if steps == self.max_steps:
+            self.accumulator = min(self.accumulator, self.timestep)
+        return steps
+
+    def step(self, dt):
+        self.contacts = 0
+        if not self.bodies:
+            return
+        dynamic = (self.inv_mass > 0)[:, None]
+        self.velocity += self.gravity * dt * dynamic
+        self.position += self.velocity * dt * dynamic
+
+        i, j = self.broadphase()
+        if len(i):
+            self._resolve(i, j, *self.narrowphase(i, j))
+
+    def broadphase(self):
+        # Candidate pairs (i, j) from bodies sharing or touching a grid cell
+        reach = np.where(self.shape == BOX, np.linalg.norm(self.half_extents, axis=1), self.radius)
+        cell_size = self.cell_size or max(2 * float(reach.max()), 1e-6)
+        cells = np.floor(self.position / cell_size).astype(np.int64)
+        keys = _cell_keys(cells)
+
+        order = np.argsort(keys, kind="stable")
+        cell_keys, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+        pairs_i, pairs_j = [], []
+        for step in _KEY_STEPS:
+            if step:
+                # cell_keys is sorted, so the shifted keys are too and the lookup stays cheap
+                neighbour_keys = cell_keys + step
+                found = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+                a = np.flatnonzero(cell_keys[found] == neighbour_keys)
+                b = found[a]
+            else:
+                a = b = np.arange(len(cell_keys))
+
+            # Every member of cell a against every member of cell b
+            per_pair = counts[a] * counts[b]
+            owner, local = _expand(per_pair)
+            first = local // counts[b][owner]
+            second = local % counts[b][owner]
+            if not step:
+                keep = first < second
+                owner, first, second = owner[keep], first[keep], second[keep]
+            pairs_i.append(order[starts[a][owner] + first])
+            pairs_j.append(order[starts[b][owner] + second])
+
+        i, j = np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+        # Same-cell neighbours are often still far apart, drop pairs whose bounding
+        # spheres miss and pairs where neither body can move
+        delta = self.position[j] - self.position[i]
+        close = np.einsum('ij,ij->i', delta, delta) <= (reach[i] + reach[j]) ** 2
+        keep = close & ((self.inv_mass[i] > 0) | (self.inv_mass[j] > 0))
+        return i[keep], j[keep]
+
+    def narrowphase(self, i, j):
+        # Contact normal (pointing from i to j) and penetration depth per candidate pair
+        delta = self.position[j] - self.position[i]
+        normal = np.zeros_like(delta)
+        depth = np.full(len(i), -1.0)
+        box_i, box_j = self.shape[i] == BOX, self.shape[j] == BOX
+
+        spheres = ~box_i & ~box_j
+        if spheres.any():
+            d = delta[spheres]
+            dist = np.linalg.norm(d, axis=1)
+            safe = np.where(dist > 0, dist, 1.0)
+            normal[spheres] = np.where((dist > 0)[:, None], d / safe[:, None], (0.0, 1.0, 0.0))
+            depth[spheres] = self.radius[i[spheres]] + self.radius[j[spheres]] - dist
+
+        boxes = box_i & box_j
+        if boxes.any():
+            d = delta[boxes]
+            overlap = self.half_extents[i[boxes]] + self.half_extents[j[boxes]] - np.abs(d)
+            axis = np.argmin(overlap, axis=1)
+            rows = np.arange(len(axis))
+            n = np.zeros_like(d)
+            n[rows, axis] = np.where(d[rows, axis] < 0, -1.0, 1.0)
+            normal[boxes] = n
+            depth[boxes] = overlap[rows, axis]
+
+        mixed = box_i != box_j
+        if mixed.any():
+            # Work from the box towards the sphere, flip when the sphere is i
+            flip = np.where(box_i[mixed], 1.0, -1.0)[:, None]
+            box = np.where(box_i[mixed], i[mixed], j[mixed])
+            ball = np.where(box_i[mixed], j[mixed], i[mixed])
+            local = self.position[ball] - self.position[box]
+            half = self.half_extents[box]
+            closest = np.clip(local, -half, half)
+            diff = local - closest
+            dist = np.linalg.norm(diff, axis=1)
+            outside = dist > 0
+
+            n = np.zeros_like(local)
+            n[outside] = diff[outside] / dist[outside][:, None]
+            pen = self.radius[ball] - dist
+            if (~outside).any():
+                # Sphere center inside the box, push out along the shallowest axis
+                inner = half[~outside] - np.abs(local[~outside])
+                axis = np.argmin(inner, axis=1)
+                rows = np.arange(len(axis))
+                m = np.zeros_like(inner)
+                m[rows, axis] = np.where(local[~outside][rows, axis] < 0, -1.0, 1.0)
+                n[~outside] = m
+                pen[~outside] = self.radius[ball][~outside] + inner[rows, axis]
+            normal[mixed] = n * flip
+            depth[mixed] = pen
+
+        return normal, depth
+
+    def _resolve(self, i, j, normal, depth):
+        hit = depth > 0
+        i, j, normal, depth = i[hit], j[hit], normal[hit], depth[hit]
+        self.contacts = len(i)
+        if not len(i):
+            return
+        inv_i, inv_j = self.inv_mass[i], self.inv_mass[j]
+        total = inv_i + inv_j
+        count = len(self.bodies)
+
+        def scatter(values, index):
+            return np.stack([np.bincount(index, values[:, k], count) for k in range(3)], axis=1)
+
+        # Push apart, split by inverse mass
+        push = normal * (depth * self.correction / total)[:, None]
+        self.position += scatter(push * inv_j[:, None], j) - scatter(push * inv_i[:, None], i)
+
+        # Bounce along the normal when the pair is moving together
+        closing = np.einsum('ij,ij->i', self.velocity[j] - self.velocity[i], normal)
+        impulse = np.where(closing < 0, -(1 + self.restitution) * closing / total, 0.0)[:, None] * normal
+        self.velocity += scatter(impulse * inv_j[:, None], j) - scatter(impulse * inv_i[:, None], i)
@@ -0,0 +1,209 @@
+from collections import namedtuple
+import numpy as np
+from acid.pythontwo.ThreeD.scene import world_boxes
+
+# --- PICKING ---
+# Screen point -> world ray through inverse(P @ V), then:
+#   1. slab test against every object's world AABB (the same boxes Scene culls with),
+#      nearest box first, stopping once a box starts behind the best hit
+#   2. ray moved into the object's local space, walked down its mesh BVH
+#   3. Moller-Trumbore on the triangles of the leaves it reached, a batch of leaves
+#      at a time in entry order
+# Distances are world units along the normalized ray, so hits on different objects
+# compare directly.
+#
+#   hit = engine.pick(scene)          # under the mouse; or scene.pick(origin, direction)
+#   if hit:
+#       print(hit.object, hit.face, hit.barycentric, hit.distance)
+
+# face: index into obj.faces, triangle: index into obj.triangles(), barycentric: weights
+# of that triangle's three corners, point: world position of the hit
+Hit = namedtuple("Hit", "object face triangle barycentric distance point")
+
+LEAF_SIZE = 16
+BRANCHING = 8
+LEAVES_PER_BATCH = 32
+START_NODES = 64
+
+
+def screen_ray(camera, x, y, width, height):
+    # Pixel (x, y), origin top-left like pygame -> (origin, unit direction) in world space
+    if hasattr(camera, "update_vectors"):
+        camera.update_vectors()
+    inverse = np.linalg.inv((camera.projection_matrix() @ camera.view_matrix()).m)
+    ndc_x = 2.0 * (x + 0.5) / width - 1.0
+    ndc_y = 1.0 - 2.0 * (y + 0.5) / height
+    ends = np.array([[ndc_x, ndc_y, -1.0, 1.0], [ndc_x, ndc_y, 1.0, 1.0]]) @ inverse.T
+    near, far = ends[:, :3] / ends[:, 3:]
+    direction = far - near
+    return near, direction / np.linalg.norm(direction)
+
+
+def ray_boxes(origin, direction, lows, highs):
+    # Slab test for (N, 3) boxes -> (entry, exit) distances, no hit where entry > exit
+    # (or where either is NaN)
+    inverse = 1.0 / np.where(direction == 0, 1e-30, direction)
+    near = (lows - origin) * inverse
+    far = (highs - origin) * inverse
+    entry = np.maximum(np.minimum(near, far).max(axis=1), 0.0)
+    return entry, np.maximum(near, far).min(axis=1)
+
+
+def ray_triangles(origin, direction, v0, e1, e2, normal=None):
+    # Moller-Trumbore over (K, 3) arrays, both faces count since GL draws both.
+    # Returns (t, u, v) with t = inf where the ray misses. The per-row cross products
+    # are rewritten as triple products: d x X is one matmul with d's cross matrix, and
+    # e2 . (s x e1) = s . (e1 x e2), so a precomputed normal saves the rest.
+    dx, dy, dz = direction
+    cross_d = np.array([[0.0, dz, -dy], [-dz, 0.0, dx], [dy, -dx, 0.0]])  # X @ cross_d = d x X
+    if normal is None:
+        normal = np.cross(e1, e2)
+    p = e2 @ cross_d
+    det = np.einsum('ij,ij->i', e1, p)
+    s = origin - v0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv = 1.0 / det
+        u = np.einsum('ij,ij->i', s, p) * inv
+        v = np.einsum('ij,ij->i', e1, s @ cross_d) * inv
+        t = np.einsum('ij,ij->i', s, normal) * inv
+        hit = (det != 0) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0)
+    return np.where(hit, t, np.inf), u, v
+
+
+def _morton(points):
+    # 30-bit Morton codes of (N, 3) points, 10 bits per axis
+    low, high = points.min(axis=0), points.max(axis=0)
+    cells = ((points - low) / np.maximum(high - low, 1e-12) * 1023).astype(np.uint64)
+    code = np.zeros(len(points), dtype=np.uint64)
+    for bit in range(10):
+        for axis in range(3):
+            code |= ((cells[:, axis] >> np.uint64(bit)) & np.uint64(1)) << np.uint64(3 * bit + 2 - axis)
+    return code
+
+# --- MESH BVH ---
+# Triangles sorted along a Morton curve and cut into leaves of LEAF_SIZE, then an
+# implicit BRANCHING-wide tree on top: node i of a level has children
+# i * BRANCHING ... i * BRANCHING + BRANCHING - 1 on the next one. Building is a sort
+# and a few reductions, and a query tests all the children of a level in one go.
+
+class MeshBVH:
+    def __init__(self, vertices, triangles, polygon=None, leaf_size=LEAF_SIZE, branching=BRANCHING):
+        # triangles: (T, 3, 2) corners like Object3D.triangles(), polygon: the face each
+        # one came from (default: its own index)
+        self.leaf_size = leaf_size
+        self.branching = branching
+        vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+        triangles = np.asarray(triangles).reshape(-1, 3, 2)
+        self.polygon = np.arange(len(triangles)) if polygon is None else np.asarray(polygon)
+        corners = vertices[triangles[:, :, 0]]
+        count = len(corners)
+        self.count = count
+
+        self.order = np.argsort(_morton(corners.mean(axis=1)), kind="stable") if count else \
+            np.zeros(0, dtype=np.int64)
+        corners = corners[self.order]
+        # (T, 4, 3) rows of v0, e1, e2, e1 x e2, one gather per batch of leaves
+        e1 = corners[:, 1] - corners[:, 0]
+        e2 = corners[:, 2] - corners[:, 0]
+        self.triangles = np.stack((corners[:, 0], e1, e2, np.cross(e1, e2)), axis=1).astype(np.float32)
+
+        # Leaf boxes, padded to a full tree with NaN boxes that no ray hits, then reduced
+        # level by level (fmin/fmax skip the NaNs)
+        leaves = max(1, -(-count // leaf_size))
+        depth = 0
+        while branching ** depth < leaves:
+            depth += 1
+        width = branching ** depth
+        lows = np.full((width, 3), np.nan)
+        highs = np.full((width, 3), np.nan)
+        if count:
+            starts = np.arange(0, count, leaf_size)
+            lows[:len(starts)] = np.minimum.reduceat(corners.min(axis=1), starts)
+            highs[:len(starts)] = np.maximum.reduceat(corners.max(axis=1), starts)
+        self.lows = [lows]
+        self.highs = [highs]
+        while len(self.lows[0]) > 1:
+            self.lows.insert(0, np.fmin.reduce(self.lows[0].reshape(-1, branching, 3), axis=1))
+            self.highs.insert(0, np.fmax.reduce(self.highs[0].reshape(-1, branching, 3), axis=1))
+
+    def leaves(self, origin, direction, max_distance=np.inf):
+        # (leaf indices, entry distances) of the leaves the ray passes through. Testing
+        # dozens of boxes costs about the same as one, so start a few levels down.
+        first = max(level for level, lows in enumerate(self.lows) if len(lows) <= START_NODES)
+        nodes = np.arange(len(self.lows[first]))
+        entry = np.zeros(len(nodes))
+        for level in range(first, len(self.lows)):
+            if level > first:
+                nodes = (nodes[:, None] * self.branching + np.arange(self.branching)).reshape(-1)
+            entry, leave = ray_boxes(origin, direction, self.lows[level][nodes], self.highs[level][nodes])
+            keep = (entry <= leave) & (entry <= max_distance)
+            nodes, entry = nodes[keep], entry[keep]
+            if not len(nodes):
+                break
+        return nodes, entry
+
+    def intersect(self, origin, direction, max_distance=np.inf):
+        # Nearest hit as (sorted triangle index, t, u, v), or None
+        if not self.count:
+            return None
+        leaves, entry = self.leaves(origin, direction, max_distance)
+        order = np.argsort(entry)
+        leaves, entry = leaves[order], entry[order]
+        best = None
+        local = np.arange(self.leaf_size)
+        for start in range(0, len(leaves), LEAVES_PER_BATCH):
+            if entry[start] > max_distance:
+                break
+            items = (leaves[start:start + LEAVES_PER_BATCH, None] * self.leaf_size + local).reshape(-1)
+            items = items[items < self.count]
+            batch = self.triangles[items]
+            t, u, v = ray_triangles(origin, direction, batch[:, 0], batch[:, 1], batch[:, 2], batch[:, 3])
+            nearest = int(np.argmin(t))
+            if t[nearest] < max_distance:
+                max_distance = float(t[nearest])
+                best = (int(items[nearest]), max_distance, float(u[nearest]), float(v[nearest]))
+        return best
+
+
+def mesh_bvh(obj):
+    # Built on first use, kept on the object until its mesh changes
+    cached = getattr(obj, "_pick_bvh", None)
+    if cached is None or cached[0] != obj.mesh_version:
+        cached = (obj.mesh_version, MeshBVH(obj.vertices, obj.triangles(), obj.triangle_faces()))
+        obj._pick_bvh = cached
+    return cached[1]
+
+
+def pick(objects, origin, direction, boxes=None, max_distance=np.inf):
+    # Nearest Hit along the ray among objects, or None. boxes: their (lows, highs) world
+    # AABBs when the caller already has them (Scene does).
+    if not len(objects):
+        return None
+    origin = np.asarray(origin, dtype=np.float64)
+    direction = np.asarray(direction, dtype=np.float64)
+    direction = direction / np.linalg.norm(direction)
+    lows, highs = world_boxes(objects) if boxes is None else boxes
+    entry, leave = ray_boxes(origin, direction, lows, highs)
+    candidates = np.flatnonzero((entry <= leave) & (entry <= max_distance))
+
+    best = None
+    for slot in candidates[np.argsort(entry[candidates])].tolist():
+        if entry[slot] > max_distance:
+            break
+        obj = objects[slot]
+        model = obj.model_matrix()
+        inverse = np.linalg.inv(model.m)
+        # Unnormalized local direction keeps t in world units
+        found = mesh_bvh(obj).intersect(inverse[:3, :3] @ origin + inverse[:3, 3], inverse[:3, :3] @ direction,
+                                        max_distance)
+        if found is not None:
+            best = (obj, found)
+            max_distance = found[1]
+
+    if best is None:
+        return None
+    obj, (sorted_index, distance, u, v) = best
+    bvh = mesh_bvh(obj)
+    triangle = int(bvh.order[sorted_index])
+    return Hit(obj, int(bvh.polygon[triangle]), triangle, np.array([1.0 - u - v, u, v]), distance,
+               origin + direction * distance)
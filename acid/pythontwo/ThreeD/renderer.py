@@ -4,9 +4,19 @@ from OpenGL.GL import *
 from OpenGL.GLU import *
 import numpy as np
 import math
+import ctypes
+import logging
 import OpenGL
+from acid.pythontwo.ThreeD.objloader import load_obj, load_obj_arrays
+from acid.pythontwo.ThreeD.textures import texture_manager, GlyphAtlas
+from acid.pythontwo.ThreeD.meshprep import triangulate, weld
+from acid.pythontwo.ThreeD.picking import screen_ray, pick
+from acid.pythontwo.math.matrixes.matrix import Matrix4
+import acid.pythontwo.profiler.profiler as profiler
+from acid.pythontwo.scheduler.scheduler import Scheduler
 
-print("[ACID BOOST] Accelerate loaded?", OpenGL.USE_ACCELERATE)
+logger = logging.getLogger(__name__)
+logger.debug("[ACID BOOST] Accelerate loaded? %s", OpenGL.USE_ACCELERATE)
 
 # --- CONFIGURATION ---
 SCREEN_SIZE       = (800, 600)
@@ -15,18 +25,32 @@ MOVE_SPEED        = 0.1
 MOUSE_SENSITIVITY = 0.15
 
 # --- ACIDUI ---
+# Immediate-mode calls only queue quads: x0, y0, x1, y1, u0, v0, u1, v1, r, g, b, a.
+# end() turns the whole frame into one vertex/uv/colour array and draws it with one
+# glDrawArrays per glyph atlas in use. Plain quads sample the atlas' white block, so
+# with a single font the whole overlay is one draw call.
 
 class AcidUI:
     mouse_pos = (0, 0)
     mouse_down = False
     mouse_up = False
+    font = None  # pygame font name, None = pygame's default font
+    font_size = 16
+    _profile_start = None
+    _chunks = []   # (rows, atlas) in draw order, atlas None for plain quads
+    _pending = []  # plain quads not yet moved into _chunks
+    _atlases = {}
 
     @staticmethod
     def begin(width, height):
+        if profiler.active is not None:
+            AcidUI._profile_start = profiler.now()
         AcidUI.mouse_pos = pygame.mouse.get_pos()
         AcidUI.mouse_pos = (AcidUI.mouse_pos[0], height - AcidUI.mouse_pos[1])
         AcidUI.mouse_down = pygame.mouse.get_pressed()[0]
         AcidUI.mouse_up = not AcidUI.mouse_down
+        AcidUI._chunks = []
+        AcidUI._pending = []
 
         glMatrixMode(GL_PROJECTION)
         glPushMatrix()
@@ -40,21 +64,101 @@ class AcidUI:
 
     @staticmethod
     def end():
+        AcidUI.flush()
         glEnable(GL_DEPTH_TEST)
         glPopMatrix()
         glMatrixMode(GL_PROJECTION)
         glPopMatrix()
         glMatrixMode(GL_MODELVIEW)
 
+        prof = profiler.active
+        if prof is not None and AcidUI._profile_start is not None:
+            prof.record("ui", AcidUI._profile_start)
+            AcidUI._profile_start = None
+
+    @staticmethod
+    def atlas(font=None, size=None):
+        key = (font or AcidUI.font, size or AcidUI.font_size)
+        atlas = AcidUI._atlases.get(key)
+        if atlas is None:
+            atlas = AcidUI._atlases[key] = GlyphAtlas(*key)
+        return atlas
+
+    @staticmethod
+    def _move_pending():
+        if AcidUI._pending:
+            AcidUI._chunks.append((np.array(AcidUI._pending, dtype=np.float32), None))
+            AcidUI._pending = []
+
+    @staticmethod
+    def flush():
+        # Draw everything queued so far, normally called by end()
+        AcidUI._move_pending()
+        chunks, AcidUI._chunks = AcidUI._chunks, []
+        if not chunks:
+            return
+
+        # Plain quads join the atlas drawn before them (or the first one) via its white block
+        fallback = next((atlas for _, atlas in chunks if atlas is not None), None)
+        runs = []
+        for rows, atlas in chunks:
+            if atlas is None:
+                atlas = runs[-1][1] if runs else fallback
+                if atlas is not None:
+                    rows[:, 4:8] = atlas.white_uv * 2
+            if runs and runs[-1][1] is atlas:
+                runs[-1][0].append(rows)
+            else:
+                runs.append(([rows], atlas))
+
+        quads = np.concatenate([rows for group, _ in runs for rows in group])
+        positions = np.stack((quads[:, [0, 2, 2, 0]], quads[:, [1, 1, 3, 3]]), axis=2).reshape(-1, 2)
+        uvs = np.stack((quads[:, [4, 6, 6, 4]], quads[:, [5, 5, 7, 7]]), axis=2).reshape(-1, 2)
+        colors = np.repeat(quads[:, 8:12], 4, axis=0)
+
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT | GL_TEXTURE_BIT | GL_CURRENT_BIT)
+        glPushClientAttrib(GL_CLIENT_VERTEX_ARRAY_BIT)
+        glEnable(GL_BLEND)
+        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, positions)
+        glTexCoordPointer(2, GL_FLOAT, 0, uvs)
+        glColorPointer(4, GL_FLOAT, 0, colors)
+
+        first = 0
+        for group, atlas in runs:
+            count = 4 * sum(len(rows) for rows in group)
+            if atlas is None:
+                glDisable(GL_TEXTURE_2D)
+            else:
+                glEnable(GL_TEXTURE_2D)
+                glBindTexture(GL_TEXTURE_2D, atlas.texture())
+            glDrawArrays(GL_QUADS, first, count)
+            first += count
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glPopClientAttrib()
+        glPopAttrib()
+
+        prof = profiler.active
+        if prof is not None:
+            prof.count("draw_calls", len(runs))
+            prof.count("ui_quads", len(quads))
+
     @staticmethod
     def draw_quad(x, y, w, h, color=(1.0, 1.0, 1.0, 1.0)):
-        glColor4f(*color)
-        glBegin(GL_QUADS)
-        glVertex2f(x, y)
-        glVertex2f(x + w, y)
-        glVertex2f(x + w, y + h)
-        glVertex2f(x, y + h)
-        glEnd()
+        r, g, b, a = color
+        AcidUI._pending.append((x, y, x + w, y + h, 0.0, 0.0, 0.0, 0.0, r, g, b, a))
+
+    @staticmethod
+    def text(label, x, y, color=(1.0, 1.0, 1.0, 1.0), size=None, font=None):
+        # (x, y) is the bottom left of the line; returns the width drawn
+        atlas = AcidUI.atlas(font, size)
+        glyphs = atlas.layout(label, x, y)
+        AcidUI._move_pending()
+        AcidUI._chunks.append((np.hstack((glyphs, np.tile(np.asarray(color, dtype=np.float32), (len(glyphs), 1)))), atlas))
+        return float(glyphs[-1, 2] - x) if len(glyphs) else 0.0
 
     @staticmethod
     def is_hover(x, y, w, h):
@@ -62,7 +166,8 @@ class AcidUI:
         return x <= mx <= x + w and y <= my <= y + h
 
     @staticmethod
-    def button(label, x, y, w, h, func, color=(0.2, 0.7, 1.0, 1.0), hover_color=(0.3, 0.8, 1.0, 1.0), click_color=(0.1, 0.6, 0.9, 1.0)):
+    def button(label, x, y, w, h, func, color=(0.2, 0.7, 1.0, 1.0), hover_color=(0.3, 0.8, 1.0, 1.0), click_color=(0.1, 0.6, 0.9, 1.0),
+               text_color=(1.0, 1.0, 1.0, 1.0)):
         hovered = AcidUI.is_hover(x, y, w, h)
         pressed = hovered and AcidUI.mouse_down
 
@@ -76,36 +181,258 @@ class AcidUI:
         if pressed and AcidUI.mouse_up:
             func()
 
-        # (Optional) Add text drawing here later with texture or bitmap
+        if label:
+            atlas = AcidUI.atlas()
+            AcidUI.text(label, x + (w - atlas.measure(label)) / 2, y + (h - atlas.line_height) / 2, text_color)
 
         return hovered and AcidUI.mouse_up
 
 # --- BASIC OBJECT TO DRAW ---
+def buffers_supported():
+    # glGenBuffers is a null function when the context has no VBO support
+    return bool(glGenBuffers)
+
+def mesh_arrays(vertices, uvs, faces):
+    # Triangulate n-gons, weld equal (position, uv) corners, uint16 indices when they fit
+    triangles, _ = triangulate(vertices, faces)
+    return weld(vertices, uvs, triangles)
+
+
 class Object3D:
-    def __init__(self):
+    def __init__(self, use_buffers=False):
+        self._world = None  # PhysicsWorld holding position/velocity, set by PhysicsWorld.add
+        self._scenes = []  # Scenes to tell when the object moves, kept by Scene.add/remove
         self.position = (0, 0, 0)
         self.rotation = (0, 0, 0)
         self.scale = (1, 1, 1)
         self.velocity = (0, 0, 0)
         self.mass = 1.0  # Default mass for physics calculations
+        self.static = False  # never moves: a StaticBatcher may bake it into a shared buffer
+        self.mesh_version = 0
         self.vertices = []
         self.uvs = []
         self.faces = []
         self.tex_id = None
+        self.texture_path = None  # image behind tex_id, for SoftwareEngine3D
+
+        # Retained mode: mesh lives in GPU buffers, re-uploaded only when it changes
+        self.use_buffers = use_buffers
+        self.vbo = None
+        self.ibo = None
+        self.index_count = 0
+        self.index_type = GL_UNSIGNED_INT
+        self._uploaded_version = None
+        self._bounds = None
+        self._bounds_version = None
+        self._triangles = None
+        self._triangle_faces = None  # index into faces of each triangle
+        self._triangle_list = None  # same as plain lists, for immediate mode
+        self._triangles_version = None
+        self._pick_bvh = None  # (mesh_version, MeshBVH), built by picking.mesh_bvh
+
+    # In a PhysicsWorld position and velocity are rows of its arrays: steps move them in
+    # place without touching the object, and assigning writes into the row.
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        if self._world is None:
+            self._position = value
+        else:
+            self._position[:] = value
+        self._moved()
 
-    def set_texture(self, path):
-        texture = pygame.image.load(path)
-        texture = pygame.transform.flip(texture, False, True)
-        texture_data = pygame.image.tostring(texture, "RGB", True)
+    @property
+    def velocity(self):
+        return self._velocity
 
-        self.tex_id = glGenTextures(1)
-        glBindTexture(GL_TEXTURE_2D, self.tex_id)
-        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB, texture.get_width(), texture.get_height(), 0,
-                     GL_RGB, GL_UNSIGNED_BYTE, texture_data)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+    @velocity.setter
+    def velocity(self, value):
+        if self._world is None:
+            self._velocity = value
+        else:
+            self._velocity[:] = value
+
+    # Assigning position/rotation/scale (or calling mark_dirty) tells the scenes holding
+    # the object to refit its box. Edits in place don't, pass the object to Scene.update.
+    @property
+    def rotation(self):
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, value):
+        self._rotation = value
+        self._moved()
+
+    @property
+    def scale(self):
+        return self._scale
+
+    @scale.setter
+    def scale(self, value):
+        self._scale = value
+        self._moved()
+
+    def _moved(self):
+        for scene in self._scenes:
+            scene.mark_moved(self)
+
+    # Assigning vertices/uvs/faces bumps mesh_version so cached GPU data gets rebuilt.
+    # If you edit the lists in place call mark_dirty() yourself.
+    @property
+    def vertices(self):
+        return self._vertices
+
+    @vertices.setter
+    def vertices(self, value):
+        self._vertices = value
+        self.mark_dirty()
+
+    @property
+    def uvs(self):
+        return self._uvs
+
+    @uvs.setter
+    def uvs(self, value):
+        self._uvs = value
+        self.mark_dirty()
+
+    @property
+    def faces(self):
+        return self._faces
+
+    @faces.setter
+    def faces(self, value):
+        self._faces = value
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        self.mesh_version += 1
+        self._moved()
+
+    def model_matrix(self):
+        return Matrix4.trs(self.position, self.rotation, self.scale)
+
+    def local_bounds(self):
+        # Mesh-space AABB (min, max), cached until the mesh changes
+        if self._bounds_version != self.mesh_version:
+            vertices = np.asarray(self.vertices, dtype=np.float64).reshape(-1, 3)
+            if len(vertices):
+                self._bounds = (vertices.min(axis=0), vertices.max(axis=0))
+            else:
+                self._bounds = (np.zeros(3), np.zeros(3))
+            self._bounds_version = self.mesh_version
+        return self._bounds
+
+    def bounding_sphere(self):
+        # Mesh-space (center, radius) around the AABB
+        low, high = self.local_bounds()
+        return (low + high) / 2, float(np.linalg.norm(high - low)) / 2
+
+    def triangles(self):
+        # faces as a (T, 3, 2) array, n-gons ear clipped, cached until the mesh changes
+        if self._triangles_version != self.mesh_version:
+            self._triangles, self._triangle_faces = triangulate(self.vertices, self.faces) if len(self.faces) else \
+                (np.zeros((0, 3, 2), dtype=np.int32), np.zeros(0, dtype=np.int32))
+            self._triangle_list = None
+            self._triangles_version = self.mesh_version
+        return self._triangles
+
+    def triangle_faces(self):
+        # For each row of triangles(), the index of the face it came from
+        self.triangles()
+        return self._triangle_faces
+
+    def _mesh_arrays(self):
+        return weld(self.vertices, self.uvs, self.triangles())
+
+    def upload_buffers(self, arrays=None):
+        # arrays: (interleaved, indices) from mesh_arrays() when they were built elsewhere
+        interleaved, indices = self._mesh_arrays() if arrays is None else arrays
+        if self.vbo is None:
+            self.vbo = glGenBuffers(1)
+            self.ibo = glGenBuffers(1)
+
+        glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+        glBufferData(GL_ARRAY_BUFFER, interleaved.nbytes, interleaved, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+
+        self.index_count = len(indices)
+        self.index_type = GL_UNSIGNED_SHORT if indices.dtype == np.uint16 else GL_UNSIGNED_INT
+        self._uploaded_version = self.mesh_version
+
+    def release_buffers(self):
+        if self.vbo is not None:
+            glDeleteBuffers(2, [self.vbo, self.ibo])
+        self.vbo = None
+        self.ibo = None
+        self.index_count = 0
+        self._uploaded_version = None
+
+    def _draw_buffers(self, textured):
+        # Cleanup runs even when a call fails, so the immediate mode fallback in
+        # _draw_mesh never draws with client arrays still enabled or buffers bound
+        try:
+            if self._uploaded_version != self.mesh_version:
+                self.upload_buffers()
+
+            glBindBuffer(GL_ARRAY_BUFFER, self.vbo)
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glVertexPointer(3, GL_FLOAT, 20, ctypes.c_void_p(0))
+            if textured:
+                glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+                glTexCoordPointer(2, GL_FLOAT, 20, ctypes.c_void_p(12))
+
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+            glDrawElements(GL_TRIANGLES, self.index_count, self.index_type, ctypes.c_void_p(0))
+        finally:
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+            glDisableClientState(GL_VERTEX_ARRAY)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def _draw_immediate(self, textured):
+        triangles = self.triangles()
+        if self._triangle_list is None:
+            self._triangle_list = triangles.tolist()
+        glBegin(GL_TRIANGLES)
+        for face in self._triangle_list:
+            for v_idx, uv_idx in face:
+                if textured:
+                    glTexCoord2fv(self.uvs[uv_idx])
+                glVertex3fv(self.vertices[v_idx])
+        glEnd()
+
+    def set_texture(self, path, mipmaps=True, streamer=None):
+        # Shared through texture_manager, the same image is only decoded/uploaded once.
+        # With an AssetStreamer it decodes in the background and returns a handle.
+        self.texture_path = path
+        if streamer is not None:
+            return streamer.load_texture(path, self, mipmaps=mipmaps)
+        new_id = texture_manager.acquire(path, mipmaps=mipmaps)
+        self.release_texture()
+        self.tex_id = new_id
+
+    def release_texture(self):
+        if self.tex_id is not None:
+            texture_manager.release(self.tex_id)
+            self.tex_id = None
+
+    def _vertex_count(self):
+        if self.use_buffers and self._uploaded_version == self.mesh_version:
+            return self.index_count
+        return len(self.triangles()) * 3
 
     def draw(self, ignore_colors=False, wireframe=False, ignore_texture=False):
+        prof = profiler.active
+        if prof is not None:
+            start = profiler.now()
+
         glPushMatrix()
     
         # 🐸 Apply Position
@@ -123,29 +450,45 @@ class Object3D:
         if self.tex_id and not ignore_texture:
             glEnable(GL_TEXTURE_2D)
             glBindTexture(GL_TEXTURE_2D, self.tex_id)
+            changes = 2
         else:
             glDisable(GL_TEXTURE_2D)
+            changes = 1
     
         # 🐸 Wireframe mode
         if wireframe:
             glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
         else:
             glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        changes += 1
     
         # 🐸 Draw the triangles
-        glBegin(GL_TRIANGLES)
-        for face in self.faces:
-            for v_idx, uv_idx in face:
-                if self.tex_id and not ignore_texture:
-                    glTexCoord2fv(self.uvs[uv_idx])
-                glVertex3fv(self.vertices[v_idx])
-        glEnd()
+        textured = bool(self.tex_id) and not ignore_texture
+        self._draw_mesh(textured)
     
         # 🧼 Cleanup
         glDisable(GL_TEXTURE_2D)
         glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        changes += 2
         glPopMatrix()
 
+        if prof is not None:
+            prof.record("draw", start)
+            prof.count("draw_calls")
+            prof.count("vertices", self._vertex_count())
+            prof.count("texture_binds", int(textured))
+            prof.count("state_changes", changes)
+
+    def _draw_mesh(self, textured):
+        if self.use_buffers and buffers_supported():
+            try:
+                self._draw_buffers(textured)
+                return
+            except OpenGL.error.Error:
+                # Context can't do buffers after all, stay on immediate mode from now on
+                self.use_buffers = False
+        self._draw_immediate(textured)
+
 # --- CAMERA HANDLING ---
 class Camera:
     def __init__(self, pos=[0, 0, 5]):
@@ -158,6 +501,12 @@ class Camera:
         self.right = [1, 0, 0]
         self.up = [0, 1, 0]
 
+        # Projection, Engine3D sets up GL with these
+        self.fov = FOV
+        self.aspect = SCREEN_SIZE[0] / SCREEN_SIZE[1]
+        self.near = 0.1
+        self.far = 100.0
+
     def _normalize(self, vec):
         length = math.sqrt(sum(i * i for i in vec))
         return [i / length for i in vec]
@@ -194,14 +543,32 @@ class Camera:
         glLoadIdentity()
         gluLookAt(*self.position, *target, 0, 1, 0)
 
+    def view_matrix(self):
+        target = [self.position[i] + self.front[i] for i in range(3)]
+        return Matrix4.look_at(self.position, target, (0, 1, 0))
+
+    def projection_matrix(self):
+        return Matrix4.perspective(self.fov, self.aspect, self.near, self.far)
+
+    def frustum_planes(self):
+        # (6, 4) planes a*x + b*y + c*z + d >= 0 inside: left, right, bottom, top, near, far
+        self.update_vectors()
+        clip = (self.projection_matrix() @ self.view_matrix()).m
+        planes = np.array([clip[3] + clip[0], clip[3] - clip[0],
+                           clip[3] + clip[1], clip[3] - clip[1],
+                           clip[3] + clip[2], clip[3] - clip[2]])
+        return planes / np.linalg.norm(planes[:, :3], axis=1)[:, None]
+
 # --- ENGINE / MAIN LOOP ---
 class Engine3D:
-    def __init__(self):
+    def __init__(self, vsync=False):
         pygame.init()
-        self.screen = pygame.display.set_mode(SCREEN_SIZE, DOUBLEBUF | OPENGL)
+        self.vsync = vsync
+        self.screen = pygame.display.set_mode(SCREEN_SIZE, DOUBLEBUF | OPENGL, vsync=int(vsync))
+        self.camera = Camera()
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
-        gluPerspective(FOV, SCREEN_SIZE[0] / SCREEN_SIZE[1], 0.1, 100.0)
+        gluPerspective(self.camera.fov, self.camera.aspect, self.camera.near, self.camera.far)
         glMatrixMode(GL_MODELVIEW)
         glEnable(GL_DEPTH_TEST)
 
@@ -210,11 +577,16 @@ class Engine3D:
         pygame.mouse.get_rel()
 
         self.running = True
-        self.camera = Camera()
         self.clock = pygame.time.Clock()
+        self.scheduler = Scheduler(target_fps=60, vsync=vsync)  # used by run()
         self.len = len(pygame.key.get_pressed())
 
     def loop(self):
+        prof = profiler.active
+        if prof is not None:
+            prof.begin_frame()
+            start = profiler.now()
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
@@ -223,9 +595,20 @@ class Engine3D:
                 pygame.quit()
                 self.running = False
 
+        if prof is not None:
+            prof.record("events", start)
+
     def get_mouse(self):
         return pygame.mouse.get_pos() if self.running else (0, 0)
 
+    def pick(self, targets, pos=None):
+        # Hit under pos (default: the mouse) or None; targets is a Scene or a list of objects
+        x, y = self.get_mouse() if pos is None else pos
+        origin, direction = screen_ray(self.camera, x, y, *self.screen.get_size())
+        if hasattr(targets, "pick"):
+            return targets.pick(origin, direction)
+        return pick(targets, origin, direction)
+
     def set_mouse(self, x, y):
         if self.running:
             pygame.mouse.set_pos((x, y))
@@ -235,42 +618,81 @@ class Engine3D:
 
     def clear(self):
         if self.running:
+            prof = profiler.active
+            if prof is not None:
+                start = profiler.now()
             glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            if prof is not None:
+                prof.record("clear", start)
 
-    def update(self):
+    def present(self):
         if self.running:
+            prof = profiler.active
+            if prof is not None:
+                start = profiler.now()
             pygame.display.flip()
+            if prof is not None:
+                prof.record("present", start)
+
+    def update(self):
+        if self.running:
+            self.present()
+            prof = profiler.active
+            if prof is not None:
+                prof.end_frame()
+
+    def run(self, update, render):
+        # Fixed-timestep loop: update(dt) at scheduler.timestep, render(alpha) once per
+        # frame after a clear. Tune self.scheduler (timestep, target_fps, idle work) first.
+        def draw(alpha):
+            if self.running:
+                self.clear()
+                render(alpha)
+
+        self.scheduler.run(update, draw, begin=self.loop, present=self.present,
+                           running=lambda: self.running)
+
+    def tick(self, fps=60):
+        # clock.tick, but shows up as "wait" in the profiler
+        prof = profiler.active
+        if prof is None:
+            return self.clock.tick(fps)
+        start = profiler.now()
+        elapsed = self.clock.tick(fps)
+        prof.record("wait", start)
+        return elapsed
 
 # --- MAIN FUNCTION ---
 def main():
     engine = Engine3D()
     camera = engine.camera
     cube = Object3D()
-    angle = 0
-
-    while engine.running:
-        engine.loop()
+    state = {"angle": 0.0}
 
+    def update(dt):
         keys = engine.get_key()
         if keys[pygame.K_w]: camera.bettermove(0, 0, -camera.speed)
         if keys[pygame.K_s]: camera.bettermove(0, 0, camera.speed)
         if keys[pygame.K_a]: camera.bettermove(-camera.speed, 0, 0)
         if keys[pygame.K_d]: camera.bettermove(camera.speed, 0, 0)
+        state["angle"] += 60 * dt
+        cube.rotation = (state["angle"], state["angle"], state["angle"])
 
+    def render(alpha):
         dx, dy = pygame.mouse.get_rel()
         camera.yaw += dx * camera.sensitivity
         camera.pitch -= dy * camera.sensitivity
         camera.pitch = max(-89.9, min(89.9, camera.pitch))
 
         camera.apply()
-        engine.clear()
-        cube.draw(pos=(0, 0, 0), rotation=(angle, angle, angle))
+        cube.draw()
         engine.set_mouse(SCREEN_SIZE[0] // 2, SCREEN_SIZE[1] // 2)
-        engine.update()
-        engine.clock.tick(60)
-        angle += 1
+
+    engine.run(update, render)
 
 # --- Helper Functions ---
+# load_obj / load_obj_arrays (numpy + binary cache) live in objloader.py,
+# this is the old list based loader kept for code that wants plain lists.
 
 def load_obj_with_uv(path):
     vertices = []
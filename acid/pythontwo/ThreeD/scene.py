@@ -0,0 +1,243 @@
+import numpy as np
+from acid.pythontwo.math.matrixes.matrix import euler_to_matrices
+
+# --- BOUNDS ---
+
+def world_boxes(objects):
+    # World AABBs (lows, highs) of many objects at once: transform each local box
+    # center by position/rotation/scale and grow the extents by |R * S|
+    count = len(objects)
+    if not count:
+        return np.zeros((0, 3)), np.zeros((0, 3))
+    positions = np.array([obj.position for obj in objects], dtype=float).reshape(count, 3)
+    rotations = np.array([obj.rotation for obj in objects], dtype=float).reshape(count, 3)
+    scales = np.array([obj.scale for obj in objects], dtype=float).reshape(count, 3)
+    bounds = [obj.local_bounds() for obj in objects]
+    lows = np.array([b[0] for b in bounds])
+    highs = np.array([b[1] for b in bounds])
+
+    basis = euler_to_matrices(rotations) * scales[:, None, :]
+    centers = np.einsum('nij,nj->ni', basis, (lows + highs) / 2) + positions
+    extents = np.einsum('nij,nj->ni', np.abs(basis), (highs - lows) / 2)
+    return centers - extents, centers + extents
+
+
+def boxes_in_frustum(planes, lows, highs):
+    # 0 = outside, 1 = crossing a plane, 2 = fully inside
+    centers = (lows + highs) / 2
+    extents = (highs - lows) / 2
+    middle = centers @ planes[:, :3].T + planes[:, 3]
+    reach = extents @ np.abs(planes[:, :3]).T
+    outside = (middle + reach < 0).any(axis=1)
+    inside = (middle - reach >= 0).all(axis=1)
+    return np.where(outside, 0, np.where(inside, 2, 1))
+
+# --- BVH ---
+# Built top-down with a median split on the longest axis. Moving objects only refit
+# the boxes on their leaf-to-root paths, add/remove rebuilds.
+
+class BVH:
+    def __init__(self, lows, highs, leaf_size=8):
+        self.leaf_size = leaf_size
+        self.left = []
+        self.right = []
+        self.parent = []
+        self.start = []
+        self.count = []
+        self.order = np.arange(len(lows))
+        self.leaf = np.zeros(len(lows), dtype=np.int64)  # leaf node holding each item
+        if len(lows):
+            self._build(lows, highs, 0, len(lows), -1)
+        self.lows = np.zeros((len(self.left), 3))
+        self.highs = np.zeros((len(self.left), 3))
+        self.refit(lows, highs)
+
+    def _build(self, lows, highs, start, end, parent):
+        node = len(self.left)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.parent.append(parent)
+        self.start.append(start)
+        self.count.append(end - start)
+        if end - start <= self.leaf_size:
+            self.leaf[self.order[start:end]] = node
+            return node
+
+        items = self.order[start:end]
+        centers = (lows[items] + highs[items]) / 2
+        axis = int(np.argmax(centers.max(axis=0) - centers.min(axis=0)))
+        half = (end - start) // 2
+        self.order[start:end] = items[np.argpartition(centers[:, axis], half)]
+
+        self.left[node] = self._build(lows, highs, start, start + half, node)
+        self.right[node] = self._build(lows, highs, start + half, end, node)
+        return node
+
+    def refit(self, lows, highs, items=None):
+        # Children always come after their parent, so walk the nodes backwards. With
+        # items, only the nodes above those items' leaves.
+        if items is None:
+            nodes = range(len(self.left) - 1, -1, -1)
+        else:
+            nodes = set()
+            for node in np.unique(self.leaf[items]).tolist():
+                while node >= 0 and node not in nodes:
+                    nodes.add(node)
+                    node = self.parent[node]
+            nodes = sorted(nodes, reverse=True)
+        for node in nodes:
+            left, right = self.left[node], self.right[node]
+            if left < 0:
+                items = self.order[self.start[node]:self.start[node] + self.count[node]]
+                self.lows[node] = lows[items].min(axis=0)
+                self.highs[node] = highs[items].max(axis=0)
+            else:
+                self.lows[node] = np.minimum(self.lows[left], self.lows[right])
+                self.highs[node] = np.maximum(self.highs[left], self.highs[right])
+
+    def query(self, planes, lows, highs):
+        # Returns (item indices, nodes visited)
+        if not len(self.left):
+            return np.zeros(0, dtype=np.int64), 0
+        state = boxes_in_frustum(planes, self.lows, self.highs).tolist()
+        accepted = []
+        partial = []
+        visited = 0
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            visited += 1
+            if state[node] == 0:
+                continue
+            if state[node] == 2 or self.left[node] < 0:
+                span = self.order[self.start[node]:self.start[node] + self.count[node]]
+                (accepted if state[node] == 2 else partial).append(span)
+                continue
+            stack.append(self.right[node])
+            stack.append(self.left[node])
+
+        if partial:
+            items = np.concatenate(partial)
+            accepted.append(items[boxes_in_frustum(planes, lows[items], highs[items]) > 0])
+        if not accepted:
+            return np.zeros(0, dtype=np.int64), visited
+        return np.sort(np.concatenate(accepted)), visited
+
+# --- SCENE ---
+
+# Object3D tells every scene holding it when position/rotation/scale are assigned or
+# mark_dirty() is called, so each update only refits what moved. Changes made in place
+# (a PhysicsWorld step, obj.position[0] += 1 on a list) aren't seen: pass those objects
+# to update(), or turn on auto_update to compare every object's transform each frame.
+
+class Scene:
+    def __init__(self, leaf_size=8, auto_update=False):
+        self.objects = []
+        self.leaf_size = leaf_size
+        self.auto_update = auto_update  # scan every object for moves on every render
+        self.stats = {}
+        self._slots = {}
+        self._keys = []
+        self._moved = set()  # slots of objects that notified since the last update
+        self._lows = np.zeros((0, 3))
+        self._highs = np.zeros((0, 3))
+        self._bvh = None
+
+    @staticmethod
+    def _key(obj):
+        return (tuple(obj.position), tuple(obj.rotation), tuple(obj.scale), obj.mesh_version)
+
+    def add(self, obj):
+        if id(obj) in self._slots:
+            return obj
+        self._slots[id(obj)] = len(self.objects)
+        self.objects.append(obj)
+        self._keys.append(None)
+        self._bvh = None
+        scenes = getattr(obj, "_scenes", None)
+        if scenes is not None:
+            scenes.append(self)
+        return obj
+
+    def remove(self, obj):
+        slot = self._slots.pop(id(obj), None)
+        if slot is None:
+            return
+        del self.objects[slot]
+        del self._keys[slot]
+        self._slots = {id(o): i for i, o in enumerate(self.objects)}
+        self._bvh = None
+        scenes = getattr(obj, "_scenes", None)
+        if scenes is not None and self in scenes:
+            scenes.remove(self)
+
+    def mark_moved(self, obj):
+        # Called by Object3D's setters; the box is refit on the next update
+        slot = self._slots.get(id(obj))
+        if slot is not None:
+            self._moved.add(slot)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __iter__(self):
+        return iter(self.objects)
+
+    def update(self, objects=None):
+        # Recompute world bounds of the objects that notified, plus the given objects
+        # (moved in place, e.g. stepped by a PhysicsWorld), plus any whose transform
+        # changed when auto_update is on
+        if self._bvh is None or len(self._lows) != len(self.objects):
+            self._lows, self._highs = world_boxes(self.objects)
+            self._keys = [self._key(obj) for obj in self.objects]
+            self._bvh = BVH(self._lows, self._highs, self.leaf_size)
+            self._moved.clear()
+            return
+
+        moved = self._moved
+        if objects is not None:
+            moved.update(slot for slot in map(self._slots.get, map(id, objects)) if slot is not None)
+        if self.auto_update:
+            for slot, obj in enumerate(self.objects):
+                key = self._key(obj)
+                if key != self._keys[slot]:
+                    self._keys[slot] = key
+                    moved.add(slot)
+        if moved:
+            slots = sorted(moved)
+            moved.clear()
+            lows, highs = world_boxes([self.objects[slot] for slot in slots])
+            self._lows[slots] = lows
+            self._highs[slots] = highs
+            self._bvh.refit(self._lows, self._highs, slots)
+
+    def world_bounds(self, obj):
+        slot = self._slots[id(obj)]
+        return self._lows[slot], self._highs[slot]
+
+    def visible(self, camera):
+        self.update()
+        items, visited = self._bvh.query(camera.frustum_planes(), self._lows, self._highs)
+        self.stats = {
+            "objects": len(self.objects),
+            "visible": len(items),
+            "culled": len(self.objects) - len(items),
+            "nodes_visited": visited,
+        }
+        return [self.objects[i] for i in items.tolist()]
+
+    def pick(self, origin, direction, max_distance=np.inf):
+        # Nearest picking.Hit along a world ray, reusing the culling boxes
+        from acid.pythontwo.ThreeD.picking import pick
+        self.update()
+        return pick(self.objects, origin, direction, (self._lows, self._highs), max_distance)
+
+    def pick_screen(self, camera, x, y, width, height):
+        from acid.pythontwo.ThreeD.picking import screen_ray
+        return self.pick(*screen_ray(camera, x, y, width, height))
+
+    def render(self, camera, **draw_args):
+        # draw_args go to every Object3D.draw (wireframe, ignore_texture, ...)
+        for obj in self.visible(camera):
+            obj.draw(**draw_args)
+        return self.stats
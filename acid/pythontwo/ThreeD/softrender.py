@@ -0,0 +1,423 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from acid.pythontwo.ThreeD.picking import screen_ray, pick
+from acid.pythontwo.scheduler.scheduler import Scheduler
+import acid.pythontwo.profiler.profiler as profiler
+
+# --- SOFTWARE RENDERER ---
+# Engine3D without OpenGL: Object3D meshes seen through the same Camera, drawn into a
+# numpy colour buffer and z-buffer. Every stage works on a whole batch of triangles:
+#   transform -> drop triangles outside the frustum -> clip against the near plane ->
+#   triangle setup (edge functions) -> one covered span per triangle row -> depth,
+#   perspective-correct uv, texture sample -> nearest-depth write per pixel
+# With threads > 1 the screen is cut into horizontal bands, one per worker; bands never
+# share pixels so they can all write to the buffers at once.
+#
+#   engine = SoftwareEngine3D(320, 240)   # off-screen, window=True opens a window
+#   engine.clear()
+#   engine.draw(frog)                     # an Object3D, textured from set_texture()
+#   engine.save("thumb.png")       # or engine.color (H, W, 3), engine.to_surface()
+#
+# Output matches the GL path: no lighting, untextured triangles are white, textures
+# repeat. shade=True adds a simple headlight so untextured meshes are readable.
+#
+# It has Engine3D's frame interface too (camera, run, tick, clear, present, update,
+# pick, get_key, get_mouse/set_mouse), so a game can swap one engine for the other.
+# The only difference in the render callback: objects go through engine.draw(obj)
+# instead of obj.draw(), and there is no camera.apply().
+
+CANDIDATES_PER_CHUNK = 1 << 20  # bounding box pixels per vectorized step, bounds memory use
+
+
+def _expand(counts):
+    # For counts [2, 3] -> owner [0, 0, 1, 1, 1], local [0, 1, 0, 1, 2]
+    owner = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, local
+
+
+def clip_near(clip, attributes):
+    # clip (T, 3, 4) clip-space corners, attributes (T, 3, k) per corner values. Cuts
+    # triangles at z = -w and returns the visible part as 0, 1 or 2 triangles each,
+    # winding kept.
+    inside = clip[:, :, 2] >= -clip[:, :, 3]
+    count = inside.sum(axis=1)
+    keep = [(clip[count == 3], attributes[count == 3])]
+
+    def rotate(mask, first):
+        # Roll each triangle so `first` (one corner per triangle) comes first
+        shift = np.argmax(first[mask], axis=1)
+        order = (np.arange(3)[None, :] + shift[:, None]) % 3
+        return (np.take_along_axis(clip[mask], order[:, :, None], axis=1),
+                np.take_along_axis(attributes[mask], order[:, :, None], axis=1))
+
+    def cut(a, b, pa, pb):
+        # Point on a-b where z = -w
+        da = a[:, 2] + a[:, 3]
+        db = b[:, 2] + b[:, 3]
+        t = (da / (da - db))[:, None]
+        return a + (b - a) * t, pa + (pb - pa) * t
+
+    one = count == 1
+    if one.any():
+        c, u = rotate(one, inside)
+        p1, q1 = cut(c[:, 0], c[:, 1], u[:, 0], u[:, 1])
+        p2, q2 = cut(c[:, 0], c[:, 2], u[:, 0], u[:, 2])
+        keep.append((np.stack((c[:, 0], p1, p2), axis=1), np.stack((u[:, 0], q1, q2), axis=1)))
+
+    two = count == 2
+    if two.any():
+        c, u = rotate(two, ~inside)
+        p1, q1 = cut(c[:, 1], c[:, 0], u[:, 1], u[:, 0])
+        p2, q2 = cut(c[:, 2], c[:, 0], u[:, 2], u[:, 0])
+        keep.append((np.stack((p1, c[:, 1], c[:, 2]), axis=1), np.stack((q1, u[:, 1], u[:, 2]), axis=1)))
+        keep.append((np.stack((p1, c[:, 2], p2), axis=1), np.stack((q1, u[:, 2], q2), axis=1)))
+
+    return np.concatenate([k[0] for k in keep]), np.concatenate([k[1] for k in keep])
+
+
+def sample(image, u, v, filter="linear"):
+    # GL_REPEAT lookup of an (H, W, 3) float32 image, "nearest" or "linear" like
+    # GL_NEAREST / GL_LINEAR. decode_image uploads the top row first, so v = 0 is the
+    # top row here too.
+    height, width = image.shape[:2]
+    texels = image.reshape(-1, 3)
+    if filter == "nearest":
+        column = (np.floor(u * width).astype(np.int64) % width)
+        row = (np.floor(v * height).astype(np.int64) % height)
+        return texels[row * width + column]
+
+    x = u * width - 0.5
+    y = v * height - 0.5
+    x0, y0 = np.floor(x), np.floor(y)
+    fx, fy = (x - x0)[:, None], (y - y0)[:, None]
+    c0, r0 = x0.astype(np.int64) % width, y0.astype(np.int64) % height
+    c1, r1 = (c0 + 1) % width, (r0 + 1) % height
+    r0 *= width
+    r1 *= width
+    top = texels[r0 + c0] * (1 - fx) + texels[r0 + c1] * fx
+    bottom = texels[r1 + c0] * (1 - fx) + texels[r1 + c1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+class SoftwareEngine3D:
+    def __init__(self, width=800, height=600, camera=None, threads=1, background=(0, 0, 0), shade=False,
+                 filter="linear", window=False, vsync=False):
+        if camera is None:
+            from acid.pythontwo.ThreeD.renderer import Camera
+            camera = Camera()
+            camera.aspect = width / height
+        self.width = width
+        self.height = height
+        self.camera = camera
+        self.threads = threads
+        self.background = background
+        self.shade = shade
+        self.filter = filter  # texture sampling, "linear" like the GL textures or "nearest"
+        self.color = np.zeros((height, width, 3), dtype=np.uint8)
+        self.depth = np.ones((height, width), dtype=np.float32)
+        self.stats = {"triangles": 0, "pixels": 0}
+        self._textures = {}
+        self._pool = ThreadPoolExecutor(threads) if threads > 1 else None
+        self.clear()
+
+        self.vsync = vsync
+        self.screen = None  # pygame display surface with window=True
+        if window:
+            import pygame
+            pygame.init()
+            self.screen = pygame.display.set_mode((width, height), vsync=int(vsync))
+        self.running = True
+        self.clock = None  # pygame Clock, made on the first tick()
+        self.scheduler = Scheduler(target_fps=60, vsync=vsync)  # used by run()
+
+    # --- frame ---
+    def clear(self, color=None):
+        self.color[:] = self.background if color is None else color
+        self.depth[:] = 1.0
+        self.stats = {"triangles": 0, "pixels": 0}
+
+    def to_surface(self):
+        import pygame
+        return pygame.surfarray.make_surface(self.color.swapaxes(0, 1))
+
+    def save(self, path):
+        import pygame
+        pygame.image.save(self.to_surface(), path)
+
+    def texture(self, path):
+        # Decoded once to float32, rows top to bottom like the image file
+        image = self._textures.get(path)
+        if image is None:
+            import pygame
+            image = pygame.surfarray.array3d(pygame.image.load(path)).swapaxes(0, 1).astype(np.float32)
+            self._textures[path] = image
+        return image
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def render(self, objects):
+        for obj in objects:
+            self.draw(obj)
+        return self.color
+
+    # --- Engine3D interface ---
+    def loop(self):
+        prof = profiler.active
+        if prof is not None:
+            prof.begin_frame()
+            start = profiler.now()
+
+        if self.screen is not None:
+            import pygame
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    pygame.quit()
+                    self.running = False
+
+        if prof is not None:
+            prof.record("events", start)
+
+    def get_mouse(self):
+        if self.screen is None or not self.running:
+            return (0, 0)
+        import pygame
+        return pygame.mouse.get_pos()
+
+    def set_mouse(self, x, y):
+        if self.screen is not None and self.running:
+            import pygame
+            pygame.mouse.set_pos((x, y))
+
+    def get_key(self):
+        # Off-screen nothing is ever pressed, indexing with any pygame.K_* gives 0
+        if self.screen is None or not self.running:
+            return defaultdict(int)
+        import pygame
+        return pygame.key.get_pressed()
+
+    def pick(self, targets, pos=None):
+        # Same as Engine3D.pick: hit under pos (default: the mouse) in a Scene or a list
+        x, y = self.get_mouse() if pos is None else pos
+        origin, direction = screen_ray(self.camera, x, y, self.width, self.height)
+        if hasattr(targets, "pick"):
+            return targets.pick(origin, direction)
+        return pick(targets, origin, direction)
+
+    def present(self):
+        if self.screen is not None and self.running:
+            import pygame
+            prof = profiler.active
+            if prof is not None:
+                start = profiler.now()
+            pygame.surfarray.blit_array(self.screen, self.color.swapaxes(0, 1))
+            pygame.display.flip()
+            if prof is not None:
+                prof.record("present", start)
+
+    def update(self):
+        if self.running:
+            self.present()
+            prof = profiler.active
+            if prof is not None:
+                prof.end_frame()
+
+    def run(self, update, render):
+        # Engine3D.run: update(dt) at scheduler.timestep, render(alpha) after a clear
+        def draw(alpha):
+            if self.running:
+                self.clear()
+                render(alpha)
+
+        self.scheduler.run(update, draw, begin=self.loop, present=self.present,
+                           running=lambda: self.running)
+
+    def tick(self, fps=60):
+        import pygame
+        if self.clock is None:
+            self.clock = pygame.time.Clock()
+        prof = profiler.active
+        if prof is None:
+            return self.clock.tick(fps)
+        start = profiler.now()
+        elapsed = self.clock.tick(fps)
+        prof.record("wait", start)
+        return elapsed
+
+    # --- pipeline ---
+    def draw(self, obj, ignore_texture=False):
+        prof = profiler.active
+        if prof is not None:
+            start = profiler.now()
+        drawn = self._draw(obj, ignore_texture)
+        if prof is not None:
+            prof.record("soft_draw", start)
+            prof.count("soft_triangles", drawn[0])
+            prof.count("soft_pixels", drawn[1])
+
+    def _draw(self, obj, ignore_texture):
+        # Returns (triangles set up, pixels written)
+        camera = self.camera
+        if hasattr(camera, "update_vectors"):
+            camera.update_vectors()
+        view = camera.view_matrix() @ obj.model_matrix()
+        mvp = camera.projection_matrix() @ view
+
+        faces = obj.triangles()
+        if not len(faces):
+            return 0, 0
+        clip = mvp.transform_points4(obj.vertices)[faces[:, :, 0]]
+
+        # Per corner attributes (u, v, brightness), clipped and interpolated together
+        path = None if ignore_texture else getattr(obj, "texture_path", None)
+        image = self.texture(path) if path else None
+        attributes = np.ones(faces.shape[:2] + (3,))
+        uv_table = np.asarray(obj.uvs, dtype=np.float64).reshape(-1, 2)
+        if image is not None and len(uv_table):
+            attributes[:, :, :2] = uv_table[faces[:, :, 1]]
+        if self.shade:
+            attributes[:, :, 2] = self._headlight(view.transform_points(obj.vertices)[faces[:, :, 0]])[:, None]
+
+        # Whole triangle outside one of the frustum planes
+        x, y, z, w = clip[:, :, 0], clip[:, :, 1], clip[:, :, 2], clip[:, :, 3]
+        outside = ((x < -w).all(axis=1) | (x > w).all(axis=1) | (y < -w).all(axis=1) |
+                   (y > w).all(axis=1) | (z < -w).all(axis=1) | (z > w).all(axis=1))
+        clip, attributes = clip_near(clip[~outside], attributes[~outside])
+        if not len(clip):
+            return 0, 0
+
+        # Screen space, row 0 at the top; 1/w, u/w, v/w interpolate linearly on screen
+        inv_w = 1.0 / clip[:, :, 3]
+        sx = (clip[:, :, 0] * inv_w + 1) * 0.5 * self.width
+        sy = (1 - clip[:, :, 1] * inv_w) * 0.5 * self.height
+        sz = (clip[:, :, 2] * inv_w + 1) * 0.5
+        setup = self._setup(sx, sy, sz, inv_w, attributes)
+        if setup is None:
+            return 0, 0
+
+        bands = self._bands()
+        if self._pool is None or len(bands) == 1:
+            drawn = sum(self._raster(setup, image, top, bottom) for top, bottom in bands)
+        else:
+            jobs = [self._pool.submit(self._raster, setup, image, top, bottom) for top, bottom in bands]
+            drawn = sum(job.result() for job in jobs)
+        self.stats["triangles"] += len(setup["area"])
+        self.stats["pixels"] += drawn
+        return len(setup["area"]), drawn
+
+    def _headlight(self, corners):
+        # View-space (T, 3, 3) corners -> brightness per triangle, 1 facing the camera
+        # and 0.25 edge on; both sides lit since GL draws both
+        normal = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        towards = -corners.mean(axis=1)
+        length = np.linalg.norm(normal, axis=1) * np.linalg.norm(towards, axis=1)
+        facing = np.abs(np.einsum('ij,ij->i', normal, towards)) / np.where(length > 0, length, 1.0)
+        return 0.25 + 0.75 * facing
+
+    def _setup(self, sx, sy, sz, inv_w, attributes):
+        # Edge functions E_i(x, y) = a_i x + b_i y + c_i for the edge opposite corner i
+        area = (sx[:, 1] - sx[:, 0]) * (sy[:, 2] - sy[:, 0]) - (sx[:, 2] - sx[:, 0]) * (sy[:, 1] - sy[:, 0])
+        low_x = np.floor(sx.min(axis=1)).astype(np.int64)
+        high_x = np.ceil(sx.max(axis=1)).astype(np.int64)
+        low_y = np.floor(sy.min(axis=1)).astype(np.int64)
+        high_y = np.ceil(sy.max(axis=1)).astype(np.int64)
+        visible = ((area != 0) & (high_x >= 0) & (low_x < self.width) & (high_y >= 0) & (low_y < self.height))
+        if not visible.any():
+            return None
+        sx, sy, sz, inv_w = sx[visible], sy[visible], sz[visible], inv_w[visible]
+        attributes, area = attributes[visible], area[visible]
+
+        following, previous = [1, 2, 0], [2, 0, 1]
+        a = (sy[:, following] - sy[:, previous]) / area[:, None]
+        b = (sx[:, previous] - sx[:, following]) / area[:, None]
+        c = (sx[:, following] * sy[:, previous] - sx[:, previous] * sy[:, following]) / area[:, None]
+        # c moves to the first pixel centre of the box, per-pixel sums stay small
+        # enough for float32
+        x0 = np.clip(low_x[visible], 0, self.width - 1)
+        y0 = np.clip(low_y[visible], 0, self.height - 1)
+        c += a * (x0 + 0.5)[:, None] + b * (y0 + 0.5)[:, None]
+        f32 = np.float32
+        return {
+            "area": area,
+            "a": a, "b": b, "c": c, "a32": a.astype(f32),
+            "z": sz.astype(f32), "q": inv_w.astype(f32),
+            "uq": (attributes[:, :, 0] * inv_w).astype(f32), "vq": (attributes[:, :, 1] * inv_w).astype(f32),
+            "shade": attributes[:, 0, 2].astype(f32),
+            "x0": x0, "x1": np.clip(high_x[visible], 0, self.width - 1),
+            "y0": y0, "y1": np.clip(high_y[visible], 0, self.height - 1),
+        }
+
+    def _bands(self):
+        count = max(1, min(self.threads, self.height))
+        edges = np.linspace(0, self.height, count + 1).astype(int)
+        return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+    def _raster(self, setup, image, top, bottom):
+        # Rows top..bottom-1 only, returns how many pixels were written
+        y0 = np.maximum(setup["y0"], top)
+        y1 = np.minimum(setup["y1"], bottom - 1)
+        mine = np.flatnonzero(y1 >= y0)
+        if not len(mine):
+            return 0
+        heights = y1[mine] - y0[mine] + 1
+        area = heights * (setup["x1"][mine] - setup["x0"][mine] + 1)
+
+        # Chunks of whole triangles, each at most about CANDIDATES_PER_CHUNK pixels
+        ends = np.cumsum(area)
+        cuts = np.searchsorted(ends, np.arange(CANDIDATES_PER_CHUNK, ends[-1], CANDIDATES_PER_CHUNK), side="right")
+        written = 0
+        for part in np.split(np.arange(len(mine)), np.unique(cuts)):
+            if len(part):
+                written += self._raster_chunk(setup, image, mine[part], y0[mine[part]], heights[part])
+        return written
+
+    def _raster_chunk(self, setup, image, tris, rows, heights):
+        # One span per (triangle, row): where all three edge functions are >= 0.
+        # Along a row E_i = a_i * dx + B_i, so each edge bounds dx from one side.
+        owner, local = _expand(heights)
+        t = tris[owner]
+        py = rows[owner] + local
+        a = setup["a"][t]
+        row_start = setup["b"][t] * (py - setup["y0"][t])[:, None] + setup["c"][t]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = -row_start / a
+        lo = np.ceil(np.where(a > 0, crossing, 0).max(axis=1))
+        hi = np.floor(np.where(a < 0, crossing, np.inf).min(axis=1))
+        hi = np.minimum(hi, (setup["x1"] - setup["x0"])[t])
+        empty = ((a == 0) & (row_start < 0)).any(axis=1)
+        spans = np.where(empty, 0, np.maximum(hi - lo + 1, 0)).astype(np.int64)
+
+        # Pixels of every span, barycentrics straight from the row start
+        row, local = _expand(spans)
+        t = t[row]
+        dx = lo.astype(np.int64)[row] + local
+        bary = row_start.astype(np.float32)[row] + setup["a32"][t] * dx.astype(np.float32)[:, None]
+        pixel = py[row] * self.width + setup["x0"][t] + dx
+        depth = np.einsum('ij,ij->i', bary, setup["z"][t])
+
+        # Depth test against the buffer, then the nearest candidate wins per pixel:
+        # minimum.at leaves the smallest depth in the buffer, whoever matches it drew it
+        flat_depth = self.depth.reshape(-1)
+        front = (depth >= 0) & (depth < flat_depth[pixel])
+        t, bary, pixel, depth = t[front], bary[front], pixel[front], depth[front]
+        if not len(t):
+            return 0
+        np.minimum.at(flat_depth, pixel, depth)
+        wins = depth == flat_depth[pixel]
+        t, bary, pixel = t[wins], bary[wins], pixel[wins]
+
+        if image is None:
+            color = np.full((len(t), 3), 255.0, dtype=np.float32)
+        else:
+            q = np.einsum('ij,ij->i', bary, setup["q"][t])
+            u = np.einsum('ij,ij->i', bary, setup["uq"][t]) / q
+            v = np.einsum('ij,ij->i', bary, setup["vq"][t]) / q
+            color = sample(image, u, v, self.filter)
+        if self.shade:
+            color *= setup["shade"][t][:, None]
+        self.color.reshape(-1, 3)[pixel] = np.clip(color, 0, 255).astype(np.uint8)
+        return len(pixel)
@@ -0,0 +1,214 @@
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+from OpenGL.GL import GL_NEAREST, GL_CLAMP_TO_EDGE
+from acid.pythontwo.ThreeD.objloader import load_obj
+from acid.pythontwo.ThreeD.renderer import mesh_arrays, buffers_supported
+from acid.pythontwo.ThreeD.textures import texture_manager, decode_image, upload_texture
+import acid.pythontwo.profiler.profiler as profiler
+
+logger = logging.getLogger(__name__)
+
+# --- ASSET STREAMING ---
+# Reading, OBJ parsing and image decoding run on a worker pool; load_* return a handle
+# right away. Everything that touches GL happens in pump() on the main thread, one
+# finished asset at a time until the frame's time budget is spent. Until then the
+# target objects draw with a placeholder (checker texture, small cube).
+#
+#   streamer = AssetStreamer()
+#   streamer.load_mesh("level/tree.obj", tree)
+#   streamer.load_texture("level/bark.png", tree)
+#   engine.scheduler.add_idle(streamer.pump)   # or streamer.pump() once per frame
+#
+# A texture preloaded without a target stays on the GPU through its handle until
+# handle.release(); targets hold their own reference through texture_manager.
+
+PENDING, READY, FAILED = "pending", "ready", "failed"
+
+# Unit cube, 8 corners and 12 triangles, same (v, uv) face layout as load_obj
+_CUBE_VERTICES = np.array([(x, y, z) for x in (-0.5, 0.5) for y in (-0.5, 0.5) for z in (-0.5, 0.5)],
+                          dtype=np.float32)
+_CUBE_UVS = np.array([(0, 0), (1, 0), (1, 1), (0, 1)], dtype=np.float32)
+_CUBE_QUADS = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+_CUBE_FACES = np.array([[(q[a], a) for a in corners] for q in _CUBE_QUADS for corners in ((0, 1, 2), (0, 2, 3))],
+                       dtype=np.int32)
+
+_placeholder_texture = None
+
+
+def _read_mesh(path, cache):
+    # Worker side: parse and also build the GPU arrays, leaving only glBufferData for pump()
+    vertices, uvs, faces = load_obj(path, cache)
+    return vertices, uvs, faces, mesh_arrays(vertices, uvs, faces)
+
+
+def placeholder_texture():
+    # 2x2 grey checker, made once on first use
+    global _placeholder_texture
+    if _placeholder_texture is None:
+        data = bytes([200, 200, 200, 90, 90, 90, 90, 90, 90, 200, 200, 200])
+        _placeholder_texture = upload_texture(2, 2, data, mipmaps=False, min_filter=GL_NEAREST,
+                                              mag_filter=GL_NEAREST, wrap=GL_CLAMP_TO_EDGE)
+    return _placeholder_texture
+
+
+class AssetHandle:
+    def __init__(self, kind, key, future):
+        self.kind = kind  # "mesh" or "texture"
+        self.key = key
+        self.future = future
+        self.state = PENDING
+        self.result = None  # (vertices, uvs, faces, buffer arrays) or a texture id
+        self.error = None
+        self._callbacks = []
+        self._keep = False  # a caller asked without a target and wants the result itself
+        self._holds = False  # result is a texture id this handle holds a reference to
+
+    def done(self):
+        return self.state != PENDING
+
+    def add_done_callback(self, callback):
+        # callback(handle), called from pump() on the main thread
+        if self.done():
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def _finish(self, state, result=None, error=None):
+        self.state = state
+        self.result = result
+        self.error = error
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def release(self):
+        # Let go of the handle's texture reference, result is not valid after this
+        if self._holds:
+            self._holds = False
+            texture_manager.release(self.result)
+
+
+class AssetStreamer:
+    def __init__(self, workers=4, processes=False, budget=0.004):
+        # Processes sidestep the GIL for pure python decoding, threads avoid pickling
+        # the results back; numpy parsing and image decoding mostly release the GIL
+        pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self.executor = pool(max_workers=workers)
+        self.budget = budget  # seconds of main-thread upload work per pump()
+        self.uploads = 0
+        self._finished = queue.SimpleQueue()  # handles whose worker part is done
+        self._in_flight = {}
+
+    def _submit(self, kind, key, func, *args):
+        handle = self._in_flight.get(key)
+        if handle is None:
+            handle = AssetHandle(kind, key, self.executor.submit(func, *args))
+            self._in_flight[key] = handle
+            handle.future.add_done_callback(lambda _: self._finished.put(handle))
+        return handle
+
+    def load_mesh(self, path, target=None, placeholder=True, cache=True):
+        handle = self._submit("mesh", ("mesh", path), _read_mesh, path, cache)
+        if target is not None:
+            if placeholder and not len(target.vertices):
+                target.vertices, target.uvs, target.faces = _CUBE_VERTICES, _CUBE_UVS, _CUBE_FACES
+            handle.add_done_callback(lambda done: self._apply_mesh(done, target))
+        return handle
+
+    def load_texture(self, path, target=None, placeholder=True, mipmaps=True):
+        key = texture_manager.make_key(path, mipmaps=mipmaps)
+        handle = self._in_flight.get(key)
+        if handle is None:
+            tex_id = texture_manager.get(key)
+            if tex_id is not None:
+                # Already on the GPU, nothing to stream
+                handle = AssetHandle("texture", key, None)
+                handle._holds = True
+                handle._finish(READY, tex_id)
+            else:
+                handle = self._submit("texture", key, decode_image, path)
+        if target is not None:
+            if placeholder and target.tex_id is None:
+                target.tex_id = placeholder_texture()
+            handle.add_done_callback(lambda done: self._apply_texture(done, target))
+        else:
+            handle._keep = True
+        if handle.done() and not handle._keep:
+            handle.release()
+        return handle
+
+    def _apply_mesh(self, handle, target):
+        if handle.state == READY:
+            vertices, uvs, faces, arrays = handle.result
+            target.vertices, target.uvs, target.faces = vertices, uvs, faces
+            if target.use_buffers and buffers_supported():
+                target.upload_buffers(arrays)
+
+    def _apply_texture(self, handle, target):
+        if handle.state != READY:
+            return
+        tex_id = texture_manager.get(handle.key)
+        if tex_id is None:
+            return  # released and evicted before this target got to it
+        if target.tex_id == _placeholder_texture:
+            target.tex_id = None
+        target.release_texture()
+        target.tex_id = tex_id
+
+    def _complete(self, handle):
+        # Main-thread half of a load: GL uploads and handing results to targets
+        del self._in_flight[handle.key]
+        error = handle.future.exception()
+        if error is not None:
+            logger.warning("Failed to load %s %s: %s", handle.kind, handle.key, error)
+            handle._finish(FAILED, error=error)
+            return
+
+        if handle.kind == "texture":
+            width, height, data = handle.future.result()
+            texture_manager.insert(handle.key, width, height, data)
+            handle._holds = True
+            handle._finish(READY, texture_manager.get(handle.key))
+            if not handle._keep:
+                handle.release()  # the targets took their own references
+        else:
+            handle._finish(READY, handle.future.result())
+        self.uploads += 1
+
+    def pending(self):
+        return len(self._in_flight)
+
+    def pump(self, budget=None):
+        # Finish loads until `budget` seconds (default self.budget) are used; at least one
+        # per call so progress never stalls. True while finished loads are still queued,
+        # so it can be passed straight to Scheduler.add_idle.
+        budget = self.budget if budget is None else budget
+        start = profiler.now()
+        deadline = start + budget
+        finished = 0
+        while True:
+            try:
+                handle = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            self._complete(handle)
+            finished += 1
+            if profiler.now() >= deadline:
+                break
+
+        prof = profiler.active
+        if prof is not None and finished:
+            prof.record("stream", start)
+            prof.count("asset_uploads", finished)
+        return not self._finished.empty()
+
+    def wait(self):
+        # Block until everything requested so far is loaded, e.g. behind a loading screen
+        while self._in_flight:
+            handle = self._finished.get()
+            self._complete(handle)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,243 @@
+import os
+from collections import OrderedDict
+import numpy as np
+import pygame
+from OpenGL.GL import *
+from OpenGL.GLU import gluBuild2DMipmaps
+
+# --- TEXTURE CACHE ---
+# One GL texture per (path, sampling params) for the whole process. Objects acquire
+# and release it; the texture is deleted when the last user lets go, or kept around
+# for reuse when a memory budget is set and evicted least-recently-used first.
+
+def decode_image(path):
+    texture = pygame.image.load(path)
+    texture = pygame.transform.flip(texture, False, True)
+    texture_data = pygame.image.tostring(texture, "RGB", True)
+    return texture.get_width(), texture.get_height(), texture_data
+
+
+def upload_texture(width, height, data, mipmaps=True, min_filter=None, mag_filter=GL_LINEAR, wrap=GL_REPEAT,
+                   pixel_format=GL_RGB):
+    if min_filter is None:
+        min_filter = GL_LINEAR_MIPMAP_LINEAR if mipmaps else GL_LINEAR
+
+    tex_id = glGenTextures(1)
+    glBindTexture(GL_TEXTURE_2D, tex_id)
+    glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+    if mipmaps and not bool(glGenerateMipmap):
+        gluBuild2DMipmaps(GL_TEXTURE_2D, pixel_format, width, height, pixel_format, GL_UNSIGNED_BYTE, data)
+    else:
+        glTexImage2D(GL_TEXTURE_2D, 0, pixel_format, width, height, 0, pixel_format, GL_UNSIGNED_BYTE, data)
+        if mipmaps:
+            glGenerateMipmap(GL_TEXTURE_2D)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, min_filter)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, mag_filter)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, wrap)
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, wrap)
+    glBindTexture(GL_TEXTURE_2D, 0)
+    return tex_id
+
+
+class _Texture:
+    def __init__(self, key, tex_id, nbytes):
+        self.key = key
+        self.tex_id = tex_id
+        self.nbytes = nbytes
+        self.refs = 0
+
+
+class TextureManager:
+    def __init__(self, budget=None):
+        self.budget = budget  # bytes of VRAM unused textures may keep, None = delete at once
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self._by_key = {}
+        self._by_id = {}
+        self._unused = OrderedDict()  # zero-ref textures, oldest first
+
+    @staticmethod
+    def make_key(path, mipmaps=True, min_filter=None, mag_filter=GL_LINEAR, wrap=GL_REPEAT):
+        return (os.path.abspath(path), bool(mipmaps), min_filter, mag_filter, wrap)
+
+    def acquire(self, path, mipmaps=True, min_filter=None, mag_filter=GL_LINEAR, wrap=GL_REPEAT):
+        key = self.make_key(path, mipmaps, min_filter, mag_filter, wrap)
+        entry = self._by_key.get(key)
+        if entry is None:
+            self.misses += 1
+            width, height, data = decode_image(path)
+            entry = self.insert(key, width, height, data)
+        else:
+            self.hits += 1
+        return self._ref(entry)
+
+    def insert(self, key, width, height, data):
+        # Upload already decoded RGB data under `key`, starts with no references. A key
+        # that is already resident keeps its texture, users may hold its id.
+        entry = self._by_key.get(key)
+        if entry is not None:
+            return entry
+
+        _, mipmaps, min_filter, mag_filter, wrap = key
+        tex_id = upload_texture(width, height, data, mipmaps, min_filter, mag_filter, wrap)
+        nbytes = width * height * 3
+        if mipmaps:
+            nbytes = nbytes * 4 // 3
+
+        entry = _Texture(key, tex_id, nbytes)
+        self._by_key[key] = entry
+        self._by_id[tex_id] = entry
+        self._unused[key] = entry
+        self.memory += nbytes
+        return entry
+
+    def _ref(self, entry):
+        entry.refs += 1
+        self._unused.pop(entry.key, None)
+        self._evict()
+        return entry.tex_id
+
+    def get(self, key):
+        entry = self._by_key.get(key)
+        return None if entry is None else self._ref(entry)
+
+    def retain(self, tex_id):
+        # One more reference to an id handed out by acquire()/get(), release() it the same
+        # way. Ids this manager doesn't own are left alone.
+        entry = self._by_id.get(tex_id)
+        if entry is not None:
+            self._ref(entry)
+        return tex_id
+
+    def release(self, tex_id):
+        entry = self._by_id.get(tex_id)
+        if entry is None or entry.refs == 0:
+            return
+        entry.refs -= 1
+        if entry.refs == 0:
+            self._unused[entry.key] = entry
+            self._evict()
+
+    def _evict(self):
+        budget = 0 if self.budget is None else self.budget
+        while self._unused and self.memory > budget:
+            _, entry = self._unused.popitem(last=False)
+            self._delete(entry)
+
+    def _delete(self, entry):
+        glDeleteTextures([entry.tex_id])
+        del self._by_key[entry.key]
+        del self._by_id[entry.tex_id]
+        self.memory -= entry.nbytes
+
+    def clear(self):
+        for entry in list(self._by_key.values()):
+            self._delete(entry)
+        self._unused.clear()
+
+    def stats(self):
+        return {
+            "textures": len(self._by_key),
+            "unused": len(self._unused),
+            "memory": self.memory,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+texture_manager = TextureManager()
+
+# --- GLYPH ATLAS ---
+# Printable ASCII of one font and size rendered white into a single RGBA texture, with
+# a white block in the corner so plain quads can be drawn from the same texture.
+# Anything outside ASCII shows up as "?".
+
+GLYPHS = "".join(chr(code) for code in range(32, 127))
+WHITE_BLOCK = 4
+
+
+class GlyphAtlas:
+    def __init__(self, font=None, size=16, padding=1):
+        if not pygame.font.get_init():
+            pygame.font.init()
+        face = pygame.font.SysFont(font, size) if font else pygame.font.Font(None, size)
+        self.font = font
+        self.size = size
+        self.line_height = face.get_linesize()
+        self.tex_id = None
+
+        glyphs = [face.render(char, True, (255, 255, 255)) for char in GLYPHS]
+        self.width, self.height, places = self._pack(glyphs, padding)
+
+        atlas = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        atlas.fill((255, 255, 255, 0))
+        atlas.fill((255, 255, 255, 255), (0, 0, WHITE_BLOCK, WHITE_BLOCK))
+        for glyph, place in zip(glyphs, places):
+            # MAX keeps the rgb white and takes the glyph's alpha as is
+            atlas.blit(glyph, place, special_flags=pygame.BLEND_RGBA_MAX)
+        self.data = pygame.image.tostring(atlas, "RGBA", False)  # first row is v = 0
+
+        # Per character code tables, codes outside the atlas point at "?"
+        self.lookup = np.full(256, GLYPHS.index("?"), dtype=np.intp)
+        self.lookup[32:127] = np.arange(len(GLYPHS))
+        self.lookup[[ord("\t"), ord("\n")]] = 0
+        sizes = np.array([glyph.get_size() for glyph in glyphs], dtype=np.float32)
+        places = np.array(places, dtype=np.float32)
+        self.advance = sizes[:, 0]
+        self.glyph_height = sizes[:, 1]
+        self.uvs = np.column_stack((places[:, 0] / self.width, (places[:, 1] + sizes[:, 1]) / self.height,
+                                    (places[:, 0] + sizes[:, 0]) / self.width, places[:, 1] / self.height))
+        self.white_uv = (WHITE_BLOCK / 2 / self.width, WHITE_BLOCK / 2 / self.height)
+
+    @staticmethod
+    def _pack(glyphs, padding):
+        # Shelf packing into the narrowest power of two width that keeps it roughly square
+        area = sum((g.get_width() + padding) * (g.get_height() + padding) for g in glyphs)
+        width = 64
+        while width * width < area:
+            width *= 2
+        places = []
+        x, y, shelf = WHITE_BLOCK + padding, 0, WHITE_BLOCK + padding
+        for glyph in glyphs:
+            w, h = glyph.get_size()
+            if x + w > width:
+                x, y, shelf = 0, y + shelf, 0
+            places.append((x, y))
+            x += w + padding
+            shelf = max(shelf, h + padding)
+        height = 1
+        while height < y + shelf:
+            height *= 2
+        return width, height, places
+
+    def texture(self):
+        # Uploaded on first use, so an atlas can be built before there is a GL context
+        if self.tex_id is None:
+            self.tex_id = upload_texture(self.width, self.height, self.data, mipmaps=False,
+                                         wrap=GL_CLAMP_TO_EDGE, pixel_format=GL_RGBA)
+        return self.tex_id
+
+    def release(self):
+        if self.tex_id is not None:
+            glDeleteTextures([self.tex_id])
+            self.tex_id = None
+
+    def measure(self, text):
+        return float(self.advance[self._indices(text)].sum())
+
+    def _indices(self, text):
+        return self.lookup[np.frombuffer(text.encode("ascii", "replace"), dtype=np.uint8)]
+
+    def layout(self, text, x, y):
+        # (n, 8) rows of x0, y0, x1, y1, u0, v0, u1, v1 with (x, y) the bottom left of the line
+        index = self._indices(text)
+        advance = self.advance[index]
+        left = x + np.cumsum(advance) - advance
+        rows = np.empty((len(index), 8), dtype=np.float32)
+        rows[:, 0] = left
+        rows[:, 1] = y
+        rows[:, 2] = left + advance
+        rows[:, 3] = y + self.glyph_height[index]
+        rows[:, 4:] = self.uvs[index]
+        return rows
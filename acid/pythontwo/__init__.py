@@ -0,0 +1,14 @@
+import importlib
+
+# Subsystems load on first use: acid.pythontwo.ThreeD only imports OpenGL when touched
+SUBPACKAGES = ("math", "ThreeD", "window", "ui", "profiler", "scheduler")
+
+
+def __getattr__(name):
+    if name in SUBPACKAGES:
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(SUBPACKAGES))
@@ -0,0 +1,23 @@
+import importlib
+
+# --- LAZY EXPORTS ---
+# Package __init__ files map public names to the module that defines them. Nothing
+# gets imported until the name is first used, so `import acid.pythontwo.math` does
+# not drag in numpy, pygame or OpenGL.
+#
+#   __getattr__, __dir__ = lazy(__name__, {"Engine3D": ".renderer"})
+
+
+def lazy(package, exports):
+    def __getattr__(name):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError("module %r has no attribute %r" % (package, name))
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(importlib.import_module(package), name, value)  # next lookup skips this
+        return value
+
+    def __dir__():
+        return sorted(set(vars(importlib.import_module(package))) | set(exports))
+
+    return __getattr__, __dir__
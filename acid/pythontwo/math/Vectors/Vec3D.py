@@ -1,11 +1,16 @@
 import math as m
 
+# Same layout as Vect2D: slotted plain components, equality and hashing by value,
+# and operators next to the original methods.
+
 class Vect3D:
+    __slots__ = ("x", "y", "z")
+
     def __init__(self, x=0.0, y=0.0, z=0.0):
         self.x = x
         self.y = y
         self.z = z
-    
+
     def returnvec(self):
         return (self.x, self.y, self.z)
 
@@ -13,49 +18,47 @@ class Vect3D:
         if isinstance(other, Vect3D):
             return Vect3D(self.x + other.x, self.y + other.y, self.z + other.z)
         else:
-            raise TypeError("Unsupported operand type(s) for +: 'Vec3D' and '{type(other).__name__}'")
-    
+            raise TypeError(f"Unsupported operand type(s) for +: 'Vec3D' and '{type(other).__name__}'")
+
     def sub(self, other):
         if isinstance(other, Vect3D):
             return Vect3D(self.x - other.x, self.y - other.y, self.z - other.z)
         else:
-            raise TypeError("Unsupported operand type(s) for -: 'Vec3D' and '{type(other).__name__}'")
-    
+            raise TypeError(f"Unsupported operand type(s) for -: 'Vec3D' and '{type(other).__name__}'")
+
     def mul(self, scalar):
         return Vect3D(self.x * scalar, self.y * scalar, self.z * scalar)
-    
+
     def div(self, scalar):
         if isinstance(scalar, (int, float)):
             return Vect3D(self.x / scalar, self.y / scalar, self.z / scalar)
         else:
-            raise TypeError("Unsupported operand type(s) for /: 'Vec3D' and '{type(scalar).__name__}'")
-    
+            raise TypeError(f"Unsupported operand type(s) for /: 'Vec3D' and '{type(scalar).__name__}'")
+
     def dot(self, other):
         if isinstance(other, Vect3D):
             return self.x * other.x + self.y * other.y + self.z * other.z
         else:
-            raise TypeError("Unsupported operand type(s) for *: 'Vec3D' and '{type(other).__name__}'")
-    
+            raise TypeError(f"Unsupported operand type(s) for *: 'Vec3D' and '{type(other).__name__}'")
+
     def cross(self, other):
         if isinstance(other, Vect3D):
-            return Vect3D(
-                self.y * other.z - self.z * other.y,
-                self.z * other.x - self.x * other.z,
-                self.x * other.y - self.y * other.x
-            )
+            ax, ay, az = self.x, self.y, self.z
+            bx, by, bz = other.x, other.y, other.z
+            return Vect3D(ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx)
         else:
-            raise TypeError("Unsupported operand type(s) for ^: 'Vec3D' and '{type(other).__name__}'")
-    
+            raise TypeError(f"Unsupported operand type(s) for ^: 'Vec3D' and '{type(other).__name__}'")
+
     def magnitude(self):
-        return (self.x ** 2 + self.y ** 2 + self.z ** 2) ** 0.5
-    
+        return m.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
     def normalize(self):
         magnitude = self.magnitude()
         if magnitude != 0:
             return Vect3D(self.x / magnitude, self.y / magnitude, self.z / magnitude)
         else:
             raise ValueError("Cannot normalize a zero vector")
-    
+
     def project(self, focal_length):
         if self.z + focal_length == 0:  # Prevent division by zero
             return (0, 0, 0)  # or raise an exception
@@ -63,15 +66,107 @@ class Vect3D:
         projected_y = (self.y * focal_length) / (self.z + focal_length)
         return (projected_x, projected_y, 0)
 
-
-    
     def angle_between(self, other):
         if isinstance(other, Vect3D):
             dot_product = self.dot(other)
             magnitude_product = self.magnitude() * other.magnitude()
-            return m.acos(dot_product / magnitude_product)
+            return m.acos(max(-1.0, min(1.0, dot_product / magnitude_product)))
         else:
-            raise TypeError("Unsupported operand type(s) for *: 'Vec3D' and '{type(other).__name__}'")
-    
+            raise TypeError(f"Unsupported operand type(s) for *: 'Vec3D' and '{type(other).__name__}'")
+
+    # --- operators ---
+    def __add__(self, other):
+        if not isinstance(other, Vect3D):
+            return NotImplemented
+        return Vect3D(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __radd__(self, other):
+        # sum() starts from 0
+        if isinstance(other, (int, float)) and other == 0:
+            return Vect3D(self.x, self.y, self.z)
+        return NotImplemented
+
+    def __sub__(self, other):
+        if not isinstance(other, Vect3D):
+            return NotImplemented
+        return Vect3D(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, scalar):
+        # float checked first, the tuple isinstance costs more than the multiply
+        if scalar.__class__ is not float and not isinstance(scalar, (int, float)):
+            return NotImplemented
+        return Vect3D(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        if not isinstance(scalar, (int, float)):
+            return NotImplemented
+        return Vect3D(self.x / scalar, self.y / scalar, self.z / scalar)
+
+    def __neg__(self):
+        return Vect3D(-self.x, -self.y, -self.z)
+
+    def __pos__(self):
+        return Vect3D(self.x, self.y, self.z)
+
+    def __abs__(self):
+        return self.magnitude()
+
+    # In place: same object, no allocation
+    def __iadd__(self, other):
+        if not isinstance(other, Vect3D):
+            return NotImplemented
+        self.x += other.x
+        self.y += other.y
+        self.z += other.z
+        return self
+
+    def __isub__(self, other):
+        if not isinstance(other, Vect3D):
+            return NotImplemented
+        self.x -= other.x
+        self.y -= other.y
+        self.z -= other.z
+        return self
+
+    def __imul__(self, scalar):
+        if scalar.__class__ is not float and not isinstance(scalar, (int, float)):
+            return NotImplemented
+        self.x *= scalar
+        self.y *= scalar
+        self.z *= scalar
+        return self
+
+    def __itruediv__(self, scalar):
+        if not isinstance(scalar, (int, float)):
+            return NotImplemented
+        self.x /= scalar
+        self.y /= scalar
+        self.z /= scalar
+        return self
+
+    def __eq__(self, other):
+        if isinstance(other, Vect3D):
+            return self.x == other.x and self.y == other.y and self.z == other.z
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.x, self.y, self.z))
+
+    def __iter__(self):
+        yield self.x
+        yield self.y
+        yield self.z
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, index):
+        return (self.x, self.y, self.z)[index]
+
+    def __reduce__(self):
+        return (type(self), (self.x, self.y, self.z))
+
     def __repr__(self):
         return f"{(self.x, self.y, self.z)}"
\ No newline at end of file
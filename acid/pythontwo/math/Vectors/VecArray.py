@@ -0,0 +1,228 @@
+import numpy as np
+import acid.pythontwo.math.Vectors.Vec2D as v2
+import acid.pythontwo.math.Vectors.Vec3D as v3
+
+# Structure-of-arrays versions of Vect2D / Vect3D: N vectors in one contiguous
+# (N, 2) or (N, 3) numpy buffer. Every op works on all of them at once.
+
+class _VectArray:
+    size = 0
+    scalar = None
+
+    def __init__(self, data=None, count=0, dtype=np.float32):
+        if data is None:
+            self.data = np.zeros((count, self.size), dtype=dtype)
+        else:
+            # No copy when data is already a C-contiguous array of the right dtype
+            self.data = np.ascontiguousarray(data, dtype=dtype).reshape(-1, self.size)
+
+    @classmethod
+    def _wrap(cls, data):
+        out = cls.__new__(cls)
+        out.data = data
+        return out
+
+    @classmethod
+    def from_vectors(cls, vectors, dtype=np.float32):
+        return cls([cls._components(v) for v in vectors], dtype=dtype)
+
+    def to_vectors(self):
+        return [self.scalar(*row) for row in self.data.tolist()]
+
+    def tolist(self):
+        return [tuple(row) for row in self.data.tolist()]
+
+    def copy(self):
+        return self._wrap(self.data.copy())
+
+    @property
+    def gl_buffer(self):
+        # Contiguous float buffer, pass straight to glVertexPointer/glBufferData
+        return self.data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.scalar(*self.data[index].tolist())
+        return self._wrap(self.data[index])
+
+    def __setitem__(self, index, value):
+        self.data[index] = self._operand(value)
+
+    def _operand(self, other):
+        if isinstance(other, _VectArray):
+            return other.data
+        if isinstance(other, self.scalar):
+            return np.array(self._components(other), dtype=self.data.dtype)
+        return np.asarray(other, dtype=self.data.dtype)
+
+    def _scalars(self, value):
+        # A per-vector scalar array has to line up with the rows
+        value = np.asarray(value, dtype=self.data.dtype)
+        return value[:, None] if value.ndim == 1 else value
+
+    # --- new arrays ---
+    def add(self, other):
+        return self._wrap(self.data + self._operand(other))
+
+    def sub(self, other):
+        return self._wrap(self.data - self._operand(other))
+
+    def mul(self, scalar):
+        return self._wrap(self.data * self._scalars(scalar))
+
+    def div(self, scalar):
+        scalar = self._scalars(scalar)
+        if np.any(scalar == 0):
+            raise ValueError('Cannot divide by zero')
+        return self._wrap(self.data / scalar)
+
+    # --- in place ---
+    def iadd(self, other):
+        self.data += self._operand(other)
+        return self
+
+    def isub(self, other):
+        self.data -= self._operand(other)
+        return self
+
+    def imul(self, scalar):
+        self.data *= self._scalars(scalar)
+        return self
+
+    def idiv(self, scalar):
+        scalar = self._scalars(scalar)
+        if np.any(scalar == 0):
+            raise ValueError('Cannot divide by zero')
+        self.data /= scalar
+        return self
+
+    __add__ = add
+    __sub__ = sub
+    __mul__ = mul
+    __rmul__ = mul
+    __truediv__ = div
+    __iadd__ = iadd
+    __isub__ = isub
+    __imul__ = imul
+    __itruediv__ = idiv
+
+    def __neg__(self):
+        return self._wrap(-self.data)
+
+    # --- products and lengths ---
+    def dot(self, other):
+        return np.einsum('ij,ij->i', self.data, np.broadcast_to(self._operand(other), self.data.shape))
+
+    def magnitude(self):
+        return np.sqrt(self.dot(self.data))
+
+    def _unit(self, zero_ok):
+        magnitude = self.magnitude()
+        zero = magnitude == 0
+        if zero.any():
+            if not zero_ok:
+                raise ValueError("Cannot normalize a zero vector")
+            magnitude = np.where(zero, 1, magnitude)
+        return magnitude[:, None]
+
+    def angle_between(self, other):
+        other = np.broadcast_to(self._operand(other), self.data.shape)
+        magnitudes = self.magnitude() * np.sqrt(np.einsum('ij,ij->i', other, other))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cos = np.clip(self.dot(other) / magnitudes, -1.0, 1.0)
+        return np.where(magnitudes == 0, 0.0, np.arccos(cos))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.tolist()})"
+
+
+class Vect2DArray(_VectArray):
+    size = 2
+    scalar = v2.Vect2D
+
+    @staticmethod
+    def _components(vector):
+        return (vector.x, vector.y)
+
+    @property
+    def x(self):
+        return self.data[:, 0]
+
+    @property
+    def y(self):
+        return self.data[:, 1]
+
+    def returnvect(self):
+        return self.tolist()
+
+    def cross(self, other):
+        other = np.broadcast_to(self._operand(other), self.data.shape)
+        return self.data[:, 0] * other[:, 1] - self.data[:, 1] * other[:, 0]
+
+    # Like Vect2D.norm, zero vectors stay zero
+    def normalize(self):
+        return self._wrap(self.data / self._unit(True))
+
+    def inormalize(self):
+        self.data /= self._unit(True)
+        return self
+
+    def project(self, onto):
+        # Projection of every vector onto `onto`
+        onto = np.broadcast_to(self._operand(onto), self.data.shape)
+        length = np.einsum('ij,ij->i', onto, onto)
+        scale = np.divide(self.dot(onto), length, out=np.zeros_like(length), where=length != 0)
+        return self._wrap(onto * scale[:, None])
+
+    # Vect2D spellings
+    mag = _VectArray.magnitude
+    norm = normalize
+    angle = _VectArray.angle_between
+
+
+class Vect3DArray(_VectArray):
+    size = 3
+    scalar = v3.Vect3D
+
+    @staticmethod
+    def _components(vector):
+        return (vector.x, vector.y, vector.z)
+
+    @property
+    def x(self):
+        return self.data[:, 0]
+
+    @property
+    def y(self):
+        return self.data[:, 1]
+
+    @property
+    def z(self):
+        return self.data[:, 2]
+
+    def returnvec(self):
+        return self.tolist()
+
+    def cross(self, other):
+        other = np.broadcast_to(self._operand(other), self.data.shape)
+        return self._wrap(np.cross(self.data, other).astype(self.data.dtype, copy=False))
+
+    # Like Vect3D.normalize, a zero vector is an error
+    def normalize(self):
+        return self._wrap(self.data / self._unit(False))
+
+    def inormalize(self):
+        self.data /= self._unit(False)
+        return self
+
+    def project(self, focal_length):
+        # Same perspective divide as Vect3D.project, (0, 0, 0) where z + f == 0
+        depth = self.data[:, 2] + focal_length
+        safe = np.where(depth == 0, 1, depth)
+        out = np.zeros_like(self.data)
+        out[:, :2] = self.data[:, :2] * (focal_length / safe)[:, None]
+        out[depth == 0] = 0
+        return self._wrap(out)
@@ -1,14 +1,154 @@
+import math as m
+import operator
+from array import array
+
 # any number of elements in a vector
+# Stored as one array('d') of doubles instead of a list of float objects. Element-wise
+# math runs through map() over the two arrays, so the loop stays in C. Like Vect3D,
+# equal and hashed by value.
 
 class vectND:
-    def __init__(self, n, elements):
-        self.n = n
+    __slots__ = ("elements",)
+
+    def __init__(self, n, elements=None):
+        if elements is None:
+            elements = array('d', bytes(8 * n))
+        elif not isinstance(elements, array) or elements.typecode != 'd':
+            elements = array('d', elements)
+        if len(elements) != n:
+            raise ValueError(f"Expected {n} elements, got {len(elements)}")
         self.elements = elements
-    
+
+    @classmethod
+    def _wrap(cls, elements):
+        out = cls.__new__(cls)
+        out.elements = elements
+        return out
+
+    @property
+    def n(self):
+        return len(self.elements)
+
     def returnvec(self):
         return str(tuple(self.elements))
-    
+
+    def _check(self, other, symbol):
+        if not isinstance(other, vectND):
+            raise TypeError(f"Unsupported operand type(s) for {symbol}: 'vectND' and '{type(other).__name__}'")
+        if len(other.elements) != len(self.elements):
+            raise ValueError(f"Size mismatch: {len(self.elements)} and {len(other.elements)}")
+
     def add(self, other):
-        for i in range(len(self.elements)):
-            pass
-    
\ No newline at end of file
+        self._check(other, "+")
+        return self._wrap(array('d', map(operator.add, self.elements, other.elements)))
+
+    def sub(self, other):
+        self._check(other, "-")
+        return self._wrap(array('d', map(operator.sub, self.elements, other.elements)))
+
+    def mul(self, scalar):
+        return self._wrap(array('d', [value * scalar for value in self.elements]))
+
+    def div(self, scalar):
+        if scalar == 0:
+            raise ValueError("Cannot divide by zero")
+        return self._wrap(array('d', [value / scalar for value in self.elements]))
+
+    def dot(self, other):
+        self._check(other, "*")
+        return sum(map(operator.mul, self.elements, other.elements))
+
+    def magnitude(self):
+        return m.hypot(*self.elements)
+
+    def normalize(self):
+        magnitude = self.magnitude()
+        if magnitude == 0:
+            raise ValueError("Cannot normalize a zero vector")
+        return self.div(magnitude)
+
+    def distance(self, other):
+        self._check(other, "-")
+        return m.dist(self.elements, other.elements)
+
+    # --- operators ---
+    def __add__(self, other):
+        if not isinstance(other, vectND):
+            return NotImplemented
+        return self.add(other)
+
+    def __sub__(self, other):
+        if not isinstance(other, vectND):
+            return NotImplemented
+        return self.sub(other)
+
+    def __mul__(self, scalar):
+        if not isinstance(scalar, (int, float)):
+            return NotImplemented
+        return self.mul(scalar)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, scalar):
+        if not isinstance(scalar, (int, float)):
+            return NotImplemented
+        return self._wrap(array('d', [value / scalar for value in self.elements]))
+
+    def __neg__(self):
+        return self._wrap(array('d', map(operator.neg, self.elements)))
+
+    def __abs__(self):
+        return self.magnitude()
+
+    # In place: the array is rewritten, the vector object stays the same
+    def __iadd__(self, other):
+        if not isinstance(other, vectND):
+            return NotImplemented
+        self._check(other, "+=")
+        self.elements[:] = array('d', map(operator.add, self.elements, other.elements))
+        return self
+
+    def __isub__(self, other):
+        if not isinstance(other, vectND):
+            return NotImplemented
+        self._check(other, "-=")
+        self.elements[:] = array('d', map(operator.sub, self.elements, other.elements))
+        return self
+
+    def __imul__(self, scalar):
+        if not isinstance(scalar, (int, float)):
+            return NotImplemented
+        self.elements[:] = array('d', [value * scalar for value in self.elements])
+        return self
+
+    def __itruediv__(self, scalar):
+        if not isinstance(scalar, (int, float)):
+            return NotImplemented
+        self.elements[:] = array('d', [value / scalar for value in self.elements])
+        return self
+
+    def __eq__(self, other):
+        if isinstance(other, vectND):
+            return self.elements == other.elements
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self.elements))
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    def __getitem__(self, index):
+        return self.elements[index]
+
+    def __setitem__(self, index, value):
+        self.elements[index] = value
+
+    def __reduce__(self):
+        return (type(self), (len(self.elements), self.elements.tolist()))
+
+    def __repr__(self):
+        return f"{tuple(self.elements)}"
\ No newline at end of file
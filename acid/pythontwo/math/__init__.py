@@ -0,0 +1,13 @@
+from acid.pythontwo._lazy import lazy
+from acid.pythontwo.math.Vectors.Vec2D import Vect2D
+from acid.pythontwo.math.Vectors.Vec3D import Vect3D
+from acid.pythontwo.math.Vectors.VecND import vectND
+
+# Pure python above, the numpy backed names below load on first use
+__getattr__, __dir__ = lazy(__name__, {
+    "matrix": ".matrixes.matrix",
+    "Matrix4": ".matrixes.matrix",
+    "euler_to_matrices": ".matrixes.matrix",
+    "Vect2DArray": ".Vectors.VecArray",
+    "Vect3DArray": ".Vectors.VecArray",
+})
@@ -1,12 +1,17 @@
+import math as m
+import logging
+import numpy as np
 import acid.pythontwo.math.Vectors.Vec3D as v
 
+logger = logging.getLogger(__name__)
+
 class matrix:
     def __init__(self, martix):
         self.matrix = martix
 
     def returnmatrix(self):
         return self.matrix
-    
+
     def tranfoation(self, vector):
         vectors = vector.returnvec()
         result = [0] * len(self.matrix)
@@ -20,26 +25,182 @@ class matrix:
         return v.Vect3D(result[0], result[1], result[2])
 
     def matrixmul(self, other):
-        matrix_a = self.returnmatrix()
-        matrix_b = other.returnmatrix()
-        rows_a = len(matrix_a)
-        cols_a = len(matrix_a[0]) if rows_a > 0 else 0
-        rows_b = len(matrix_b)
-        cols_b = len(matrix_b[0]) if rows_b > 0 else 0
-
-        if cols_a != rows_b:
-            print("Matrices cannot be multiplied due to incompatible dimensions.")
+        matrix_a = np.asarray(self.returnmatrix(), dtype=float)
+        matrix_b = np.asarray(other.returnmatrix(), dtype=float)
+
+        if matrix_a.ndim != 2 or matrix_b.ndim != 2 or matrix_a.shape[1] != matrix_b.shape[0]:
+            logger.warning("Matrices cannot be multiplied due to incompatible dimensions.")
             return None
 
-        # Initialize the result matrix with zeros
-        result_matrix = [[0 for _ in range(cols_b)] for _ in range(rows_a)]
+        return matrix((matrix_a @ matrix_b).tolist())
+
+
+# --- BATCHED ROTATIONS ---
+
+def euler_to_matrices(rotations):
+    # (N, 3) degrees -> (N, 3, 3), rotate X then Y then Z like Object3D.draw
+    r = np.radians(np.asarray(rotations, dtype=float).reshape(-1, 3))
+    cx, cy, cz = np.cos(r).T
+    sx, sy, sz = np.sin(r).T
+    out = np.empty((len(r), 3, 3))
+    out[:, 0, 0] = cy * cz
+    out[:, 0, 1] = -cy * sz
+    out[:, 0, 2] = sy
+    out[:, 1, 0] = sx * sy * cz + cx * sz
+    out[:, 1, 1] = -sx * sy * sz + cx * cz
+    out[:, 1, 2] = -sx * cy
+    out[:, 2, 0] = -cx * sy * cz + sx * sz
+    out[:, 2, 1] = cx * sy * sz + sx * cz
+    out[:, 2, 2] = cx * cy
+    return out
+
+
+# --- 4x4 TRANSFORMS ---
+# Row-major numpy storage, column vectors (p' = M @ p) like OpenGL's math.
+# Angles are in degrees to match glRotatef / gluPerspective.
+
+class Matrix4:
+    def __init__(self, values=None):
+        if values is None:
+            self.m = np.identity(4)
+        elif isinstance(values, Matrix4):
+            self.m = values.m.copy()
+        else:
+            self.m = np.array(values, dtype=float).reshape(4, 4)
+
+    @classmethod
+    def _wrap(cls, values):
+        out = cls.__new__(cls)
+        out.m = values
+        return out
+
+    # --- constructors ---
+    @classmethod
+    def identity(cls):
+        return cls()
+
+    @classmethod
+    def translate(cls, x, y, z):
+        out = cls()
+        out.m[:3, 3] = (x, y, z)
+        return out
+
+    @classmethod
+    def scale(cls, x, y=None, z=None):
+        y = x if y is None else y
+        z = x if z is None else z
+        return cls._wrap(np.diag([x, y, z, 1.0]))
+
+    @classmethod
+    def rotate(cls, angle, x, y, z):
+        # Same as glRotatef(angle, x, y, z)
+        length = m.sqrt(x * x + y * y + z * z)
+        if length == 0:
+            raise ValueError("Cannot rotate around a zero axis")
+        x, y, z = x / length, y / length, z / length
+        c, s = m.cos(m.radians(angle)), m.sin(m.radians(angle))
+        t = 1 - c
+        out = cls()
+        out.m[:3, :3] = [
+            [t * x * x + c, t * x * y - s * z, t * x * z + s * y],
+            [t * x * y + s * z, t * y * y + c, t * y * z - s * x],
+            [t * x * z - s * y, t * y * z + s * x, t * z * z + c],
+        ]
+        return out
+
+    @classmethod
+    def rotate_xyz(cls, rx, ry, rz):
+        # Same order as Object3D.draw: rotate X, then Y, then Z
+        return cls.rotate(rx, 1, 0, 0) @ cls.rotate(ry, 0, 1, 0) @ cls.rotate(rz, 0, 0, 1)
+
+    @classmethod
+    def trs(cls, position, rotation=(0, 0, 0), scale=(1, 1, 1)):
+        # glTranslatef + glRotatef x3 + glScalef in one go
+        return cls.translate(*position) @ cls.rotate_xyz(*rotation) @ cls.scale(*scale)
+
+    @classmethod
+    def look_at(cls, eye, target, up=(0, 1, 0)):
+        # Same as gluLookAt
+        eye = np.asarray(eye, dtype=float)
+        forward = np.asarray(target, dtype=float) - eye
+        forward /= np.linalg.norm(forward)
+        side = np.cross(forward, up)
+        side /= np.linalg.norm(side)
+        true_up = np.cross(side, forward)
+
+        out = cls()
+        out.m[0, :3] = side
+        out.m[1, :3] = true_up
+        out.m[2, :3] = -forward
+        out.m[:3, 3] = -out.m[:3, :3] @ eye
+        return out
+
+    @classmethod
+    def perspective(cls, fov, aspect, near, far):
+        # Same as gluPerspective
+        f = 1.0 / m.tan(m.radians(fov) / 2)
+        out = cls._wrap(np.zeros((4, 4)))
+        out.m[0, 0] = f / aspect
+        out.m[1, 1] = f
+        out.m[2, 2] = (far + near) / (near - far)
+        out.m[2, 3] = 2 * far * near / (near - far)
+        out.m[3, 2] = -1.0
+        return out
+
+    @classmethod
+    def ortho(cls, left, right, bottom, top, near=-1.0, far=1.0):
+        # Same as glOrtho
+        out = cls()
+        out.m[0, 0] = 2 / (right - left)
+        out.m[1, 1] = 2 / (top - bottom)
+        out.m[2, 2] = -2 / (far - near)
+        out.m[:3, 3] = (-(right + left) / (right - left), -(top + bottom) / (top - bottom), -(far + near) / (far - near))
+        return out
+
+    # --- math ---
+    def __matmul__(self, other):
+        return Matrix4._wrap(self.m @ other.m)
+
+    def mul(self, other):
+        return self @ other
+
+    def inverse(self):
+        return Matrix4._wrap(np.linalg.inv(self.m))
+
+    def transpose(self):
+        return Matrix4._wrap(self.m.T.copy())
+
+    def transform_points(self, points, divide=True):
+        # (N, 3) points -> (N, 3), w = 1; divide=True does the perspective divide
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        out = points @ self.m[:3, :3].T + self.m[:3, 3]
+        if divide and self.m[3].tolist() != [0.0, 0.0, 0.0, 1.0]:
+            w = points @ self.m[3, :3] + self.m[3, 3]
+            out /= w[:, None]
+        return out
+
+    def transform_points4(self, points):
+        # (N, 3) points -> (N, 4) homogeneous clip coordinates, no divide
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        return points @ self.m[:, :3].T + self.m[:, 3]
+
+    def transform_directions(self, directions):
+        # (N, 3) directions -> (N, 3), w = 0 so translation is ignored
+        return np.asarray(directions, dtype=float).reshape(-1, 3) @ self.m[:3, :3].T
+
+    def transform(self, vector):
+        return v.Vect3D(*self.transform_points(vector.returnvec())[0].tolist())
+
+    # --- OpenGL ---
+    def to_gl(self):
+        # Column-major float32 for glLoadMatrixf / glMultMatrixf
+        return np.ascontiguousarray(self.m.T, dtype=np.float32)
+
+    def returnmatrix(self):
+        return self.m.tolist()
 
-        # Perform matrix multiplication
-        for i in range(rows_a):
-            for j in range(cols_b):
-                for k in range(cols_a):
-                    result_matrix[i][j] += matrix_a[i][k] * matrix_b[k][j]
+    def __eq__(self, other):
+        return isinstance(other, Matrix4) and np.array_equal(self.m, other.m)
 
-        return result_matrix
-    
-    
+    def __repr__(self):
+        return f"Matrix4({self.m.tolist()})"
@@ -0,0 +1 @@
+from acid.pythontwo.profiler.profiler import Profiler, enable, disable
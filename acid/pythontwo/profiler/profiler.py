@@ -0,0 +1,136 @@
+import json
+import time
+from collections import deque
+
+# --- FRAME PROFILER ---
+# Off by default. Engine3D, Object3D, AcidUI and window check `active` before timing
+# anything, so when it is None all they pay is one attribute lookup.
+#
+#   import acid.pythontwo.profiler.profiler as profiler
+#   prof = profiler.enable(frames=600)
+#   ... run the game ...
+#   print(prof.summary())
+#   prof.save_chrome_trace("frame.json")   # open in chrome://tracing or Perfetto
+
+active = None
+
+
+def enable(frames=300):
+    global active
+    active = Profiler(frames)
+    return active
+
+
+def disable():
+    global active
+    prof, active = active, None
+    if prof is not None:
+        prof.end_frame()
+    return prof
+
+
+def now():
+    return time.perf_counter()
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Profiler:
+    def __init__(self, frames=300):
+        self.frames = deque(maxlen=frames)  # ring buffer of finished frames
+        self.origin = now()
+        self.frame_index = 0
+        self._current = None
+
+    def begin_frame(self):
+        if self._current is not None:
+            self.end_frame()
+        self._current = {"index": self.frame_index, "start": now(), "sections": [], "counters": {}}
+        self.frame_index += 1
+
+    def end_frame(self):
+        frame = self._current
+        if frame is None:
+            return
+        frame["duration"] = now() - frame["start"]
+        self.frames.append(frame)
+        self._current = None
+
+    def record(self, name, start, end=None):
+        # Add a finished section; start/end come from profiler.now()
+        if self._current is None:
+            self.begin_frame()
+        end = now() if end is None else end
+        self._current["sections"].append((name, start, end - start))
+
+    def section(self, name):
+        return _Section(self, name)
+
+    def count(self, name, amount=1):
+        if self._current is None:
+            self.begin_frame()
+        counters = self._current["counters"]
+        counters[name] = counters.get(name, 0) + amount
+
+    # --- export ---
+    def summary(self):
+        frames = list(self.frames)
+        durations = sorted(frame["duration"] * 1000 for frame in frames)
+        sections = {}
+        counters = {}
+        for frame in frames:
+            for name, _, duration in frame["sections"]:
+                sections[name] = sections.get(name, 0.0) + duration * 1000
+            for name, amount in frame["counters"].items():
+                counters[name] = counters.get(name, 0) + amount
+        count = max(len(frames), 1)
+        return {
+            "frames": len(frames),
+            "frame_ms": {
+                "mean": sum(durations) / count,
+                "p50": _percentile(durations, 50),
+                "p95": _percentile(durations, 95),
+                "p99": _percentile(durations, 99),
+                "max": durations[-1] if durations else 0.0,
+            },
+            "section_ms_per_frame": {name: total / count for name, total in sections.items()},
+            "counters_per_frame": {name: total / count for name, total in counters.items()},
+        }
+
+    def chrome_trace(self):
+        # Trace-event format: complete ("X") events in microseconds plus counter ("C") events
+        events = []
+        for frame in self.frames:
+            start = (frame["start"] - self.origin) * 1e6
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1, "ts": start,
+                           "dur": frame["duration"] * 1e6, "args": {"index": frame["index"]}})
+            for name, section_start, duration in frame["sections"]:
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": 1,
+                               "ts": (section_start - self.origin) * 1e6, "dur": duration * 1e6})
+            if frame["counters"]:
+                events.append({"name": "counters", "ph": "C", "pid": 1, "tid": 1, "ts": start,
+                               "args": dict(frame["counters"])})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path):
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
+
+
+class _Section:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = now()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start)
+        return False
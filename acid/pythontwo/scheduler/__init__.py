@@ -0,0 +1 @@
+from acid.pythontwo.scheduler.scheduler import Scheduler
@@ -0,0 +1,159 @@
+import time
+import acid.pythontwo.profiler.profiler as profiler
+
+# --- FIXED TIMESTEP SCHEDULER ---
+# update(dt) always sees the same dt, however fast or slow frames are. Real time goes
+# into an accumulator and is spent in whole steps, at most max_steps per frame so one
+# slow frame can't snowball. render(alpha) gets how far we are into the next step
+# (0..1) to blend between the last two simulation states.
+#
+# After presenting, idle callbacks (uploads, GC, streaming) share whatever is left of
+# the frame budget, then the scheduler sleeps until the next frame is due. With vsync
+# the buffer swap does the waiting, the budget is just used to size the idle slice.
+#
+#   scheduler = Scheduler(timestep=1 / 60, target_fps=60)
+#   scheduler.add_idle(streamer.pump)
+#   scheduler.run(update, render, begin=engine.loop, present=engine.present,
+#                 running=lambda: engine.running)
+
+
+class Scheduler:
+    def __init__(self, timestep=1 / 60, max_steps=5, target_fps=None, vsync=False, refresh_rate=60,
+                 max_frame_time=0.25, min_idle=0.001, spin=0.0, clock=time.perf_counter, sleep=time.sleep):
+        self.timestep = timestep
+        self.max_steps = max_steps
+        self.target_fps = target_fps  # None = as fast as possible
+        self.vsync = vsync  # present() blocks on the swap, don't sleep on top of it
+        self.refresh_rate = refresh_rate  # frame budget under vsync when there is no target_fps
+        self.max_frame_time = max_frame_time  # longer frames (breakpoints, window drags) get clamped
+        self.min_idle = min_idle  # idle callbacks get at least this much, even on a late frame
+        self.spin = spin  # last stretch of a wait spent polling the clock, 0 = just sleep
+        self.clock = clock
+        self.sleep = sleep
+
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.running = False
+        self.frame_index = 0
+        self.stats = {}
+        self._idle = []
+        self._last = None
+
+    def frame_budget(self):
+        if self.target_fps:
+            return 1.0 / self.target_fps
+        if self.vsync:
+            return 1.0 / self.refresh_rate
+        return 0.0
+
+    # --- idle work ---
+    def add_idle(self, callback, priority=0):
+        # callback(remaining_seconds) -> True while it still has work for this frame
+        self._idle.append((priority, len(self._idle), callback))
+        self._idle.sort(key=lambda entry: (-entry[0], entry[1]))
+        return callback
+
+    def remove_idle(self, callback):
+        self._idle = [entry for entry in self._idle if entry[2] is not callback]
+
+    def run_idle(self, deadline):
+        # Round-robin by priority until the deadline or until nobody has work left
+        pending = [entry[2] for entry in self._idle]
+        calls = 0
+        first = True
+        while pending:
+            remaining = deadline - self.clock()
+            if remaining <= 0 and not first:
+                break
+            more = []
+            for callback in pending:
+                remaining = deadline - self.clock()
+                if remaining <= 0 and not first:
+                    break
+                calls += 1
+                if callback(max(remaining, 0.0)):
+                    more.append(callback)
+            pending = more
+            first = False
+        return calls
+
+    # --- frames ---
+    def advance(self, frame_time, update):
+        # Spend frame_time on fixed steps, returns how many ran
+        self.accumulator += min(frame_time, self.max_frame_time)
+        steps = 0
+        while self.accumulator >= self.timestep and steps < self.max_steps:
+            update(self.timestep)
+            self.accumulator -= self.timestep
+            steps += 1
+        dropped = 0.0
+        if steps == self.max_steps and self.accumulator >= self.timestep:
+            # Too far behind, let the simulation run slow instead of spiralling
+            dropped = self.accumulator - self.accumulator % self.timestep
+            self.accumulator -= dropped
+        self.alpha = self.accumulator / self.timestep
+        self.stats["dropped"] = dropped
+        return steps
+
+    def frame(self, update, render, begin=None, present=None):
+        start = self.clock()
+        frame_time = 0.0 if self._last is None else start - self._last
+        self._last = start
+        budget = self.frame_budget()
+        prof = profiler.active
+
+        if begin is not None:
+            begin()
+        mark = profiler.now() if prof is not None else 0
+        steps = self.advance(frame_time, update)
+        if prof is not None:
+            prof.record("simulate", mark)
+            mark = profiler.now()
+        render(self.alpha)
+        if prof is not None:
+            prof.record("render", mark)
+        if present is not None:
+            present()
+
+        mark = self.clock()
+        deadline = max(start + budget, mark + self.min_idle) if self._idle else mark
+        idle_calls = self.run_idle(deadline) if self._idle else 0
+        idle_end = self.clock()
+        if prof is not None:
+            prof.record("idle", mark, idle_end)
+
+        if budget and not self.vsync:
+            self.wait_until(start + budget)
+            if prof is not None:
+                prof.record("wait", idle_end)
+        if prof is not None:
+            prof.end_frame()
+
+        self.frame_index += 1
+        self.stats.update({
+            "frame_time": frame_time,
+            "steps": steps,
+            "alpha": self.alpha,
+            "idle_time": idle_end - mark,
+            "idle_calls": idle_calls,
+        })
+        return steps
+
+    def wait_until(self, deadline):
+        # sleep() can overshoot by ~1 ms. With spin set, sleep all but the last spin
+        # seconds and poll the clock for those, still yielding the CPU with sleep(0).
+        remaining = deadline - self.clock()
+        if remaining > self.spin:
+            self.sleep(remaining - self.spin)
+        while self.spin and self.clock() < deadline:
+            self.sleep(0)
+
+    def run(self, update, render, begin=None, present=None, running=None):
+        self.running = True
+        self._last = None
+        while self.running and (running is None or running()):
+            self.frame(update, render, begin, present)
+        self.running = False
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,6 @@
+from acid.pythontwo._lazy import lazy
+
+__getattr__, __dir__ = lazy(__name__, {
+    "Button": ".ui",
+    "Slider": ".ui",
+})
@@ -4,30 +4,69 @@ import time
 
 class Button:
     def __init__(self, screen, pos=(0, 0), size=(1, 1), texture="example.png", text="hello"):
+        self.manager = None  # set by UIManager.add
         self.screen = screen
         self.pos = pos
         self.size = size
         self.texture = texture
         self.text = text
 
-        self.original_image = pg.image.load(self.texture)
-        self.image = pg.transform.scale(self.original_image, self.size)
+        self.image = self._own_image()
 
         self.ans = False
         self.clicked = False  # initialize clicked here!
+        self.hovered = False
 
-    def draw(self):
-        self.screen.blit(self.image, self.pos)
+    @property
+    def image(self):
+        return self._image
+
+    @image.setter
+    def image(self, value):
+        self._image = value
+        if self.manager is not None:
+            self.manager.mark_dirty(self)
+
+    def _own_image(self):
+        # The cached surface is shared by every button with this texture and size; a
+        # copy keeps hover tints or drawing on one button's image off the others
+        return ww.images.get(self.texture, self.size).copy()
+
+    def draw(self, surface=None):
+        # screen can be a window or a plain pygame surface
+        if surface is None:
+            surface = getattr(self.screen, "playground", self.screen)
+        return surface.blit(self.image, self.pos)
 
     def resize(self, new_size):
         self.size = new_size
-        self.image = pg.transform.scale(self.original_image, self.size)
+        self.image = self._own_image()
+        if self.manager is not None:
+            self.manager.reindex(self)
 
     def move(self, new_pos):
         self.pos = new_pos
+        if self.manager is not None:
+            self.manager.reindex(self)
+
+    def rect(self):
+        return pg.Rect(self.pos, self.size)
+
+    def visual_state(self):
+        return (tuple(self.pos), tuple(self.size), id(self.image))
+
+    def holds_pointer(self):
+        return self.clicked
+
+    def handle_event(self, event):
+        return self.is_clicked(event)
 
     def has_hovered(self):
-        mouse_x, mouse_y = pg.mouse.get_pos()
+        # A managed button uses the mouse position the manager read this frame
+        if self.manager is not None:
+            mouse_x, mouse_y = self.manager.mouse
+        else:
+            mouse_x, mouse_y = pg.mouse.get_pos()
         x, y = self.pos
         w, h = self.size
         # Check if mouse is inside the button rectangle
@@ -62,6 +101,28 @@ class Slider:
         self.max = max_val
         self.value = start_val
         self.dragging = False
+        self.hovered = False
+        self.manager = None  # set by UIManager.add
+
+    def move(self, new_pos):
+        self.x, self.y = new_pos
+        if self.manager is not None:
+            self.manager.reindex(self)
+
+    def resize(self, new_width):
+        self.width = new_width
+        if self.manager is not None:
+            self.manager.reindex(self)
+
+    def rect(self):
+        # Track plus the thumb hanging over both ends
+        return pg.Rect(self.x - self.radius, self.y - self.radius, self.width + 2 * self.radius, 2 * self.radius)
+
+    def visual_state(self):
+        return (self.x, self.y, self.width, self.value)
+
+    def holds_pointer(self):
+        return self.dragging
 
     def draw(self, surface):
         # Draw the track
@@ -75,6 +136,7 @@ class Slider:
         pg.draw.circle(surface, (100, 200, 255), (int(thumb_x), int(thumb_y)), self.radius)
 
     def handle_event(self, event):
+        # Returns True when the value changed
         if event.type == pg.MOUSEBUTTONDOWN:
             if event.button == 1:
                 if self._thumb_collide(event.pos):
@@ -88,7 +150,11 @@ class Slider:
             if self.dragging:
                 mouse_x = event.pos[0]
                 t = max(0, min(1, (mouse_x - self.x) / self.width))
-                self.value = self.min + t * (self.max - self.min)
+                old, self.value = self.value, self.min + t * (self.max - self.min)
+                if self.value != old and self.manager is not None:
+                    self.manager.mark_dirty(self)
+                return self.value != old
+        return False
 
     def _thumb_collide(self, pos):
         t = (self.value - self.min) / (self.max - self.min)
@@ -96,4 +162,222 @@ class Slider:
         thumb_y = self.y
         dx = pos[0] - thumb_x
         dy = pos[1] - thumb_y
-        return dx*dx + dy*dy <= self.radius * self.radius
\ No newline at end of file
+        return dx*dx + dy*dy <= self.radius * self.radius
+
+
+# --- UI MANAGER ---
+# Owns the widgets, reads the mouse once per frame and sends each event only to the
+# widgets under the pointer, found through a uniform grid of cell_size pixels. A
+# widget that grabs the pointer (pressed button, dragged slider) gets every mouse
+# event until release. draw() only looks at widgets flagged dirty (move, resize,
+# Slider drags and Button image swaps flag themselves) and repaints the ones whose
+# visual_state() changed. After setting pos/size/value directly, call reindex(widget).
+#
+#   manager = UIManager(screen, background=(30, 30, 30))
+#   play = manager.add(Button(screen, (10, 10), (64, 64)), on_change=start_game)
+#   while screen.brorunning:
+#       screen.loop()
+#       manager.update()          # reads screen.events
+#       manager.draw()
+
+class UIManager:
+    def __init__(self, screen, cell_size=64, background=(0, 0, 0)):
+        self.screen = screen
+        self.cell_size = cell_size
+        self.background = background  # colour or Surface used to clear moved widgets
+        self.widgets = []
+        self.mouse = (0, 0)
+        self._hover_pos = None
+        self.capture = None
+        self.hovered = []
+        self._grid = {}
+        self._cells = {}
+        self._rects = {}
+        self._order = {}
+        self._callbacks = {}
+        self._drawn = {}  # widget -> (visual state, rect) at its last paint
+        self._dirty = set()  # widgets that may look different since the last draw
+        self._full_redraw = True
+
+    @property
+    def surface(self):
+        return getattr(self.screen, "playground", self.screen)
+
+    def add(self, widget, on_change=None):
+        widget.manager = self
+        self._order[widget] = len(self.widgets)
+        self.widgets.append(widget)
+        if on_change is not None:
+            self._callbacks[widget] = on_change
+        self.reindex(widget)
+        return widget
+
+    def remove(self, widget):
+        if widget not in self._order:
+            return
+        for cell in self._cells.pop(widget):
+            self._grid[cell].discard(widget)
+        self.widgets.remove(widget)
+        self._order = {w: i for i, w in enumerate(self.widgets)}
+        self._callbacks.pop(widget, None)
+        self._dirty.discard(widget)
+        drawn = self._drawn.pop(widget, None)
+        self._rects.pop(widget)
+        widget.manager = None
+        if self.capture is widget:
+            self.capture = None
+        if widget in self.hovered:
+            self.hovered.remove(widget)
+        if drawn is not None:
+            self._repaint([drawn[1]])
+
+    def invalidate(self):
+        # Repaint everything on the next draw, e.g. after the screen was filled
+        self._full_redraw = True
+
+    def mark_dirty(self, widget):
+        # Called by the widgets when they change; draw() compares their visual_state()
+        if widget in self._order:
+            self._dirty.add(widget)
+
+    # --- hit index ---
+    def _cells_of(self, rect):
+        size = self.cell_size
+        return [(cx, cy)
+                for cx in range(rect.left // size, rect.right // size + 1)
+                for cy in range(rect.top // size, rect.bottom // size + 1)]
+
+    def reindex(self, widget):
+        # Called by the widgets from move/resize, only touches the cells that changed
+        self.mark_dirty(widget)
+        rect = widget.rect()
+        old = self._cells.get(widget, ())
+        new = self._cells_of(rect)
+        if old != new:
+            old_set, new_set = set(old), set(new)
+            for cell in old_set - new_set:
+                self._grid[cell].discard(widget)
+            for cell in new_set - old_set:
+                self._grid.setdefault(cell, set()).add(widget)
+            self._cells[widget] = new
+        self._rects[widget] = rect
+
+    def widgets_at(self, pos):
+        # Topmost (last added) first; edges count as inside, like Button.has_hovered
+        x, y = pos
+        found = [widget for widget in self._grid.get((x // self.cell_size, y // self.cell_size), ())
+                 if self._rects[widget].left <= x <= self._rects[widget].right
+                 and self._rects[widget].top <= y <= self._rects[widget].bottom]
+        found.sort(key=self._order.__getitem__, reverse=True)
+        return found
+
+    # --- events ---
+    def _set_mouse(self, pos):
+        self.mouse = pos
+        if pos == self._hover_pos:
+            return
+        self._hover_pos = pos
+        under = self.widgets_at(pos)
+        for widget in self.hovered:
+            widget.hovered = False
+        for widget in under:
+            widget.hovered = True
+        self.hovered = under
+
+    def _send(self, widget, event, fired):
+        if widget.handle_event(event) and widget not in fired:
+            fired.append(widget)
+
+    def update(self, events=None):
+        # Returns the widgets that fired this frame (button clicked, slider moved)
+        if events is None:
+            events = getattr(self.screen, "events", ())
+        self._set_mouse(pg.mouse.get_pos())
+        fired = []
+        for event in events:
+            pos = getattr(event, "pos", None)
+            if pos is None:
+                # Keys and the like only matter to whatever holds the pointer
+                if self.capture is not None:
+                    self._send(self.capture, event, fired)
+                continue
+            self._set_mouse(tuple(pos))
+
+            if self.capture is not None:
+                widget = self.capture
+                self._send(widget, event, fired)
+                if not widget.holds_pointer():
+                    self.capture = None
+            elif event.type == pg.MOUSEMOTION:
+                for widget in self.hovered:
+                    self._send(widget, event, fired)
+            elif self.hovered:
+                # Clicks go to the topmost widget only
+                widget = self.hovered[0]
+                self._send(widget, event, fired)
+                if widget.holds_pointer():
+                    self.capture = widget
+
+        for widget in fired:
+            callback = self._callbacks.get(widget)
+            if callback is not None:
+                callback(widget)
+        return fired
+
+    # --- drawing ---
+    def _clear(self, rect):
+        surface = self.surface
+        if isinstance(self.background, pg.Surface):
+            surface.blit(self.background, rect, rect)
+        elif self.background is not None:
+            surface.fill(self.background, rect)
+
+    def _repaint(self, rects):
+        # Clear the areas and redraw, in order, every widget touching them
+        surface = self.surface
+        rects = [rect.clip(surface.get_rect()) for rect in rects]
+        rects = [rect for rect in rects if rect.w and rect.h]
+        if not rects:
+            return
+        touched = set()
+        for rect in rects:
+            self._clear(rect)
+            for cell in self._cells_of(rect):
+                touched.update(self._grid.get(cell, ()))
+        for widget in sorted(touched, key=self._order.__getitem__):
+            rect = self._rects[widget]
+            if rect.collidelist(rects) >= 0:
+                widget.draw(surface)
+                self._drawn[widget] = (widget.visual_state(), rect)
+        mark_dirty = getattr(self.screen, "mark_dirty", None)
+        if mark_dirty is not None:
+            for rect in rects:
+                mark_dirty(rect)
+
+    def draw(self):
+        # Returns how many widgets changed since the last draw
+        surface = self.surface
+        if self._full_redraw:
+            for widget in self.widgets:
+                widget.draw(surface)
+                self._drawn[widget] = (widget.visual_state(), self._rects[widget])
+            self._full_redraw = False
+            self._dirty.clear()
+            mark_dirty = getattr(self.screen, "mark_dirty", None)
+            if mark_dirty is not None:
+                for widget in self.widgets:
+                    mark_dirty(self._rects[widget])
+            return len(self.widgets)
+
+        areas = []
+        changed = 0
+        dirty, self._dirty = self._dirty, set()
+        for widget in dirty:
+            drawn = self._drawn.get(widget)
+            if drawn is None or drawn[0] != widget.visual_state():
+                changed += 1
+                if drawn is not None:
+                    areas.append(drawn[1])
+                areas.append(self._rects[widget])
+        self._repaint(areas)
+        return changed
\ No newline at end of file
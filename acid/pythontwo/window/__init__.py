@@ -0,0 +1,9 @@
+from acid.pythontwo._lazy import lazy
+
+# The window class itself stays at acid.pythontwo.window.window, the submodule owns that name
+__getattr__, __dir__ = lazy(__name__, {
+    "SurfaceCache": ".window",
+    "SoundBank": ".window",
+    "images": ".window",
+    "merge_rects": ".window",
+})
@@ -1,10 +1,229 @@
 import pygame as pg
+import numpy as np
+from collections import OrderedDict
+import acid.pythontwo.profiler.profiler as profiler
+from acid.pythontwo.scheduler.scheduler import Scheduler
+
+# --- IMAGE CACHE ---
+# Loaded, convert()-ed and pre-scaled surfaces keyed by (path, size) so drawing an
+# image every frame costs only the blit. Least-recently-used entries get dropped.
+
+class SurfaceCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._surfaces = OrderedDict()
+
+    @staticmethod
+    def _key(path, size):
+        return (path, None if size is None else (int(size[0]), int(size[1])))
+
+    def _load(self, path, size):
+        if size is not None:
+            return pg.transform.scale(self.get(path), size)
+        image = pg.image.load(path)
+        # convert() needs a display mode, before that keep the raw surface
+        if pg.display.get_surface() is not None:
+            image = image.convert_alpha() if image.get_flags() & pg.SRCALPHA else image.convert()
+        return image
+
+    def get(self, path, size=None):
+        key = self._key(path, size)
+        image = self._surfaces.get(key)
+        if image is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return image
+
+        self.misses += 1
+        image = self._load(*key)
+        self._surfaces[key] = image
+        while len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+        return image
+
+    def preload(self, path, sizes=(None,)):
+        for size in sizes:
+            self.get(path, size)
+
+    def invalidate(self, path=None, size=None):
+        if path is None:
+            self._surfaces.clear()
+        elif size is not None:
+            self._surfaces.pop(self._key(path, size), None)
+        else:
+            for key in [k for k in self._surfaces if k[0] == path]:
+                del self._surfaces[key]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+images = SurfaceCache()
+
+# --- SOUND BANK ---
+# Mixer is set up once, every file is decoded once, and playback picks a channel
+# from a fixed pool. When the pool is full a voice gets stolen:
+#   "oldest"   - the voice that started first
+#   "priority" - the lowest priority voice that isn't above the new sound
+#   "none"     - don't play the new sound
+# max_voices caps how many copies of one sound can overlap, the oldest copy is reused.
+
+class _BankSound:
+    def __init__(self, sound, max_voices, priority):
+        self.sound = sound
+        self.max_voices = max_voices
+        self.priority = priority
+
+
+class SoundBank:
+    def __init__(self, channels=16, steal="oldest"):
+        self.channels = channels
+        self.steal = steal
+        self._sounds = {}
+        self._pool = None
+
+    def init(self):
+        if self._pool is not None:
+            return
+        if not pg.mixer.get_init():
+            pg.mixer.init()
+        pg.mixer.set_num_channels(self.channels)
+        self._pool = [pg.mixer.Channel(i) for i in range(self.channels)]
+        self._owner = [None] * self.channels
+        self._started = [0] * self.channels
+        self._priority = [0] * self.channels
+        self._ticket = 0
+
+    def load(self, name, path=None, max_voices=None, priority=0, volume=1.0):
+        self.init()
+        sound = pg.mixer.Sound(name if path is None else path)
+        sound.set_volume(volume)
+        self._sounds[name] = _BankSound(sound, max_voices, priority)
+        return sound
+
+    def _pick(self, name, entry):
+        free = None
+        oldest = oldest_same = lowest = None
+        same = 0
+        for i in range(self.channels):
+            if not self._pool[i].get_busy():
+                if free is None:
+                    free = i
+                continue
+            started = self._started[i]
+            if self._owner[i] == name:
+                same += 1
+                if oldest_same is None or started < self._started[oldest_same]:
+                    oldest_same = i
+            if oldest is None or started < self._started[oldest]:
+                oldest = i
+            if self._priority[i] <= entry.priority and (lowest is None or
+                    (self._priority[i], started) < (self._priority[lowest], self._started[lowest])):
+                lowest = i
+
+        if entry.max_voices is not None and same >= entry.max_voices:
+            return oldest_same
+        if free is not None:
+            return free
+        if self.steal == "oldest":
+            return oldest
+        if self.steal == "priority":
+            return lowest
+        return None
+
+    def play(self, name, loops=0, volume=None):
+        entry = self._sounds.get(name)
+        if entry is None:
+            self.load(name)
+            entry = self._sounds[name]
+
+        index = self._pick(name, entry)
+        if index is None:
+            return None
+        channel = self._pool[index]
+        channel.play(entry.sound, loops=loops)
+        channel.set_volume(1.0 if volume is None else volume)
+
+        self._ticket += 1
+        self._owner[index] = name
+        self._started[index] = self._ticket
+        self._priority[index] = entry.priority
+        return channel
+
+    def stop(self, name=None):
+        if self._pool is None:
+            return
+        for i in range(self.channels):
+            if name is None or self._owner[i] == name:
+                self._pool[i].stop()
+
+# --- DIRTY RECTS ---
+
+def merge_rects(rects):
+    # Union every group of overlapping rects into one
+    merged = []
+    for rect in rects:
+        rect = pg.Rect(rect)
+        if rect.w <= 0 or rect.h <= 0:
+            continue
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+# --- BATCH HELPERS ---
+
+def _color_array(colors, count):
+    # Validate once per batch instead of once per shape. Hex strings and names
+    # ("#FF8800", "red") work too, alone or one per shape.
+    if isinstance(colors, str):
+        colors = tuple(pg.Color(colors))
+    elif len(colors) and isinstance(colors[0], str):
+        colors = [tuple(pg.Color(color)) for color in colors]
+    colors = np.asarray(colors)
+    if colors.ndim == 1:
+        colors = np.broadcast_to(colors, (count, len(colors)))
+    colors = colors.reshape(count, colors.shape[-1])
+    if colors.size and (colors.min() < 0 or colors.max() > 255):
+        bad = colors[(colors < 0) | (colors > 255)][0]
+        raise ValueError(f"Color component {bad} out of range (0-255)")
+    return colors.astype(np.int64)
+
+
+def _pairs(values, count):
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = np.broadcast_to(values, (count, 2))
+    return values.reshape(count, 2)
 
 class window:
     def __init__(self, size, name):
         self.brorunning = True
         self.size = size
         self.name = name
+        self.sounds = SoundBank()
+        self.events = []  # everything loop() pulled off the queue this frame
+        self.scheduler = Scheduler(target_fps=60)  # used by run()
+
+        # Dirty-rect mode: draw calls record what they touched and mupdate only
+        # presents those areas, or everything once they cover more than dirty_threshold
+        self.dirty_mode = False
+        self.dirty_threshold = 0.5
+        self._dirty = []
+        self._full_redraw = True
     
     def init(self):
         pg.init()
@@ -13,10 +232,26 @@ class window:
         self.playground = pg.display.set_mode((x, y))
         pg.display.set_caption(self.name)
 
+    def set_dirty_mode(self, enabled=True, threshold=0.5):
+        self.dirty_mode = enabled
+        self.dirty_threshold = threshold
+        self._dirty = []
+        self._full_redraw = True
+
+    def mark_dirty(self, rect=None):
+        # For things drawn straight onto playground, None means the whole screen
+        if self.dirty_mode:
+            if rect is None:
+                self._full_redraw = True
+            else:
+                self._dirty.append(pg.Rect(rect))
+
     def makepixel(self, pos, color):
         if self.brorunning:
             x, y = map(int, pos)
-            pg.draw.rect(self.playground, color, pg.Rect(x, y, 1, 1))
+            dirty = pg.draw.rect(self.playground, color, pg.Rect(x, y, 1, 1))
+            if self.dirty_mode:
+                self._dirty.append(dirty)
 
     def MakeRect(self, pos, size, color):
         if self.brorunning:
@@ -28,26 +263,114 @@ class window:
             for comp in (r, g, b):
                 if comp < 0 or comp > 255:
                     raise ValueError(f"Color component {comp} out of range (0-255)")
-            pg.draw.rect(self.playground, (r, g, b), pg.Rect(x, y, w, h))
+            dirty = pg.draw.rect(self.playground, (r, g, b), pg.Rect(x, y, w, h))
+            if self.dirty_mode:
+                self._dirty.append(dirty)
+
+    def _dirty_box(self, x0, y0, x1, y1):
+        if self.dirty_mode:
+            self._dirty.append(pg.Rect(x0, y0, x1 - x0 + 1, y1 - y0 + 1).clip(self.playground.get_rect()))
+
+    def makepixels(self, points, colors):
+        if not self.brorunning:
+            return
+        points = np.asarray(points).reshape(-1, 2).astype(np.intp)
+        colors = _color_array(colors, len(points))
+        w, h = self.playground.get_size()
+        inside = (points[:, 0] >= 0) & (points[:, 0] < w) & (points[:, 1] >= 0) & (points[:, 1] < h)
+        points, colors = points[inside], colors[inside]
+        if not len(points):
+            return
+
+        # One vectorized write straight into the surface memory
+        if self.playground.get_bytesize() >= 3:
+            pixels = pg.surfarray.pixels3d(self.playground)
+            pixels[points[:, 0], points[:, 1]] = colors[:, :3]
+        else:
+            # 8/16-bit: map_rgb like makepixel's draw call does (palette lookup or packed
+            # bits), once per distinct color
+            distinct, which = np.unique(colors[:, :3], axis=0, return_inverse=True)
+            mapped = np.array([self.playground.map_rgb(color) for color in map(tuple, distinct.tolist())])
+            mapped = mapped[which.reshape(-1)]
+            pixels = pg.surfarray.pixels2d(self.playground)
+            pixels[points[:, 0], points[:, 1]] = mapped
+        del pixels
+
+        low, high = points.min(axis=0), points.max(axis=0)
+        self._dirty_box(low[0], low[1], high[0], high[1])
+
+    def MakeRects(self, positions, sizes, colors):
+        if not self.brorunning:
+            return
+        positions = np.asarray(positions).reshape(-1, 2).astype(np.int64)
+        sizes = _pairs(sizes, len(positions)).astype(np.int64)
+        colors = _color_array(colors, len(positions))[:, :3].tolist()
+        if not len(positions):
+            return
+
+        draw, surface = pg.draw.rect, self.playground
+        for rect, color in zip(np.concatenate((positions, sizes), axis=1).tolist(), colors):
+            draw(surface, color, rect)
+
+        low, high = positions.min(axis=0), (positions + sizes).max(axis=0) - 1
+        self._dirty_box(low[0], low[1], high[0], high[1])
+
+    def MakeCircles(self, positions, radii, colors):
+        if not self.brorunning:
+            return
+        positions = np.asarray(positions).reshape(-1, 2).astype(np.int64)
+        radii = np.broadcast_to(np.asarray(radii), (len(positions),))
+        colors = _color_array(colors, len(positions))
+        if not len(positions):
+            return
+
+        draw, surface = pg.draw.circle, self.playground
+        for center, radius, color in zip(positions.tolist(), radii.tolist(), colors.tolist()):
+            draw(surface, color, center, radius)
+
+        reach = np.ceil(radii).astype(np.int64)[:, None]
+        low, high = (positions - reach).min(axis=0), (positions + reach).max(axis=0)
+        self._dirty_box(low[0], low[1], high[0], high[1])
+
+    def makelines(self, segments, colors="#FFFFFF"):
+        if not self.brorunning:
+            return
+        segments = np.asarray(segments).reshape(-1, 2, 2)
+        colors = _color_array(colors, len(segments)).tolist()
+        if not len(segments):
+            return
+
+        draw, surface = pg.draw.line, self.playground
+        for (start, end), color in zip(segments.tolist(), colors):
+            draw(surface, color, start, end)
+
+        points = segments.reshape(-1, 2)
+        low, high = np.floor(points.min(axis=0)), np.ceil(points.max(axis=0))
+        self._dirty_box(int(low[0]), int(low[1]), int(high[0]), int(high[1]))
 
     def MakeImage(self, pos, size, img_path):
         if self.brorunning:
-            image = pg.image.load(img_path)
-            image = pg.transform.scale(image, size)
-            self.playground.blit(image, pos)
+            dirty = self.playground.blit(images.get(img_path, size), pos)
+            if self.dirty_mode:
+                self._dirty.append(dirty)
     
     def MakeCircle(self, pos, radius, color):
         if self.brorunning:
             x, y = map(int, pos)
-            pg.draw.circle(self.playground, color, (x, y), radius)
+            dirty = pg.draw.circle(self.playground, color, (x, y), radius)
+            if self.dirty_mode:
+                self._dirty.append(dirty)
     
     def makeline(self, point1, point2, color="#FFFFFF"):
         if self.brorunning:
-            pg.draw.line(self.playground, color, point1, point2)
+            dirty = pg.draw.line(self.playground, color, point1, point2)
+            if self.dirty_mode:
+                self._dirty.append(dirty)
             
     def fill(self, colour):
         if self.brorunning:
             self.playground.fill(colour)
+            self._full_redraw = True
         
     def get_mouse_pos(self):
         if self.brorunning:
@@ -57,20 +380,62 @@ class window:
     
     def makesound(self, file, mode=0, volume=0.5):
         if self.brorunning:
-            pg.mixer.init()
-            pg.mixer.music.set_volume(volume)
-            sound = pg.mixer.Sound(file)
-            sound.play(loops=mode)
+            self.sounds.play(file, loops=mode, volume=volume)
     
     def closesound(self):
         pg.mixer.stop()
         
     def loop(self):
         if self.brorunning:
-            for self.event in pg.event.get():
+            prof = profiler.active
+            if prof is not None:
+                prof.begin_frame()
+                start = profiler.now()
+            self.events = pg.event.get()
+            for self.event in self.events:
                 if self.event.type == pg.QUIT:
                     self.brorunning = False
                     pg.quit()
+            if prof is not None:
+                prof.record("events", start)
     
+    def present(self):
+        prof = profiler.active
+        if prof is not None:
+            start = profiler.now()
+
+        if not self.dirty_mode or self._full_redraw:
+            pg.display.update()
+        else:
+            rects = merge_rects(self._dirty)
+            area = sum(rect.w * rect.h for rect in rects)
+            if area > self.dirty_threshold * self.playground.get_width() * self.playground.get_height():
+                pg.display.update()
+            elif rects:
+                pg.display.update(rects)
+        self._dirty = []
+        self._full_redraw = False
+
+        if prof is not None:
+            prof.record("present", start)
+
     def mupdate(self):
-        pg.display.update()
\ No newline at end of file
+        if self.brorunning:
+            self.present()
+        prof = profiler.active
+        if prof is not None:
+            prof.end_frame()
+
+    def run(self, update, render):
+        # Fixed-timestep loop, see Scheduler: update(dt) at scheduler.timestep,
+        # render(alpha) once per frame, then present
+        def draw(alpha):
+            if self.brorunning:
+                render(alpha)
+
+        def present():
+            if self.brorunning:
+                self.present()
+
+        self.scheduler.run(update, draw, begin=self.loop, present=present,
+                           running=lambda: self.brorunning)
\ No newline at end of file
@@ -8,7 +8,7 @@ def example_usage():
     camera = engine.camera
 
     frog = TR.Object3D()
-    frog.vertices, frog.faces = TR.load_obj("untitled.obj")
+    frog.vertices, frog.uvs, frog.faces = TR.load_obj("untitled.obj")
 
     engine.set_mouse(center_X, center_Y)
     pygame.mouse.get_rel()
@@ -0,0 +1,606 @@
+import os
+import sys
+import json
+import time
+import ctypes
+import ctypes.util
+import argparse
+import platform
+import tempfile
+import tracemalloc
+
+# --- HEADLESS BENCHMARKS ---
+# Runs without a display or GPU: SDL's dummy video driver for the 2D window and a
+# software GL context (OSMesa, or EGL surfaceless on Mesa's llvmpipe) for 3D.
+#
+#   python acid/testing/benchmarks/bench.py --save baseline.json
+#   python acid/testing/benchmarks/bench.py --baseline baseline.json   # exit 1 on regression
+#
+# Every result is {"value", "unit", "better"} so the comparison knows which way is worse.
+
+WIDTH, HEIGHT = 256, 256
+NOISE_FLOOR = 0.001  # timings under a millisecond are reported but never fail the run
+# Absolute targets, a result past its budget fails the run with or without a baseline
+BUDGETS = {
+    "physics.10k_bodies.update_s": 1 / 60,
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Acid headless benchmarks")
+    parser.add_argument("--only", nargs="*", choices=["loader", "math", "window", "draw", "soft", "pick", "batch", "physics"],
+                        help="run just these groups")
+    parser.add_argument("--quick", action="store_true", help="smaller meshes and shorter runs")
+    parser.add_argument("--gl", choices=["auto", "osmesa", "egl", "none"], default="auto",
+                        help="software GL context for the draw benchmarks")
+    parser.add_argument("--save", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown before a result counts as a regression (0.15 = 15%%)")
+    return parser.parse_args(argv)
+
+
+def pick_gl(choice):
+    if choice != "auto":
+        return choice
+    if ctypes.util.find_library("OSMesa"):
+        return "osmesa"
+    if ctypes.util.find_library("EGL"):
+        return "egl"
+    return "none"
+
+
+def setup_environment(gl):
+    # Has to happen before pygame or PyOpenGL get imported
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if gl == "osmesa":
+        os.environ["PYOPENGL_PLATFORM"] = "osmesa"
+    elif gl == "egl":
+        os.environ["PYOPENGL_PLATFORM"] = "egl"
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+
+
+def result(value, unit, better="higher"):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def rate(func, count, min_time=0.2, repeats=3):
+    # Best of `repeats` runs of work items per second, each run lasting at least min_time
+    best = 0.0
+    for _ in range(repeats):
+        done = 0
+        start = time.perf_counter()
+        while True:
+            func()
+            done += count
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, done / elapsed)
+    return best
+
+
+def best_time(func, repeats=3, min_time=0.2):
+    # Fastest single call out of at least `repeats` calls, more when they are quick
+    best = float("inf")
+    total = 0.0
+    calls = 0
+    while calls < repeats or total < min_time:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        calls += 1
+    return best
+
+# --- GENERATED MESHES ---
+
+def write_grid_obj(path, size):
+    # size x size vertex grid with UVs, quads -> 2 * (size - 1)^2 triangles
+    import numpy as np
+    ys, xs = np.mgrid[0:size, 0:size]
+    xs, ys = xs.ravel(), ys.ravel()
+    heights = np.sin(xs * 0.1) * np.cos(ys * 0.1)
+    first = (ys[:-size] * size + xs[:-size] + 1)[xs[:-size] < size - 1]
+    with open(path, "w") as file:
+        file.write("".join("v %d %d %.4f\n" % v for v in zip(xs.tolist(), ys.tolist(), heights.tolist())))
+        file.write("".join("vt %.5f %.5f\n" % (x / size, y / size) for x, y in zip(xs.tolist(), ys.tolist())))
+        file.write("".join("f {0}/{0} {1}/{1} {2}/{2} {3}/{3}\n".format(a, a + 1, a + size + 1, a + size)
+                           for a in first.tolist()))
+    return 2 * (size - 1) ** 2
+
+
+def grid_sizes(quick):
+    return [32, 128] if quick else [32, 128, 512]
+
+# --- GROUPS ---
+
+def bench_loader(quick, workdir):
+    import acid.pythontwo.ThreeD.objloader as objloader
+    import acid.pythontwo.ThreeD.renderer as TR
+    out = {}
+    for size in grid_sizes(quick):
+        path = os.path.join(workdir, "grid_%d.obj" % size)
+        triangles = write_grid_obj(path, size)
+        tag = "loader.%dk_tris" % max(1, triangles // 1000)
+
+        out[tag + ".parse_s"] = result(best_time(lambda: objloader.load_obj(path, cache=False)), "s", "lower")
+        objloader.load_obj(path)  # writes the cache
+        out[tag + ".cached_s"] = result(best_time(lambda: objloader.load_obj(path)), "s", "lower")
+        if size <= 128:
+            out[tag + ".legacy_parse_s"] = result(best_time(lambda: TR.load_obj_with_uv(path)), "s", "lower")
+
+        tracemalloc.start()
+        objloader.load_obj(path, cache=False)
+        out[tag + ".peak_mb"] = result(tracemalloc.get_traced_memory()[1] / 2 ** 20, "MB", "lower")
+        tracemalloc.stop()
+    return out
+
+
+def bench_math(quick):
+    import numpy as np
+    from acid.pythontwo.math.Vectors.Vec2D import Vect2D
+    from acid.pythontwo.math.Vectors.Vec3D import Vect3D
+    from acid.pythontwo.math.Vectors.VecND import vectND
+    from acid.pythontwo.math.Vectors.VecArray import Vect3DArray
+    from acid.pythontwo.math.matrixes.matrix import matrix, Matrix4
+
+    a, b = Vect3D(1.0, 2.0, 3.0), Vect3D(4.0, 5.0, 6.0)
+    rows = np.random.default_rng(0).random((100000, 3), dtype=np.float32)
+    batch_a, batch_b = Vect3DArray(rows), Vect3DArray(rows[::-1])
+    m4 = [[1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 8.0], [9.0, 1.0, 2.0, 3.0], [4.0, 5.0, 6.0, 7.0]]
+    list_a, list_b = matrix(m4), matrix(m4)
+    transform = Matrix4.trs((1, 2, 3), (10, 20, 30), (2, 2, 2))
+
+    def scalar_ops():
+        for _ in range(1000):
+            a.add(b)
+            a.cross(b)
+
+    def operator_ops():
+        for _ in range(1000):
+            a + b
+            a * 2.0
+
+    def inplace_ops():
+        c = Vect3D(0.0, 0.0, 0.0)
+        for _ in range(1000):
+            c += b
+            c *= 0.5
+
+    def allocations():
+        for _ in range(1000):
+            Vect3D(1.0, 2.0, 3.0)
+
+    p, q = Vect2D(1.0, 2.0), Vect2D(3.0, 4.0)
+
+    def scalar_ops_2d():
+        for _ in range(1000):
+            p.add(q)
+            p.mag()
+
+    nd_a, nd_b = vectND(64, range(64)), vectND(64, range(64, 128))
+
+    out = {
+        "math.vect3d_scalar_ops_per_s": result(rate(scalar_ops, 2000), "ops/s"),
+        "math.vect3d_operator_ops_per_s": result(rate(operator_ops, 2000), "ops/s"),
+        "math.vect3d_inplace_ops_per_s": result(rate(inplace_ops, 2000), "ops/s"),
+        "math.vect3d_alloc_per_s": result(rate(allocations, 1000), "vectors/s"),
+        "math.vect2d_scalar_ops_per_s": result(rate(scalar_ops_2d, 2000), "ops/s"),
+        "math.vectnd_64_add_per_s": result(rate(lambda: nd_a.add(nd_b), 1), "ops/s"),
+        "math.vectnd_64_dot_per_s": result(rate(lambda: nd_a.dot(nd_b), 1), "ops/s"),
+        "math.vect3d_batch_add_per_s": result(rate(lambda: batch_a.add(batch_b), len(rows)), "vectors/s"),
+        "math.vect3d_batch_cross_per_s": result(rate(lambda: batch_a.cross(batch_b), len(rows)), "vectors/s"),
+        "math.vect3d_batch_normalize_per_s": result(rate(lambda: batch_a.normalize(), len(rows)), "vectors/s"),
+        "math.matrix_matrixmul_per_s": result(rate(lambda: list_a.matrixmul(list_b), 1), "mul/s"),
+        "math.matrix_tranfoation_per_s": result(rate(lambda: list_a.tranfoation(a), 1), "points/s"),
+        "math.matrix4_transform_points_per_s": result(rate(lambda: transform.transform_points(rows), len(rows)), "points/s"),
+    }
+
+    # Scalar vector footprint, __dict__ and element storage included
+    def footprint(vector):
+        size = sys.getsizeof(vector)
+        if hasattr(vector, "__dict__"):
+            size += sys.getsizeof(vector.__dict__)
+        elements = getattr(vector, "elements", None)
+        if isinstance(elements, list):
+            size += sys.getsizeof(elements) + sum(map(sys.getsizeof, elements))
+        elif elements is not None:
+            size += sys.getsizeof(elements)
+        return size
+
+    out["math.vect2d_instance_bytes"] = result(footprint(Vect2D(1.0, 2.0)), "bytes", "lower")
+    out["math.vect3d_instance_bytes"] = result(footprint(Vect3D(1.0, 2.0, 3.0)), "bytes", "lower")
+    out["math.vectnd_64_instance_bytes"] = result(footprint(vectND(64, [float(i) for i in range(64)])),
+                                                  "bytes", "lower")
+    return out
+
+
+def bench_window(quick):
+    import numpy as np
+    import pygame as pg
+    import acid.pythontwo.window.window as ww
+
+    win = ww.window((WIDTH, HEIGHT), "bench")
+    win.init()
+    rng = np.random.default_rng(0)
+    points = rng.integers(0, WIDTH, (10000, 2))
+    colors = rng.integers(0, 256, (10000, 3))
+    point_list, color_list = points.tolist(), colors.tolist()
+
+    def pixels():
+        for p, c in zip(point_list[:1000], color_list[:1000]):
+            win.makepixel(p, c)
+
+    def rects():
+        for p, c in zip(point_list[:1000], color_list[:1000]):
+            win.MakeRect(p, (8, 8), c)
+
+    def circles():
+        for p, c in zip(point_list[:1000], color_list[:1000]):
+            win.MakeCircle(p, 4, c)
+
+    def lines():
+        for p, q in zip(point_list[:1000], point_list[1:1001]):
+            win.makeline(p, q, (255, 255, 255))
+
+    out = {
+        "window.makepixel_per_s": result(rate(pixels, 1000), "calls/s"),
+        "window.MakeRect_per_s": result(rate(rects, 1000), "calls/s"),
+        "window.MakeCircle_per_s": result(rate(circles, 1000), "calls/s"),
+        "window.makeline_per_s": result(rate(lines, 1000), "calls/s"),
+        "window.makepixels_per_s": result(rate(lambda: win.makepixels(points, colors), len(points)), "pixels/s"),
+        "window.MakeRects_per_s": result(rate(lambda: win.MakeRects(points[:1000], (8, 8), colors[:1000]), 1000), "rects/s"),
+        "window.fill_mupdate_per_s": result(rate(lambda: (win.fill((0, 0, 0)), win.mupdate()), 1), "frames/s"),
+    }
+    pg.quit()
+    return out
+
+
+def make_gl_context(kind):
+    from OpenGL.GL import GL_UNSIGNED_BYTE
+    if kind == "osmesa":
+        from OpenGL import osmesa, arrays
+        context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        buffer = arrays.GLubyteArray.zeros((HEIGHT, WIDTH, 4))
+        if not osmesa.OSMesaMakeCurrent(context, buffer, GL_UNSIGNED_BYTE, WIDTH, HEIGHT):
+            raise RuntimeError("OSMesaMakeCurrent failed")
+        return (context, buffer)
+
+    from OpenGL import EGL
+    display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    major, minor = EGL.EGLint(), EGL.EGLint()
+    EGL.eglInitialize(display, ctypes.pointer(major), ctypes.pointer(minor))
+    attributes = (EGL.EGLint * 13)(EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT, EGL.EGL_RED_SIZE, 8,
+                                   EGL.EGL_GREEN_SIZE, 8, EGL.EGL_BLUE_SIZE, 8, EGL.EGL_DEPTH_SIZE, 24,
+                                   EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE)
+    config, found = EGL.EGLConfig(), EGL.EGLint()
+    EGL.eglChooseConfig(display, attributes, ctypes.pointer(config), 1, ctypes.pointer(found))
+    if not found.value:
+        raise RuntimeError("no EGL config with OpenGL support")
+    surface = EGL.eglCreatePbufferSurface(display, config, (EGL.EGLint * 5)(
+        EGL.EGL_WIDTH, WIDTH, EGL.EGL_HEIGHT, HEIGHT, EGL.EGL_NONE))
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+    if not EGL.eglMakeCurrent(display, surface, surface, context):
+        raise RuntimeError("eglMakeCurrent failed")
+    return (display, surface, context)
+
+
+def bench_draw(quick, workdir, gl):
+    if gl == "none":
+        return {}
+    try:
+        context = make_gl_context(gl)
+    except Exception as error:
+        print("[bench] skipping draw benchmarks, no %s context: %s" % (gl, error), file=sys.stderr)
+        return {}
+
+    from OpenGL.GL import (glViewport, glMatrixMode, glLoadIdentity, glEnable, glClear, glFinish,
+                           GL_PROJECTION, GL_MODELVIEW, GL_DEPTH_TEST, GL_COLOR_BUFFER_BIT, GL_DEPTH_BUFFER_BIT)
+    from OpenGL.GLU import gluPerspective, gluLookAt
+    import acid.pythontwo.ThreeD.objloader as objloader
+    import acid.pythontwo.ThreeD.renderer as TR
+
+    glViewport(0, 0, WIDTH, HEIGHT)
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluPerspective(60, WIDTH / HEIGHT, 0.1, 1000.0)
+    glMatrixMode(GL_MODELVIEW)
+    glEnable(GL_DEPTH_TEST)
+
+    out = {}
+    for size in grid_sizes(quick):
+        path = os.path.join(workdir, "grid_%d.obj" % size)
+        if not os.path.exists(path):
+            write_grid_obj(path, size)
+        vertices, uvs, faces = objloader.load_obj(path)
+        tag = "draw.%dk_tris" % max(1, len(faces) // 1000)
+
+        for mode, use_buffers in (("immediate", False), ("buffers", True)):
+            if not use_buffers and len(faces) > 100000:
+                continue  # immediate mode takes minutes here, nothing to learn from it
+            obj = TR.Object3D(use_buffers=use_buffers)
+            obj.vertices, obj.uvs, obj.faces = vertices, uvs, faces
+            obj.position = (-size / 2, -size / 2, 0)
+
+            def frame():
+                glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+                glLoadIdentity()
+                gluLookAt(0, -size, size, 0, 0, 0, 0, 1, 0)
+                obj.draw()
+                glFinish()
+
+            frame()  # first frame uploads the buffers
+            out["%s.%s_fps" % (tag, mode)] = result(rate(frame, 1, min_time=0.5), "frames/s")
+            obj.release_buffers()
+    del context
+    return out
+
+
+def bench_soft(quick, workdir):
+    # Software rasterizer, same meshes and view as bench_draw; needs no GL context
+    import acid.pythontwo.ThreeD.objloader as objloader
+    import acid.pythontwo.ThreeD.renderer as TR
+    from acid.pythontwo.ThreeD.softrender import SoftwareEngine3D
+
+    out = {}
+    for size in grid_sizes(quick):
+        path = os.path.join(workdir, "grid_%d.obj" % size)
+        if not os.path.exists(path):
+            write_grid_obj(path, size)
+        obj = TR.Object3D()
+        obj.vertices, obj.uvs, obj.faces = objloader.load_obj(path)
+        obj.position = (-size / 2, -size / 2, 0)
+        triangles = len(obj.triangles())
+
+        # bench_draw's gluLookAt(0, -size, size, 0, 0, 0, 0, 1, 0)
+        camera = TR.Camera(pos=[0, -size, size])
+        camera.yaw, camera.pitch = -90, 45
+        camera.fov, camera.aspect, camera.far = 60, WIDTH / HEIGHT, 1000.0
+        engine = SoftwareEngine3D(WIDTH, HEIGHT, camera)
+        tag = "draw.%dk_tris" % max(1, len(obj.faces) // 1000)
+
+        def frame():
+            engine.clear()
+            engine.draw(obj)
+
+        fps = rate(frame, 1, min_time=0.5)
+        out[tag + ".soft_fps"] = result(fps, "frames/s")
+        out[tag + ".soft_tris_per_s"] = result(fps * triangles, "triangles/s")
+    return out
+
+
+def bench_pick(quick, workdir):
+    # Mouse picking on one big grid: BVH build once, then rays through random pixels
+    import numpy as np
+    import acid.pythontwo.ThreeD.objloader as objloader
+    import acid.pythontwo.ThreeD.renderer as TR
+    from acid.pythontwo.ThreeD.picking import screen_ray, mesh_bvh, pick
+
+    size = 128 if quick else 708  # 708 x 708 quads is a million triangles
+    path = os.path.join(workdir, "grid_%d.obj" % size)
+    if not os.path.exists(path):
+        write_grid_obj(path, size)
+    obj = TR.Object3D()
+    obj.vertices, obj.uvs, obj.faces = objloader.load_obj(path)
+    obj.position = (-size / 2, -size / 2, 0)
+    tag = "pick.%dk_tris" % max(1, len(obj.triangles()) // 1000)
+
+    camera = TR.Camera(pos=[0, -size, size])
+    camera.yaw, camera.pitch, camera.aspect = -90, 45, WIDTH / HEIGHT
+    pixels = np.random.default_rng(0).uniform(0, 1, (200, 2)) * (WIDTH, HEIGHT)
+    rays = [screen_ray(camera, x, y, WIDTH, HEIGHT) for x, y in pixels.tolist()]
+
+    def build():
+        obj._pick_bvh = None
+        mesh_bvh(obj)
+
+    def cast():
+        for origin, direction in rays:
+            pick([obj], origin, direction)
+
+    return {
+        tag + ".build_s": result(best_time(build, repeats=1, min_time=0), "s", "lower"),
+        tag + ".picks_per_s": result(rate(cast, len(rays)), "picks/s"),
+    }
+
+
+def bench_batch(quick, gl):
+    # A level of small static boxes, three textures: one draw per object vs StaticBatcher
+    if gl == "none":
+        return {}
+    try:
+        context = make_gl_context(gl)
+    except Exception as error:
+        print("[bench] skipping batch benchmarks, no %s context: %s" % (gl, error), file=sys.stderr)
+        return {}
+
+    import numpy as np
+    from OpenGL.GL import (glViewport, glMatrixMode, glLoadIdentity, glEnable, glClear, glFinish, glGenTextures,
+                           glDeleteTextures, GL_PROJECTION, GL_MODELVIEW, GL_DEPTH_TEST, GL_COLOR_BUFFER_BIT,
+                           GL_DEPTH_BUFFER_BIT)
+    from OpenGL.GLU import gluPerspective
+    import acid.pythontwo.ThreeD.renderer as TR
+    from acid.pythontwo.ThreeD.batching import StaticBatcher
+
+    glViewport(0, 0, WIDTH, HEIGHT)
+    glMatrixMode(GL_PROJECTION)
+    glLoadIdentity()
+    gluPerspective(60, WIDTH / HEIGHT, 0.1, 300.0)
+    glMatrixMode(GL_MODELVIEW)
+    glEnable(GL_DEPTH_TEST)
+
+    corners = [(x, y, z) for z in (-0.5, 0.5) for y in (-0.5, 0.5) for x in (-0.5, 0.5)]
+    quads = [(0, 1, 3, 2), (4, 5, 7, 6), (0, 1, 5, 4), (2, 3, 7, 6), (0, 2, 6, 4), (1, 3, 7, 5)]
+    uvs = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    faces = [[(v, i) for i, v in enumerate(quad)] for quad in quads]
+    textures = [int(t) for t in glGenTextures(3)]  # empty textures, only the binds matter
+    count = 500 if quick else 3000
+    rng = np.random.default_rng(0)
+    objects = []
+    for i in range(count):
+        obj = TR.Object3D(use_buffers=True)
+        obj.vertices, obj.uvs, obj.faces = corners, uvs, faces
+        obj.position = tuple(rng.uniform(-60, 60, 3).tolist())
+        obj.rotation = tuple(rng.uniform(0, 360, 3).tolist())
+        obj.tex_id = textures[i % 3]
+        obj.static = True
+        objects.append(obj)
+    camera = TR.Camera(pos=[0, 0, 90])
+    camera.yaw, camera.aspect, camera.far = -90, WIDTH / HEIGHT, 300.0
+    tag = "batch.%d_objects" % count
+
+    def build():
+        StaticBatcher().extend(objects)
+
+    def per_object():
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        camera.apply()
+        for obj in objects:
+            obj.draw()
+        glFinish()
+
+    def batched():
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        camera.apply()
+        batcher.render(camera)
+        glFinish()
+
+    def churn():
+        for obj in objects[:100]:
+            batcher.remove(obj)
+        for obj in objects[:100]:
+            batcher.add(obj)
+
+    out = {tag + ".build_s": result(best_time(build, repeats=1, min_time=0), "s", "lower")}
+    batcher = StaticBatcher()
+    batcher.extend(objects)
+    per_object()  # first frames upload the buffers
+    batched()
+    out[tag + ".per_object_fps"] = result(rate(per_object, 1, min_time=0.5), "frames/s")
+    out[tag + ".batched_fps"] = result(rate(batched, 1, min_time=0.5), "frames/s")
+    out[tag + ".add_remove_per_s"] = result(rate(churn, 200), "objects/s")
+    batcher.release_buffers()
+    for obj in objects:
+        obj.release_buffers()
+    glDeleteTextures(textures)
+    del context
+    return out
+
+
+def bench_physics(quick):
+    # 10k unit spheres and boxes dropped into a pile, one fixed step per update()
+    import numpy as np
+    import acid.pythontwo.ThreeD.renderer as TR
+    from acid.pythontwo.ThreeD.physics import PhysicsWorld, SPHERE, BOX
+
+    count = 10000
+    rng = np.random.default_rng(0)
+    bodies = []
+    for position in rng.uniform((-40, 0, -40), (40, 20, 40), (count, 3)).tolist():
+        obj = TR.Object3D()
+        obj.vertices = [(-0.5, -0.5, -0.5), (0.5, 0.5, 0.5)]
+        obj.position = tuple(position)
+        bodies.append(obj)
+    world = PhysicsWorld()
+    world.add_many(bodies[:count // 2], shape=SPHERE)
+    world.add_many(bodies[count // 2:], shape=BOX)
+    world.update(world.timestep)
+
+    # Mean over a run rather than the best call, the budget is for every frame
+    updates_per_s = rate(lambda: world.update(world.timestep), 1, min_time=0.2 if quick else 0.5)
+    return {"physics.%dk_bodies.update_s" % (count // 1000): result(1 / updates_per_s, "s", "lower")}
+
+# --- REPORT ---
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, current in sorted(results.items()):
+        before = baseline.get(name)
+        if before is None or not before["value"]:
+            continue
+        change = current["value"] / before["value"] - 1
+        worse = -change if current["better"] == "higher" else change
+        noisy = current["unit"] == "s" and max(current["value"], before["value"]) < NOISE_FLOOR
+        flag = "REGRESSION" if worse > tolerance and not noisy else ""
+        print("%-50s %14.4g -> %14.4g %-10s %+7.1f%% %s" % (
+            name, before["value"], current["value"], current["unit"], change * 100, flag))
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def over_budget(results):
+    failed = []
+    for name, budget in sorted(BUDGETS.items()):
+        current = results.get(name)
+        if current is not None and current["value"] > budget:
+            print("%-50s %14.4g %-10s over its budget of %.4g" % (name, current["value"], current["unit"], budget),
+                  file=sys.stderr)
+            failed.append(name)
+    return failed
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    gl = pick_gl(args.gl)
+    setup_environment(gl)
+    groups = args.only or ["loader", "math", "window", "draw", "soft", "pick", "batch", "physics"]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        if "loader" in groups:
+            results.update(bench_loader(args.quick, workdir))
+        if "math" in groups:
+            results.update(bench_math(args.quick))
+        if "window" in groups:
+            results.update(bench_window(args.quick))
+        if "draw" in groups:
+            results.update(bench_draw(args.quick, workdir, gl))
+        if "soft" in groups:
+            results.update(bench_soft(args.quick, workdir))
+        if "pick" in groups:
+            results.update(bench_pick(args.quick, workdir))
+        if "batch" in groups:
+            results.update(bench_batch(args.quick, gl))
+        if "physics" in groups:
+            results.update(bench_physics(args.quick))
+
+    import numpy as np
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "gl": gl,
+            "quick": args.quick,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+
+    status = 1 if over_budget(results) else 0
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("%d regression(s) beyond %.0f%%: %s" % (len(regressions), args.tolerance * 100,
+                                                          ", ".join(regressions)), file=sys.stderr)
+            return 1
+    elif not args.save:
+        print(json.dumps(report, indent=2))
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
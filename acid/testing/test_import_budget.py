@@ -0,0 +1,59 @@
+import os
+import sys
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BUDGET_MS = float(os.environ.get("ACID_IMPORT_BUDGET_MS", 30))  # cold start of the math-only path
+RUNS = 5
+FORBIDDEN = ("pygame", "OpenGL", "numpy")
+
+MATH_ONLY = """
+import sys
+import acid.pythontwo.math as am
+am.Vect2D(1, 2).add(am.Vect2D(3, 4))
+am.Vect3D(1, 2, 3).cross(am.Vect3D(4, 5, 6))
+print(",".join(name for name in %r if name in sys.modules))
+""" % (FORBIDDEN,)
+
+LAZY_PACKAGES = """
+import sys
+import acid.pythontwo, acid.pythontwo.ThreeD, acid.pythontwo.window, acid.pythontwo.ui
+print(",".join(name for name in %r if name in sys.modules))
+""" % (FORBIDDEN,)
+
+
+def run(code, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+               PYTHONDONTWRITEBYTECODE="")
+    done = subprocess.run(command, capture_output=True, text=True, env=env, cwd=ROOT, check=True)
+    return done.stdout.strip(), done.stderr
+
+
+def acid_import_ms(stderr):
+    # importtime lines: "import time: self [us] | cumulative | package", nesting shown by
+    # indentation. The top level acid entries together are the cost of our own imports.
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith(" acid"):  # one space = top level
+            total += int(cumulative)
+    return total / 1000
+
+
+def test_math_imports_nothing_heavy():
+    loaded, _ = run(MATH_ONLY)
+    assert not loaded, "acid.pythontwo.math imported " + loaded
+
+
+def test_packages_are_lazy():
+    loaded, _ = run(LAZY_PACKAGES)
+    assert not loaded, "importing the acid packages imported " + loaded
+
+
+def test_math_import_budget():
+    run(MATH_ONLY)  # warm the bytecode cache, we want cold interpreter not cold disk
+    best = min(acid_import_ms(run(MATH_ONLY, importtime=True)[1]) for _ in range(RUNS))
+    assert best <= BUDGET_MS, "math import took %.1f ms, budget is %.1f ms" % (best, BUDGET_MS)
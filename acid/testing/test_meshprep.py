@@ -0,0 +1,81 @@
+import numpy as np
+
+from acid.pythontwo.ThreeD.meshprep import triangulate, weld, acmr, tipsify, prepare_mesh
+
+
+def signed_areas(points, faces):
+    a, b, c = (points[faces[:, k, 0]] for k in range(3))
+    return ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])) / 2
+
+
+def outline_area(points):
+    x, y = points[:, 0], points[:, 1]
+    return (x @ np.roll(y, -1) - y @ np.roll(x, -1)) / 2
+
+
+def grid(size):
+    # size x size quads as triangles, vertex i * (size + 1) + j
+    i, j = np.meshgrid(np.arange(size), np.arange(size), indexing="ij")
+    a = (i * (size + 1) + j).reshape(-1)
+    b, c, d = a + 1, a + size + 2, a + size + 1
+    return np.stack((a, b, c, a, c, d), axis=1).reshape(-1, 3)
+
+
+def test_ear_clipping_concave_polygons():
+    # A star, a comb and a dart (concave quad), each wound both ways
+    angles = np.arange(10) * np.pi / 5
+    star = np.stack((np.cos(angles), np.sin(angles)), axis=1) * np.where(np.arange(10) % 2, 0.4, 1.0)[:, None]
+    comb = np.array([(0, 0), (5, 0), (5, 3), (4, 3), (4, 1), (3, 1), (3, 3), (2, 3), (2, 1), (1, 1), (1, 3), (0, 3)])
+    dart = np.array([(0, 0), (3, 1), (0, 2), (1, 1)])
+    for outline in (star, comb, dart, star[::-1], comb[::-1], dart[::-1]):
+        points = np.hstack((outline, np.zeros((len(outline), 1))))
+        faces, owners = triangulate(points, [[(k, 0) for k in range(len(outline))]])
+        assert len(faces) == len(outline) - 2
+        assert np.all(owners == 0)
+        area = signed_areas(points, faces)
+        expected = outline_area(outline)
+        # Every triangle wound like the outline and no overlap between them
+        assert np.all(area * np.sign(expected) > 0), area
+        assert np.isclose(area.sum(), expected)
+
+
+def test_triangulate_packed_matches_lists():
+    rng = np.random.default_rng(3)
+    points = rng.random((40, 3))
+    polygons = [[(int(v), int(v) % 7) for v in rng.choice(40, size, replace=False)]
+                for size in rng.integers(3, 9, 100)]
+    sizes = [len(polygon) for polygon in polygons]
+    packed = np.array([corner for polygon in polygons for corner in polygon])
+    listed = triangulate(points, polygons)
+    for expected, got in zip(listed, triangulate(points, packed, sizes)):
+        assert np.array_equal(expected, got)
+
+
+def test_weld_merges_equal_corners_only():
+    vertices = np.array([(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (-0.0, 0, 0)], dtype=np.float32)
+    uvs = np.array([(0, 0), (1, 0), (1, 1), (0, 1)], dtype=np.float32)
+    # Two triangles sharing an edge, plus a corner at -0.0 and one with a different uv
+    faces = np.array([[(0, 0), (1, 1), (2, 2)], [(4, 0), (2, 2), (3, 3)], [(0, 1), (1, 1), (3, 3)]])
+    rows, indices = weld(vertices, uvs, faces)
+    assert indices.dtype == np.uint16
+    assert len(rows) == 5  # (0,0,0)/uv0, (1,0,0), (1,1,0), (0,1,0), (0,0,0)/uv1
+    corners = faces.reshape(-1, 2)
+    assert np.array_equal(rows[indices, :3], vertices[corners[:, 0]] + 0.0)
+    assert np.array_equal(rows[indices, 3:], uvs[corners[:, 1]])
+
+
+def test_tipsify_does_not_increase_acmr():
+    rng = np.random.default_rng(5)
+    ordered = grid(24)
+    shuffled = ordered[rng.permutation(len(ordered))]
+    for triangles in (ordered, shuffled, grid(3), ordered[:1]):
+        order = tipsify(triangles)
+        assert np.array_equal(np.sort(order), np.arange(len(triangles)))
+        assert acmr(triangles[order]) <= acmr(triangles)
+    assert acmr(shuffled[tipsify(shuffled)]) < 0.8 * acmr(shuffled)
+
+    i, j = np.divmod(np.arange(25 * 25), 25)
+    points = np.stack((i, j, np.zeros_like(i)), axis=1).astype(float)
+    mesh = prepare_mesh(points, np.zeros((1, 2)), [[(v, 0) for v in t] for t in shuffled.tolist()])
+    assert len(mesh["vertices"]) == len(points)
+    assert mesh["acmr_after"] <= mesh["acmr_before"]
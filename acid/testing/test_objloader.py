@@ -0,0 +1,127 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from acid.pythontwo.ThreeD.objloader import parse_obj, load_obj_arrays, save_cache, CACHE_SUFFIX
+
+COMMENTED = b"""# exported by hand
+v 0 0 0 # origin
+  v 1 0 0
+\tv 1 1 0\t# tab indented
+v 0 1 0   #
+vt 0 0 # uv
+   vt 1 1
+vn 0 0 1 # up
+f 1/1/1 2/1/1 3/2/1 # tri
+   f 1//1 3//1 4//1
+#f 1 2 3
+  # f 2 3 4
+"""
+
+PLAIN = b"""v 0 0 0
+v 1 0 0
+v 1 1 0
+v 0 1 0
+vt 0 0
+vt 1 1
+vn 0 0 1
+f 1/1/1 2/1/1 3/2/1
+f 1//1 3//1 4//1
+"""
+
+# L shape listed from the corner next to the notch: a fan from the first corner would
+# cover the notch, which is outside the polygon
+CONCAVE = b"""v 2 1 0
+v 1 1 0
+v 1 2 0
+v 0 2 0
+v 0 0 0
+v 2 0 0
+f 1 2 3 4 5 6
+f 1 6 5 4 3 2
+"""
+
+
+def write(folder, name, data):
+    path = os.path.join(folder, name)
+    with open(path, "wb") as file:
+        file.write(data)
+    return path
+
+
+def test_inline_comments_and_indentation():
+    folder = tempfile.mkdtemp()
+    try:
+        commented = parse_obj(write(folder, "commented.obj", COMMENTED))
+        plain = parse_obj(write(folder, "plain.obj", PLAIN))
+        crlf = parse_obj(write(folder, "crlf.obj", COMMENTED.replace(b"\n", b"\r\n")))
+    finally:
+        shutil.rmtree(folder)
+
+    assert commented["vertices"].tolist() == [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]]
+    assert commented["uvs"].tolist() == [[0, 0], [1, 1]]
+    assert commented["faces"].shape == (2, 3, 2)
+    for name in plain:
+        assert np.array_equal(commented[name], plain[name]), name
+        assert np.array_equal(crlf[name], plain[name]), name
+
+
+def test_malformed_numbers_raise():
+    folder = tempfile.mkdtemp()
+    try:
+        for name, data in (("vertex", PLAIN.replace(b"v 1 1 0", b"v 1 x 0")),
+                           ("uv", PLAIN.replace(b"vt 1 1", b"vt 1 1-0")),
+                           ("face", PLAIN.replace(b"f 1//1", b"f 1//1.5"))):
+            path = write(folder, name + ".obj", data)
+            try:
+                parse_obj(path)
+            except ValueError:
+                continue
+            raise AssertionError("bad %s parsed without an error" % name)
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_concave_polygon_is_ear_clipped():
+    folder = tempfile.mkdtemp()
+    try:
+        arrays = parse_obj(write(folder, "concave.obj", CONCAVE))
+    finally:
+        shutil.rmtree(folder)
+
+    assert arrays["polygon"].tolist() == [0] * 4 + [1] * 4
+    points = arrays["vertices"][arrays["faces"][:, :, 0]][:, :, :2]
+    a, b, c = points[:, 0], points[:, 1], points[:, 2]
+    area = ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])) / 2
+    # Same winding as the polygon and no overlap: the areas add up to the L's 3 units
+    assert np.all(area[:4] > 0) and np.all(area[4:] < 0), area
+    assert np.isclose(area[:4].sum(), 3) and np.isclose(area[4:].sum(), -3)
+
+
+def test_cache_round_trip():
+    folder = tempfile.mkdtemp()
+    try:
+        path = write(folder, "cached.obj", COMMENTED)
+        parsed = load_obj_arrays(path)
+        assert os.path.exists(path + CACHE_SUFFIX)
+        cached = load_obj_arrays(path)
+        assert isinstance(cached["faces"], np.memmap)
+        for name in parsed:
+            assert np.array_equal(parsed[name], cached[name]), name
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_cache_from_older_parser_is_ignored():
+    folder = tempfile.mkdtemp()
+    try:
+        path = write(folder, "stale.obj", CONCAVE)
+        stat = os.stat(path)
+        stale = dict(parse_obj(path), faces=np.zeros((8, 3, 2), dtype=np.int32))
+        save_cache(path + CACHE_SUFFIX, stale, {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+        arrays = load_obj_arrays(path)
+        assert np.array_equal(arrays["faces"], parse_obj(path)["faces"])
+    finally:
+        shutil.rmtree(folder)
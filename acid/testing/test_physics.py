@@ -0,0 +1,114 @@
+import itertools
+
+import numpy as np
+
+from acid.pythontwo.ThreeD.renderer import Object3D
+from acid.pythontwo.ThreeD.physics import PhysicsWorld, SPHERE, BOX
+
+CUBE = [(-0.5, -0.5, -0.5), (0.5, -0.5, -0.5), (0.5, 0.5, -0.5), (-0.5, 0.5, -0.5),
+        (-0.5, -0.5, 0.5), (0.5, -0.5, 0.5), (0.5, 0.5, 0.5), (-0.5, 0.5, 0.5)]
+
+
+def body(position, scale=(1, 1, 1), velocity=(0, 0, 0)):
+    obj = Object3D()
+    obj.vertices, obj.uvs, obj.faces = CUBE, [(0, 0)], [[(0, 0), (1, 0), (2, 0), (3, 0)]]
+    obj.position, obj.scale, obj.velocity = position, scale, velocity
+    return obj
+
+
+def world_of(*bodies, **options):
+    world = PhysicsWorld(gravity=(0, 0, 0), **options)
+    for obj, shape, static in bodies:
+        world.add(obj, shape, static=static)
+    return world
+
+
+def test_broadphase_matches_brute_force():
+    rng = np.random.default_rng(7)
+    world = PhysicsWorld(gravity=(0, 0, 0))
+    for k in range(400):
+        obj = body(tuple(rng.uniform(-12, 12, 3).tolist()), tuple(rng.uniform(0.3, 1.5, 3).tolist()))
+        world.add(obj, SPHERE if k % 2 else BOX, static=k % 7 == 0)
+
+    i, j = world.broadphase()
+    found = {(min(a, b), max(a, b)) for a, b in zip(i.tolist(), j.tolist())}
+    assert len(found) == len(i), "pair reported twice"
+
+    reach = np.where(world.shape == BOX, np.linalg.norm(world.half_extents, axis=1), world.radius)
+    expected = set()
+    for a, b in itertools.combinations(range(len(world)), 2):
+        if world.inv_mass[a] == 0 and world.inv_mass[b] == 0:
+            continue
+        if np.linalg.norm(world.position[a] - world.position[b]) <= reach[a] + reach[b]:
+            expected.add((a, b))
+    assert len(expected) > 100 and found == expected, (len(found), len(expected))
+
+
+def contact(first, second):
+    world = world_of(first, second)
+    normal, depth = world.narrowphase(np.array([0]), np.array([1]))
+    return normal[0], depth[0]
+
+
+def test_contact_normals_point_from_i_to_j():
+    # Sphere/sphere along the centers
+    normal, depth = contact((body((0, 0, 0)), SPHERE, False), (body((1, 0, 0)), SPHERE, False))
+    assert np.allclose(normal, (1, 0, 0)) and np.isclose(depth, np.sqrt(3) - 1)
+
+    # Box/box along the axis of least overlap
+    normal, depth = contact((body((0, 0, 0)), BOX, False), (body((0.2, -0.9, 0.1)), BOX, False))
+    assert np.allclose(normal, (0, -1, 0)) and np.isclose(depth, 0.1)
+
+    # Box/sphere from the closest point on the box, either way round
+    radius = np.sqrt(3) / 4
+    ball = body((0, 0.8, 0), scale=(0.5, 0.5, 0.5))
+    normal, depth = contact((body((0, 0, 0)), BOX, False), (ball, SPHERE, False))
+    assert np.allclose(normal, (0, 1, 0)) and np.isclose(depth, radius - 0.3)
+    ball = body((0, 0.8, 0), scale=(0.5, 0.5, 0.5))
+    normal, depth = contact((ball, SPHERE, False), (body((0, 0, 0)), BOX, False))
+    assert np.allclose(normal, (0, -1, 0)) and np.isclose(depth, radius - 0.3)
+
+    # Sphere center inside the box: out through the nearest face
+    ball = body((0.1, 0, 0.4), scale=(0.5, 0.5, 0.5))
+    normal, depth = contact((body((0, 0, 0)), BOX, False), (ball, SPHERE, False))
+    assert np.allclose(normal, (0, 0, 1)) and np.isclose(depth, radius + 0.1)
+
+
+def test_static_bodies_stay_put():
+    floor = body((0, 0, 0), scale=(20, 1, 20))
+    ball = body((0, 3, 0))
+    wall = body((5, 0.5, 0))
+    world = PhysicsWorld()
+    world.add(floor, BOX, static=True)
+    world.add(wall, BOX, static=True)  # overlaps the floor, but neither can move
+    world.add(ball, SPHERE)
+    i, j = world.broadphase()
+    assert not {(0, 1), (1, 0)} & set(zip(i.tolist(), j.tolist()))
+
+    for _ in range(240):
+        world.step(1 / 60)
+    assert np.array_equal(floor.position, (0, 0, 0)) and np.array_equal(wall.position, (5, 0.5, 0))
+    assert np.array_equal(floor.velocity, (0, 0, 0))
+    # Resting on the floor top (y = 0.5), give or take what the correction leaves
+    assert abs(ball.position[1] - (0.5 + np.sqrt(3) / 2)) < 0.05, ball.position
+    assert world.contacts >= 1
+
+
+def test_fixed_timestep_accumulator():
+    ball = body((0, 10, 0))
+    world = PhysicsWorld(timestep=0.01, max_steps=4)
+    world.add(ball, SPHERE)
+
+    assert world.update(0.004) == 0
+    assert np.array_equal(ball.velocity, (0, 0, 0))
+    assert world.update(0.007) == 1
+    assert np.isclose(world.accumulator, 0.001)
+    assert np.allclose(ball.velocity, (0, -9.81 * 0.01, 0))
+    assert world.update(0.0295) == 3
+    assert np.isclose(world.accumulator, 0.0005)
+
+    # A long frame runs max_steps and drops the rest instead of spiralling
+    assert world.update(1.0) == 4
+    assert world.accumulator <= world.timestep
+    assert np.allclose(ball.velocity, (0, -9.81 * 0.08, 0))
+    assert world.contacts == 0
@@ -0,0 +1,89 @@
+import numpy as np
+
+from acid.pythontwo.ThreeD.renderer import Object3D
+from acid.pythontwo.ThreeD.picking import MeshBVH, pick
+
+TOLERANCE = 1e-4  # the BVH keeps its triangles in float32
+
+
+def brute_force(origin, direction, corners):
+    # Nearest (t, triangle) over (T, 3, 3) corners, (inf, -1) on a miss
+    v0, v1, v2 = corners[:, 0], corners[:, 1], corners[:, 2]
+    e1, e2 = v1 - v0, v2 - v0
+    p = np.cross(direction, e2)
+    det = np.einsum('ij,ij->i', e1, p)
+    s = origin - v0
+    q = np.cross(s, e1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.einsum('ij,ij->i', s, p) / det
+        v = (q @ direction) / det
+        t = np.einsum('ij,ij->i', e2, q) / det
+    t = np.where((det != 0) & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0), t, np.inf)
+    nearest = int(np.argmin(t))
+    return (float(t[nearest]), nearest) if np.isfinite(t[nearest]) else (np.inf, -1)
+
+
+def soup(rng, count):
+    vertices = rng.uniform(-1, 1, (count * 3, 3))
+    faces = np.stack((np.arange(count * 3).reshape(-1, 3), np.zeros((count, 3), dtype=int)), axis=2)
+    return vertices, faces
+
+
+def rays(rng, count):
+    origins = rng.normal(size=(count, 3))
+    origins *= 3 / np.linalg.norm(origins, axis=1)[:, None]
+    directions = rng.uniform(-1, 1, (count, 3)) - origins
+    return origins, directions / np.linalg.norm(directions, axis=1)[:, None]
+
+
+def test_mesh_bvh_matches_brute_force():
+    rng = np.random.default_rng(11)
+    vertices, faces = soup(rng, 700)
+    corners = vertices[faces[:, :, 0]]
+    bvh = MeshBVH(vertices, faces, leaf_size=4)
+    hits = 0
+    for origin, direction in zip(*rays(rng, 300)):
+        expected, triangle = brute_force(origin, direction, corners)
+        found = bvh.intersect(origin, direction)
+        if triangle < 0:
+            assert found is None
+            continue
+        hits += 1
+        assert found is not None
+        assert abs(found[1] - expected) < TOLERANCE
+        # Same triangle, or one the ray meets at the same distance
+        got = int(bvh.order[found[0]])
+        if got != triangle:
+            assert abs(brute_force(origin, direction, corners[got:got + 1])[0] - expected) < TOLERANCE
+    assert hits > 100
+
+
+def test_pick_matches_brute_force_over_objects():
+    rng = np.random.default_rng(12)
+    objects, world = [], []
+    for _ in range(6):
+        vertices, faces = soup(rng, 80)
+        obj = Object3D()
+        obj.vertices, obj.uvs, obj.faces = vertices, [(0, 0)], faces
+        obj.position = tuple(rng.uniform(-2, 2, 3).tolist())
+        obj.rotation = tuple(rng.uniform(0, 360, 3).tolist())
+        obj.scale = tuple(rng.uniform(0.5, 1.5, 3).tolist())
+        model = obj.model_matrix().m
+        world.append(vertices[faces[:, :, 0]] @ model[:3, :3].T + model[:3, 3])
+        objects.append(obj)
+    owners = np.repeat(np.arange(len(objects)), [len(corners) for corners in world])
+    world = np.concatenate(world)
+
+    hits = 0
+    for origin, direction in zip(*rays(rng, 200)):
+        expected, triangle = brute_force(origin, direction, world)
+        hit = pick(objects, origin, direction)
+        if triangle < 0:
+            assert hit is None
+            continue
+        hits += 1
+        assert hit is not None and abs(hit.distance - expected) < TOLERANCE
+        assert hit.object is objects[owners[triangle]]
+        assert hit.face == hit.triangle == triangle - np.flatnonzero(owners == owners[triangle])[0]
+        assert np.allclose(hit.point, origin + direction * expected, atol=TOLERANCE)
+    assert hits > 50